@@ -0,0 +1,220 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List
+from urllib.parse import urlparse
+
+from crawl4ai import AsyncWebCrawler, CrawlerRunConfig
+from crawl4ai.async_dispatcher import SemaphoreDispatcher
+from fastapi import HTTPException
+
+from src.app.config.crawler_config import (
+    BLOCKED_REQUEST_HOSTS,
+    BLOCKED_RESOURCE_TYPES,
+    browser_conf,
+)
+from src.app.config.settings import settings
+
+
+async def before_retrieve_html(page, context=None, config=None, **kwargs):
+    """
+    Runs the job's own `before_retrieve_html` hook, carried in the run
+    config's shared_data, since hooks are registered once per browser.
+    """
+    shared_data = getattr(config, "shared_data", None) or {}
+    hook = shared_data.get("before_retrieve_html")
+    if hook:
+        await hook(page)
+    return page
+
+
+def site_of(url: str) -> str:
+    """Approximates the registrable domain with the last two host labels."""
+    return ".".join((urlparse(url).hostname or "").split(".")[-2:])
+
+
+def should_block(request, page_url: str) -> bool:
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlparse(request.url).hostname or ""
+    if any(
+        host == blocked or host.endswith(f".{blocked}")
+        for blocked in BLOCKED_REQUEST_HOSTS
+    ):
+        return True
+    return (
+        settings.BLOCK_THIRD_PARTY_SCRIPTS
+        and request.resource_type == "script"
+        and page_url.startswith("http")
+        and site_of(request.url) != site_of(page_url)
+    )
+
+
+async def on_page_context_created(page, context=None, **kwargs):
+    """
+    Aborts images, media, fonts and analytics requests on every page of the
+    pool, they cost load time and memory and never reach the markdown.
+    """
+    if getattr(page, "requests_blocked", False):
+        return page
+
+    async def route_request(route):
+        try:
+            if should_block(route.request, page.url):
+                await route.abort()
+            else:
+                await route.continue_()
+        except Exception:
+            # The page was closed while the request was in flight
+            pass
+
+    await page.route("**/*", route_request)
+    page.requests_blocked = True
+    return page
+
+
+class BrowserPool:
+    """
+    Long-lived pool of crawl4ai browsers shared by every crawl job.
+
+    The pool keeps `size` browsers open for the lifetime of the app and
+    allows up to `pages_per_browser` concurrent pages on each of them.
+    """
+
+    def __init__(self, size: int, pages_per_browser: int) -> None:
+        self.size = size
+        self.pages_per_browser = pages_per_browser
+        self.crawlers: List[AsyncWebCrawler] = []
+        self.semaphores: List[asyncio.Semaphore] = []
+        self.active_pages: List[int] = []
+
+    async def start(self):
+        try:
+            for _ in range(self.size):
+                crawler = AsyncWebCrawler(config=browser_conf)
+                await crawler.start()
+                crawler.crawler_strategy.set_hook(
+                    "on_page_context_created", on_page_context_created
+                )
+                crawler.crawler_strategy.set_hook(
+                    "before_retrieve_html", before_retrieve_html
+                )
+                self.crawlers.append(crawler)
+                self.semaphores.append(
+                    asyncio.Semaphore(self.pages_per_browser)
+                )
+                self.active_pages.append(0)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Unable to start browser pool: {str(e)} \n error while starting browsers (from browser_pool.py in start())",
+            )
+
+    async def close(self):
+        try:
+            for crawler in self.crawlers:
+                await crawler.close()
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Unable to close browser pool: {str(e)} \n error while closing browsers (from browser_pool.py in close())",
+            )
+        finally:
+            self.crawlers = []
+            self.semaphores = []
+            self.active_pages = []
+
+    def _least_loaded(self) -> int:
+        if not self.crawlers:
+            raise HTTPException(
+                status_code=503,
+                detail="Browser pool is not started. \n error while leasing a browser (from browser_pool.py in _least_loaded())",
+            )
+        return min(
+            range(len(self.crawlers)), key=lambda i: self.active_pages[i]
+        )
+
+    @asynccontextmanager
+    async def lease(self):
+        """Lease one page slot on the least loaded browser."""
+        index = self._least_loaded()
+        self.active_pages[index] += 1
+        try:
+            async with self.semaphores[index]:
+                yield self.crawlers[index]
+        finally:
+            self.active_pages[index] -= 1
+
+    async def process_html(self, url: str, html: str, config: CrawlerRunConfig):
+        """
+        Run already fetched HTML through crawl4ai's scraping and markdown
+        pipeline. Raw HTML is processed without opening a browser page, so no
+        page slot is leased.
+        """
+        crawler = self.crawlers[self._least_loaded()]
+        return await crawler.arun(
+            url=f"raw:{html}", config=config.clone(base_url=url)
+        )
+
+    async def acquire_slots(self, index: int, wanted: int) -> int:
+        """
+        Takes up to `wanted` page slots of a browser, waiting only for the
+        first one, so batches share the pages_per_browser limit with leases
+        without holding part of the slots while waiting for the rest.
+
+        :return: The number of slots taken, to be released by the caller.
+        """
+        semaphore = self.semaphores[index]
+        await semaphore.acquire()
+        slots = 1
+        while slots < min(wanted, self.pages_per_browser) and not (
+            semaphore.locked()
+        ):
+            await semaphore.acquire()
+            slots += 1
+        return slots
+
+    async def crawl_many(self, urls: List[str], config: CrawlerRunConfig):
+        """
+        Crawl a batch of URLs through crawl4ai's multi-URL dispatcher,
+        spreading the batch over every browser in the pool.
+
+        :param urls: The URLs to crawl.
+        :param config: The crawler run config used for every URL.
+        :return: A list of crawl results (order is not guaranteed).
+        """
+        if not urls:
+            return []
+        self._least_loaded()
+
+        count = len(self.crawlers)
+        groups = [urls[i::count] for i in range(count)]
+
+        async def crawl_group(index, group):
+            self.active_pages[index] += len(group)
+            slots = 0
+            try:
+                slots = await self.acquire_slots(index, len(group))
+                return await self.crawlers[index].arun_many(
+                    urls=group,
+                    config=config,
+                    dispatcher=SemaphoreDispatcher(semaphore_count=slots),
+                )
+            finally:
+                for _ in range(slots):
+                    self.semaphores[index].release()
+                self.active_pages[index] -= len(group)
+
+        grouped_results = await asyncio.gather(
+            *[
+                crawl_group(index, group)
+                for index, group in enumerate(groups)
+                if group
+            ]
+        )
+        return [result for results in grouped_results for result in results]
+
+
+# Instantiate the BrowserPool class
+browser_pool = BrowserPool(
+    settings.BROWSER_POOL_SIZE, settings.BROWSER_POOL_PAGES_PER_BROWSER
+)
@@ -25,6 +25,256 @@ crawler_cfg = CrawlerRunConfig(
 )
 browser_conf = BrowserConfig(text_mode=True, light_mode=True, verbose=False)
 
+# Empty framework mount points left in the static HTML of client-side
+# rendered pages, which have to be hydrated in a browser
+JS_RENDERED_MARKERS = [
+    r"<div[^>]*id=[\"'](root|app|__next|__nuxt|svelte)[\"'][^>]*>\s*</div>",
+    r"<app-root[^>]*>\s*</app-root>",
+]
+
+# Score added to URLs whose path contains the pattern, higher is crawled first
+URL_PATH_WEIGHTS = {
+    "/api/": 2.0,
+    "/reference/": 2.0,
+    "/sdk/": 1.5,
+    "/guides/": 1.5,
+    "/guide/": 1.5,
+    "/docs/": 1.0,
+    "/tutorial": 1.0,
+    "/quickstart": 1.0,
+    "/getting-started": 1.0,
+    "/examples/": 0.5,
+    "/blog/": -1.5,
+    "/changelog": -1.0,
+    "/release-notes": -1.0,
+    "/community/": -1.0,
+    "/legal/": -2.0,
+    "/tag/": -2.0,
+    "/page/": -2.0,
+}
+
+# Local link rules applied before the GPT link filter. Links matching a
+# reject rule are dropped, links matching a keep rule are crawled and only
+# the remaining ambiguous links are sent to the LLM. Links on a docs host or
+# below the start URL are kept before the path and query rejects run, and
+# path rejects only match the first path segment, so reference pages such
+# as /api/accounts or /ref/settings/ are not mistaken for site chrome.
+LINK_REJECT_PATH_PATTERNS = [
+    r"^/(log-?in|sign-?in|sign-?up|sign-?out|log-?out|register|auth|oauth|sso)(/|$)",
+    r"^/(account|accounts|settings|profile|billing|dashboard)(/|$)",
+    r"^/(support|contact|contact-us|pricing|careers|jobs|press|cart|checkout)(/|$)",
+    r"^/(terms|privacy|privacy-policy|cookie-policy|legal|tos)(/|$)",
+    r"^/(search|tags?|authors?)(/|$)",
+    r"^/cdn-cgi/",
+]
+LINK_REJECT_QUERY_KEYS = {
+    "sessiontype",
+    "redirect",
+    "redirect_uri",
+    "returnto",
+    "return_to",
+    "login",
+    "signup",
+    "share",
+    "replytocom",
+}
+LINK_REJECT_EXTENSIONS = (
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".svg",
+    ".ico",
+    ".webp",
+    ".css",
+    ".js",
+    ".mjs",
+    ".map",
+    ".woff",
+    ".woff2",
+    ".ttf",
+    ".eot",
+    ".mp3",
+    ".mp4",
+    ".webm",
+    ".mov",
+    ".exe",
+    ".dmg",
+    ".msi",
+    ".rss",
+    ".atom",
+)
+LINK_REJECT_HOST_PREFIXES = (
+    "app.",
+    "auth.",
+    "login.",
+    "accounts.",
+    "account.",
+    "dashboard.",
+    "console.",
+    "status.",
+    "support.",
+    "community.",
+    "forum.",
+    "forums.",
+)
+# Non-English locale segments used as the first path segment
+LINK_NON_ENGLISH_LOCALES = {
+    "ar",
+    "bg",
+    "cs",
+    "da",
+    "de",
+    "el",
+    "es",
+    "es-es",
+    "es-419",
+    "fa",
+    "fi",
+    "fr",
+    "fr-fr",
+    "he",
+    "hi",
+    "hu",
+    "id",
+    "it",
+    "ja",
+    "ja-jp",
+    "ko",
+    "ko-kr",
+    "nl",
+    "no",
+    "pl",
+    "pt",
+    "pt-br",
+    "pt-pt",
+    "ro",
+    "ru",
+    "sk",
+    "sv",
+    "th",
+    "tr",
+    "uk",
+    "vi",
+    "zh",
+    "zh-cn",
+    "zh-tw",
+    "zh-hans",
+    "zh-hant",
+    "zh-hk",
+}
+LINK_KEEP_PATH_PATTERNS = [
+    r"/(docs?|documentation|api|reference|references|guides?|tutorials?)(/|$)",
+    r"/(sdks?|quickstart|getting-started|get-started|examples?|concepts|howto|how-to)(/|$)",
+]
+# Hosts that only serve documentation, every link on them is kept
+LINK_DOCS_HOST_PREFIXES = ("docs.", "doc.", "developer.", "developers.", "dev.")
+
+# URL canonicalization used to detect duplicate pages. Hosts can override
+# any of the default rules, e.g. {"docs.example.com": {"lowercase_path": True}}
+URL_CANONICAL_DEFAULTS = {
+    "strip_trailing_slash": True,
+    "strip_index_files": True,
+    "drop_tracking_params": True,
+    "sort_query": True,
+    "lowercase_path": False,
+    "drop_query": False,
+}
+URL_CANONICAL_HOST_RULES = {}
+URL_INDEX_FILES = ("index.html", "index.htm", "index.php", "index.md")
+URL_TRACKING_PARAMS = {
+    "gclid",
+    "fbclid",
+    "msclkid",
+    "dclid",
+    "mc_cid",
+    "mc_eid",
+    "_ga",
+    "_gl",
+    "ref",
+    "ref_src",
+    "source",
+    "hsctatracking",
+}
+URL_TRACKING_PARAM_PREFIXES = ("utm_", "_hs", "pk_", "mtm_")
+
+# File extensions deciding how a URL is fetched before any request is made.
+# URLs with other extensions are checked with a HEAD request first.
+RESOURCE_EXTENSIONS = {
+    "html": (".html", ".htm", ".xhtml", ".php", ".asp", ".aspx", ".jsp"),
+    "text": (".md", ".mdx", ".markdown", ".txt", ".rst"),
+    "json": (".json",),
+    "yaml": (".yaml", ".yml"),
+    "skip": (
+        ".pdf",
+        ".zip",
+        ".gz",
+        ".tgz",
+        ".tar",
+        ".bz2",
+        ".xz",
+        ".7z",
+        ".rar",
+        ".whl",
+        ".jar",
+        ".deb",
+        ".rpm",
+        ".iso",
+        ".bin",
+        ".csv",
+        ".xls",
+        ".xlsx",
+        ".doc",
+        ".docx",
+        ".ppt",
+        ".pptx",
+        ".ipynb",
+        ".wasm",
+        ".avif",
+        ".bmp",
+        ".tif",
+        ".tiff",
+    )
+    + LINK_REJECT_EXTENSIONS,
+}
+
+# Requests aborted by the pooled browsers. Stylesheets are kept, the snippet
+# extraction needs them to tell visible tabs from hidden ones.
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "beacon", "ping"}
+BLOCKED_REQUEST_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "segment.io",
+    "segment.com",
+    "hotjar.com",
+    "facebook.net",
+    "connect.facebook.net",
+    "intercom.io",
+    "intercomcdn.com",
+    "mixpanel.com",
+    "amplitude.com",
+    "heapanalytics.com",
+    "fullstory.com",
+    "clarity.ms",
+    "nr-data.net",
+    "newrelic.com",
+    "plausible.io",
+    "posthog.com",
+    "cookielaw.org",
+    "onetrust.com",
+    "hs-scripts.com",
+    "hs-analytics.net",
+    "hsforms.net",
+    "licdn.com",
+    "ads-twitter.com",
+    "crisp.chat",
+    "drift.com",
+    "zdassets.com",
+    "sentry-cdn.com",
+)
+
 SELECTOR_HIERARCHY = [
     "button[role='tab']",
     "div[role='tab']",
@@ -0,0 +1,49 @@
+import httpx
+from fastapi import HTTPException
+
+from src.app.config.settings import settings
+
+
+class HttpClient:
+    def __init__(self, max_connections: int) -> None:
+        self.max_connections = max_connections
+        self.client = None
+
+    def connect(self):
+        try:
+            self.client = httpx.AsyncClient(
+                timeout=httpx.Timeout(30.0, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                follow_redirects=True,
+                headers={"User-Agent": settings.CRAWLER_USER_AGENT},
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Unable to create HTTP client: {str(e)} \n error while creating the pooled HTTP client (from http_client.py in connect())",
+            )
+
+    def get_client(self) -> httpx.AsyncClient:
+        if not self.client:
+            raise HTTPException(
+                status_code=503,
+                detail="HTTP client is not connected. \n error while getting the pooled HTTP client (from http_client.py in get_client())",
+            )
+        return self.client
+
+    async def disconnect(self):
+        try:
+            if self.client:
+                await self.client.aclose()
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Unable to close HTTP client: {str(e)} \n error while closing the pooled HTTP client (from http_client.py in disconnect())",
+            )
+
+
+# Instantiate the HttpClient class
+http_client = HttpClient(settings.HTTP_POOL_SIZE)
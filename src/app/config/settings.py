@@ -1,3 +1,5 @@
+import os
+
 from pydantic_settings import BaseSettings
 
 
@@ -29,6 +31,49 @@ class Settings(BaseSettings):
     PINECONE_QUERY_URL: str
     JINA_RERANKING_MODEL: str
     JINA_RERANKING_URL: str
+    BROWSER_POOL_SIZE: int = max(1, min(8, (os.cpu_count() or 2) // 2))
+    BROWSER_POOL_PAGES_PER_BROWSER: int = 14
+    CRAWL_BATCH_SIZE: int = 20
+    CACHE_DIR: str = "cache"
+    HTTP_POOL_SIZE: int = 100
+    CRAWLER_USER_AGENT: str = "Mozilla/5.0 (compatible; DocCrawler/1.0)"
+    STATIC_FETCH_ENABLED: bool = True
+    STATIC_MIN_MARKDOWN_CHARS: int = 200
+    CRAWL_NUM_WORKERS: int = 55
+    HOST_INITIAL_CONCURRENCY: int = 4
+    HOST_MAX_CONCURRENCY: int = 16
+    HOST_TARGET_LATENCY: float = 5.0
+    HOST_MAX_CRAWL_DELAY: float = 10.0
+    SOURCE_MAX_PAGES: int = 0
+    SOURCE_MAX_SECONDS: int = 0
+    CHECKPOINT_INTERVAL: float = 5.0
+    MAX_CONCURRENT_JOBS: int = 2
+    JOB_HISTORY_SIZE: int = 500
+    STREAMING_PIPELINE: bool = True
+    PIPELINE_QUEUE_SIZE: int = 100
+    PIPELINE_EMBED_WORKERS: int = 8
+    SITEMAP_MAX_DEPTH: int = 3
+    SITEMAP_MAX_COUNT: int = 500
+    SITEMAP_MAX_BYTES: int = 50 * 1024 * 1024
+    SITEMAP_CONCURRENCY: int = 8
+    LLMS_TXT_ENABLED: bool = True
+    DOC_ADAPTERS_ENABLED: bool = True
+    LINK_DECISION_TTL: float = 30 * 24 * 3600
+    LINK_DECISION_MAX_PER_DOMAIN: int = 50000
+    TRAP_MAX_PATTERN_URLS: int = 500
+    TRAP_MAX_PARAM_VALUES: int = 50
+    TRAP_MAX_SEGMENT_REPEATS: int = 2
+    TRAP_MAX_PATH_DEPTH: int = 15
+    PAGE_MAX_BYTES: int = 5 * 1024 * 1024
+    RESOURCE_MAX_BYTES: int = 10 * 1024 * 1024
+    PAGE_STORE_COMPRESSION: str = "none"
+    PAGE_DEDUPE_CONTENT: bool = False
+    SNIPPET_CLICK_SETTLE_MS: int = 50
+    SNIPPET_EXTRACTION_TIMEOUT_MS: int = 3000
+    TAB_PROFILE_LEARN_PAGES: int = 3
+    TAB_PROFILE_PROBE_INTERVAL: int = 50
+    SNIPPET_PRESCREEN_ENABLED: bool = True
+    BLOCK_THIRD_PARTY_SCRIPTS: bool = False
 
     class Config:
         env_file = "src/.env"
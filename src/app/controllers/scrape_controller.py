@@ -2,9 +2,13 @@ from typing import List
 
 from fastapi import Depends
 
+from src.app.config.settings import settings
+from src.app.core.error_handler import JsonResponseError
+from src.app.models.domain.job import Job
 from src.app.usecases.chunking_usecase.chunking_usecase import ChunkingUseCase
 from src.app.usecases.crawler_usecase.crawler_usecase import CrawlerUsecase
 from src.app.usecases.embed_usecase.embed_usecase import EmbedUsecase
+from src.app.usecases.pipeline_usecase.pipeline_usecase import PipelineUsecase
 from src.app.usecases.upsert_usecase.upsert_usercase import UpsertUseCase
 
 
@@ -15,18 +19,106 @@ class ScrapeController:
         crawler_usecase: CrawlerUsecase = Depends(),
         upsert_usecase: UpsertUseCase = Depends(),
         embed_usecase: EmbedUsecase = Depends(),
+        pipeline_usecase: PipelineUsecase = Depends(),
     ) -> None:
 
         self.chunking_usecase = chunking_usecase
         self.crawler_usecase = crawler_usecase
         self.embed_usecase = embed_usecase
         self.upsert_usecase = upsert_usecase
+        self.pipeline_usecase = pipeline_usecase
+        self.job = None
 
-    async def scrape(self, user_id: str, urls: List[str]):
+    def track(self, job: Job):
+        """Reports the progress of the pipeline stages on `job`."""
+        self.job = job
+        if job:
+            job.progress.update(self.crawler_usecase.state.progress)
+            self.crawler_usecase.state.progress = job.progress
 
-        user_id = await self.crawler_usecase.main(
-            user_id=user_id, start_urls=urls
+    def set_stage(self, stage: str):
+        if self.job:
+            self.job.stage = stage
+
+    async def scrape(
+        self,
+        user_id: str,
+        urls: List[str],
+        job: Job = None,
+        weights: List[int] = None,
+    ):
+        self.track(job)
+        return await self.run(
+            user_id,
+            lambda: self.crawler_usecase.main(
+                user_id=user_id, start_urls=urls, weights=weights
+            ),
+        )
+
+    async def resume_scrape(self, user_id: str, job: Job = None):
+        self.track(job)
+        return await self.run(
+            user_id, lambda: self.crawler_usecase.resume(user_id=user_id)
+        )
+
+    async def run(self, user_id: str, crawl):
+        """
+        Runs `crawl` and indexes its pages, either streamed through the
+        pipeline while crawling or stage by stage once the crawl is done.
+        """
+        self.set_stage("crawling")
+        if not settings.STREAMING_PIPELINE:
+            user_id = await crawl()
+            # Indexing would delete the checkpoint a failed crawl resumes from
+            self.check_completed(user_id)
+            return await self.index(user_id)
+
+        await self.pipeline_usecase.start(
+            user_id, self.crawler_usecase.state.progress
+        )
+        self.crawler_usecase.pipeline = self.pipeline_usecase
+        await crawl()
+        self.set_stage("indexing")
+        try:
+            response = await self.pipeline_usecase.finish()
+        finally:
+            await self.crawler_usecase.close_checkpoint()
+        # A crawl that failed part-way keeps its checkpoint for /resume
+        self.check_completed(user_id, response)
+        await self.pipeline_usecase.cleanup()
+        self.set_stage("done")
+        return response
+
+    def check_completed(self, user_id: str, response: dict = None):
+        """Fails the job when the crawl stopped on an error."""
+        if self.crawler_usecase.completed:
+            return
+        indexed = (response or {}).get("upsertedCount", 0)
+        raise JsonResponseError(
+            status_code=500,
+            detail=f"Crawl failed ({self.crawler_usecase.error}), {indexed} vectors were indexed and the checkpoint is kept for /resume/{user_id}",
         )
+
+    async def index(self, user_id: str):
+        self.set_stage("chunking")
         user_id = await self.chunking_usecase.execute_chunking(user_id)
+        if self.job:
+            self.job.progress["chunks_produced"] = (
+                self.chunking_usecase.chunk_count
+            )
+
+        self.set_stage("embedding")
         user_id = await self.embed_usecase.process_embeddings(user_id)
-        return await self.upsert_usecase.upload_vectors(user_id)
+        if self.job:
+            self.job.progress["chunks_embedded"] = (
+                self.embed_usecase.embedded_count
+            )
+
+        self.set_stage("upserting")
+        response = await self.upsert_usecase.upload_vectors(user_id)
+        if self.job:
+            self.job.progress["vectors_upserted"] = response.get(
+                "upsertedCount", 0
+            )
+        self.set_stage("done")
+        return response
@@ -2,17 +2,35 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from src.app.config.browser_pool import browser_pool
 from src.app.config.database import mongodb_database
+from src.app.config.http_client import http_client
 from src.app.routes.query_route import query_router
 from src.app.routes.scraper_route import scrape_router
+from src.app.state.fetch_mode_cache import fetch_mode_cache
+from src.app.state.job_manager import job_manager
+from src.app.state.link_decision_cache import link_decision_cache
+from src.app.state.tab_profile_cache import tab_profile_cache
 
 
 @asynccontextmanager
 async def db_lifespan(app: FastAPI):
     mongodb_database.connect()
+    http_client.connect()
+    await browser_pool.start()
+    await fetch_mode_cache.load()
+    await link_decision_cache.load()
+    await tab_profile_cache.load()
+    job_manager.start()
 
     yield
 
+    await job_manager.close()
+    await fetch_mode_cache.save()
+    await link_decision_cache.save()
+    await tab_profile_cache.save()
+    await browser_pool.close()
+    await http_client.disconnect()
     mongodb_database.disconnect()
 
 
@@ -0,0 +1,34 @@
+import time
+from typing import List
+
+
+class Job:
+    def __init__(self, job_id: str, urls: List[str]):
+        self.job_id: str = job_id
+        self.urls: List[str] = urls
+        self.status: str = "queued"
+        self.stage: str = None
+        self.progress: dict = {
+            "pages_crawled": 0,
+            "chunks_produced": 0,
+            "chunks_embedded": 0,
+            "vectors_upserted": 0,
+        }
+        self.result = None
+        self.error: str = None
+        self.created_at: float = time.time()
+        self.started_at: float = None
+        self.finished_at: float = None
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "urls": self.urls,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
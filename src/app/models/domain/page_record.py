@@ -0,0 +1,30 @@
+import hashlib
+
+
+class PageRecord:
+    """A crawled page. Slots keep large crawls from paying for a dict per page."""
+
+    __slots__ = ("href", "content", "base_url", "content_hash")
+
+    def __init__(self, href: str, content: str, base_url: str):
+        self.href: str = href
+        self.content: str = content
+        self.base_url: str = base_url
+        self.content_hash: str = self.hash_content(content)
+
+    @staticmethod
+    def hash_content(content: str) -> str:
+        return hashlib.blake2b(
+            (content or "").encode("utf-8"), digest_size=16
+        ).hexdigest()
+
+    @classmethod
+    def from_dict(cls, page: dict):
+        return cls(page["href"], page["content"], page["base_url"])
+
+    def to_dict(self):
+        return {
+            "href": self.href,
+            "content": self.content,
+            "base_url": self.base_url,
+        }
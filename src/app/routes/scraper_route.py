@@ -1,10 +1,12 @@
 import uuid
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 
 from src.app.controllers.scrape_controller import ScrapeController
-from src.app.core.error_handler import error_handler
+from src.app.core.error_handler import JsonResponseError, error_handler
+from src.app.models.domain.job import Job
+from src.app.state.job_manager import job_manager
 
 scrape_router = APIRouter()
 
@@ -12,11 +14,77 @@ scrape_router = APIRouter()
 @scrape_router.post("/")
 @error_handler
 async def scrape_docs(
-    urls: List[str], scrape_controller: Annotated[ScrapeController, Depends()]
+    urls: List[str],
+    scrape_controller: Annotated[ScrapeController, Depends()],
+    weights: Annotated[
+        Optional[List[int]],
+        Query(
+            description="Crawl share of each URL's source, in the order of urls"
+        ),
+    ] = None,
 ):
-    try:
-        response = await scrape_controller.scrape(str(uuid.uuid4()), urls)
-        return response
-    except Exception as e:
-        print(e)
-        return {"error from scrape route file": str(e)}
+    if weights is not None and (
+        len(weights) != len(urls) or any(weight < 1 for weight in weights)
+    ):
+        raise JsonResponseError(
+            status_code=400,
+            detail="weights needs one positive integer per URL",
+        )
+    job = Job(job_id=str(uuid.uuid4()), urls=urls)
+    job_manager.submit(
+        job,
+        lambda: scrape_controller.scrape(job.job_id, urls, job, weights),
+    )
+    return job.to_dict()
+
+
+@scrape_router.post("/resume/{user_id}")
+@error_handler
+async def resume_scrape(
+    user_id: str,
+    scrape_controller: Annotated[ScrapeController, Depends()],
+):
+    running = job_manager.get(user_id)
+    if running and running.status in ("queued", "running"):
+        raise JsonResponseError(
+            status_code=409, detail=f"Job {user_id} is already {running.status}"
+        )
+    job = Job(job_id=user_id, urls=[])
+    job_manager.submit(
+        job, lambda: scrape_controller.resume_scrape(user_id, job)
+    )
+    return job.to_dict()
+
+
+@scrape_router.get("/jobs")
+@error_handler
+async def list_jobs():
+    return [job.to_dict() for job in job_manager.list()]
+
+
+@scrape_router.get("/jobs/{job_id}")
+@error_handler
+async def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise JsonResponseError(
+            status_code=404, detail=f"Job not found: {job_id}"
+        )
+    return job.to_dict()
+
+
+@scrape_router.get("/jobs/{job_id}/result")
+@error_handler
+async def get_job_result(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise JsonResponseError(
+            status_code=404, detail=f"Job not found: {job_id}"
+        )
+    if job.status != "completed":
+        raise JsonResponseError(
+            status_code=409,
+            detail=f"Job {job_id} is {job.status}"
+            + (f": {job.error}" if job.error else ""),
+        )
+    return job.result
@@ -1,22 +1,41 @@
-from crawl4ai import AsyncWebCrawler
+import asyncio
+import time
+from urllib.parse import urlparse
+
 from fastapi import Depends
 
+from src.app.config.browser_pool import browser_pool
 from src.app.config.crawler_config import (
     PROGRAMMING_LANGUAGES,
     SELECTOR_HIERARCHY,
-    browser_conf,
     crawler_cfg,
 )
+from src.app.config.http_client import http_client
 from src.app.config.settings import settings
 from src.app.models.domain.error import Error
 from src.app.repositories.error_repository import ErrorRepo
-from src.app.state.crawler_state import crawler_state
+from src.app.services.hidden_code_snippets_service import (
+    HiddenCodeSnippetsService,
+)
+from src.app.services.resource_service import ResourceService
+from src.app.state.crawler_state import CrawlerState
+from src.app.state.fetch_mode_cache import fetch_mode_cache
+from src.app.state.host_scheduler import THROTTLE_STATUS_CODES, SlotOutcome
 from src.app.usecases.crawler_usecase.helper import CrawlerUtils
+from src.app.usecases.crawler_usecase.link_rules import LinkRules
+from src.app.usecases.crawler_usecase.url_scorer import UrlScorer
 
 
 class CrawlerService:
     def __init__(
-        self, error_repo=Depends(ErrorRepo), crawler_utils=Depends(CrawlerUtils)
+        self,
+        error_repo=Depends(ErrorRepo),
+        crawler_utils=Depends(CrawlerUtils),
+        url_scorer=Depends(UrlScorer),
+        link_rules=Depends(LinkRules),
+        resource_service=Depends(ResourceService),
+        hidden_code_snippets_service=Depends(HiddenCodeSnippetsService),
+        state=Depends(CrawlerState),
     ) -> None:
         self.error_repo = error_repo
         self.max_depth = settings.MAX_DEPTH
@@ -24,8 +43,21 @@ class CrawlerService:
         self.SELECTOR_HIERARCHY = SELECTOR_HIERARCHY
         self.PROGRAMMING_LANGUAGES = PROGRAMMING_LANGUAGES
         self.MAX_CONCURRENT_CLICKS = settings.MAX_CONCURRENT_CLICKS
-        self.state = crawler_state
+        self.state = state
         self.crawler_utils = crawler_utils
+        self.url_scorer = url_scorer
+        self.link_rules = link_rules
+        self.resource_service = resource_service
+        self.hidden_code_snippets_service = hidden_code_snippets_service
+        # Per-job run config, its shared_data carries the snippet hook
+        self.crawler_cfg = crawler_cfg.clone(
+            shared_data={
+                "before_retrieve_html": hidden_code_snippets_service.before_retrieve_html
+            }
+        )
+        self.browser_pool = browser_pool
+        self.http_client = http_client
+        self.fetch_mode_cache = fetch_mode_cache
 
     async def should_process_url(self, file_name):
         lock = await self.state.get_lock(file_name)
@@ -35,6 +67,204 @@ class CrawlerService:
                 < self.state.max_llm_request_count
             )
 
+    async def fetch_static(self, url: str, outcome: SlotOutcome):
+        """
+        Fetch a page with the pooled HTTP client and convert it to markdown
+        with the same crawler config as the browser path. Returns None when
+        the page looks client-side rendered and needs the browser.
+        """
+        domain = urlparse(url).netloc
+        if not (
+            settings.STATIC_FETCH_ENABLED
+            and self.fetch_mode_cache.should_try_static(domain)
+        ):
+            return None
+
+        try:
+            response, html = await self.read_html(url, outcome)
+        except Exception:
+            # Network errors say nothing about the page, let the browser retry
+            return None
+        if html is None:
+            return None
+
+        if not self.crawler_utils.looks_js_rendered(html):
+            try:
+                result = await self.browser_pool.process_html(
+                    str(response.url), html, self.crawler_cfg
+                )
+            except Exception as e:
+                await self.error_repo.insert_error(
+                    Error(
+                        user_id=self.user_id,
+                        error_message=f"[ERROR] Failed to process static HTML of {url}: {e} \n error while converting html from crawler_service in fetch_static()",
+                    )
+                )
+                return None
+            if (
+                result.success
+                and len(result.markdown.fit_markdown.strip())
+                >= settings.STATIC_MIN_MARKDOWN_CHARS
+            ):
+                self.fetch_mode_cache.record(domain, "static")
+                return result
+
+        self.fetch_mode_cache.record(domain, "browser")
+        return None
+
+    async def read_html(self, url: str, outcome: SlotOutcome):
+        """
+        Streams a page and checks its headers before reading the body, so
+        non-HTML resources and pages over PAGE_MAX_BYTES are never downloaded
+        in full. They are flagged on the outcome instead.
+
+        :return: The response and its HTML, or None for the HTML.
+        """
+        async with self.http_client.get_client().stream("GET", url) as response:
+            # Pages kept from the browser still count as answered by the host
+            outcome.status_code = response.status_code
+            if response.status_code in THROTTLE_STATUS_CODES:
+                outcome.retry_after = self.crawler_utils.parse_retry_after(
+                    response.headers
+                )
+                return response, None
+            if response.status_code != 200:
+                return response, None
+            content_type = response.headers.get("content-type", "")
+            if "html" not in content_type:
+                outcome.content_type = content_type
+                return response, None
+            if int(response.headers.get("content-length") or 0) > (
+                settings.PAGE_MAX_BYTES
+            ):
+                outcome.too_large = True
+                return response, None
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) > settings.PAGE_MAX_BYTES:
+                    outcome.too_large = True
+                    return response, None
+            return response, body.decode(
+                response.encoding or "utf-8", "replace"
+            )
+
+    @staticmethod
+    def needs_browser(outcome: SlotOutcome) -> bool:
+        """Only HTML pages within the size limit are sent to the browser."""
+        return (
+            outcome.status_code not in THROTTLE_STATUS_CODES
+            and not outcome.too_large
+            and ResourceService.kind_of_content_type(outcome.content_type)
+            == "html"
+        )
+
+    async def store_resource(self, link_info, kind: str):
+        """Stores a non-HTML resource through its lightweight handler."""
+        url, _, file_name, home_url, _ = link_info
+        if kind == "skip":
+            print(f"[CRAWL] Skipping non-HTML resource {url}")
+            return
+        content = await self.resource_service.fetch_document(
+            url, kind, self.user_id
+        )
+        if content:
+            self.state.add_result(
+                file_name,
+                {"href": url, "content": content, "base_url": home_url},
+            )
+
+    async def route_resources(self, link_infos):
+        """
+        Sends URLs that are not HTML documentation to the resource handlers,
+        classifying them by extension and, when that is not enough, by a
+        HEAD request.
+
+        :return: The link infos that should be crawled as HTML pages.
+        """
+
+        async def route(link_info):
+            kind = self.resource_service.kind_of(link_info[0])
+            if kind == "unknown":
+                try:
+                    kind = await self.resource_service.preflight(link_info[0])
+                except Exception:
+                    kind = "html"
+            if kind == "html":
+                return link_info
+            await self.store_resource(link_info, kind)
+            return None
+
+        routed = await asyncio.gather(*[route(x) for x in link_infos])
+        return [link_info for link_info in routed if link_info is not None]
+
+    async def fetch_browser(self, url: str):
+        """Crawl a single URL on a leased browser and return the crawl4ai result."""
+        try:
+            async with self.browser_pool.lease() as crawler:
+                return await crawler.arun(url=url, config=self.crawler_cfg)
+        except Exception as e:
+            await self.error_repo.insert_error(
+                Error(
+                    user_id=self.user_id,
+                    error_message=f"[ERROR] Failed to scrape {url}: {e} \n error while scraping from crawler_service in fetch_browser()",
+                )
+            )
+            return None
+
+    def record_outcome(self, outcome: SlotOutcome, result):
+        """Reports how the host answered so the scheduler can adapt."""
+        if result is None:
+            outcome.failed = (
+                outcome.status_code is None or outcome.status_code >= 500
+            )
+            return
+        outcome.status_code = result.status_code
+        outcome.failed = result.status_code is None or (
+            result.status_code >= 500
+        )
+        outcome.retry_after = self.crawler_utils.parse_retry_after(
+            result.response_headers or {}
+        )
+
+    async def fetch_page(self, url: str):
+        """
+        Fetch a single URL within the host's politeness limits, trying the
+        static HTML path first and falling back to a leased browser.
+
+        :return: The crawl4ai result (or None) and the host slot outcome.
+        """
+        async with self.state.host_scheduler.slot(url) as outcome:
+            result = await self.fetch_static(url, outcome)
+            if result is None and self.needs_browser(outcome):
+                result = await self.fetch_browser(url)
+            self.record_outcome(outcome, result)
+        return result, outcome
+
+    async def handle_skipped_page(self, link_info, outcome: SlotOutcome):
+        """Pages kept from the browser by their headers go to the resource handlers."""
+        if outcome.too_large:
+            print(
+                f"[CRAWL] Skipping {link_info[0]}, larger than the page limit"
+            )
+        elif outcome.content_type:
+            await self.store_resource(
+                link_info,
+                self.resource_service.kind_of_content_type(
+                    outcome.content_type
+                ),
+            )
+
+    async def retry_if_throttled(self, link_info, result, outcome) -> bool:
+        if result is not None and result.success:
+            return False
+        if not self.state.should_retry(link_info[0], outcome):
+            return False
+        print(f"[CRAWL] Host throttled {link_info[0]}, queueing it again")
+        self.discard_snippets(result, link_info[0])
+        await self.state.queue.put(link_info)
+        return True
+
     async def crawl_page(
         self,
         url: str,
@@ -48,46 +278,145 @@ class CrawlerService:
 
         print(f"[CRAWL] Processing {url} at depth {depth}")
 
-        try:
-            async with AsyncWebCrawler(config=browser_conf) as crawler:
-                result = await crawler.arun(url=url, config=crawler_cfg)
-        except Exception as e:
-            await self.error_repo.insert_error(
-                Error(
-                    user_id=self.user_id,
-                    error_message=f"[ERROR] Failed to scrape {url}: {e} \n error while scraping from crawler_service in crawl_page()",
-                )
-            )
+        link_info = (url, depth, file_name, home_url, sitemap_mode)
+        if not await self.route_resources([link_info]):
+            return
+        result, outcome = await self.fetch_page(url)
+        if await self.retry_if_throttled(link_info, result, outcome):
+            return
+        if result is None:
+            self.discard_snippets(result, url)
+            await self.handle_skipped_page(link_info, outcome)
             return
 
+        await self.process_result(
+            result, url, depth, file_name, home_url, sitemap_mode
+        )
+
+    async def crawl_pages(self, link_infos):
+        """
+        Crawl a batch of sitemap pages. The batch is split into waves that fit
+        the hosts' politeness limits; pages that are not served as static HTML
+        go through the browser pool's multi-URL dispatcher.
+
+        :param link_infos: Queue items of (url, depth, file_name, home_url, sitemap_mode).
+        """
+        link_infos = await self.route_resources(
+            list(
+                {x[0]: x for x in link_infos if x[1] < self.max_depth}.values()
+            )
+        )
+        scheduler = self.state.host_scheduler
+
+        while link_infos:
+            wave_urls = await scheduler.acquire_wave([x[0] for x in link_infos])
+            wave = [x for x in link_infos if x[0] in wave_urls]
+            link_infos = [x for x in link_infos if x[0] not in wave_urls]
+            print(f"[CRAWL] Processing batch of {len(wave)} pages")
+
+            start_time = time.monotonic()
+            outcomes = {url: SlotOutcome() for url in wave_urls}
+            results_by_url = {}
+            try:
+                static_results = await asyncio.gather(
+                    *[
+                        self.fetch_static(url, outcomes[url])
+                        for url in wave_urls
+                    ]
+                )
+                results_by_url = {
+                    url: result
+                    for url, result in zip(wave_urls, static_results)
+                    if result is not None
+                }
+                browser_urls = [
+                    url
+                    for url in wave_urls
+                    if url not in results_by_url
+                    and self.needs_browser(outcomes[url])
+                ]
+                results = await self.browser_pool.crawl_many(
+                    browser_urls, self.crawler_cfg
+                )
+                results_by_url.update(
+                    {result.url: result for result in results}
+                )
+            except Exception as e:
+                await self.error_repo.insert_error(
+                    Error(
+                        user_id=self.user_id,
+                        error_message=f"[ERROR] Failed to scrape batch of {len(wave)} pages: {e} \n error while scraping from crawler_service in crawl_pages()",
+                    )
+                )
+            finally:
+                latency = time.monotonic() - start_time
+                for url in wave_urls:
+                    self.record_outcome(outcomes[url], results_by_url.get(url))
+                    await scheduler.release(url, latency, outcomes[url])
+
+            for link_info in wave:
+                url, depth, file_name, home_url, sitemap_mode = link_info
+                result = results_by_url.get(url)
+                if await self.retry_if_throttled(
+                    link_info, result, outcomes[url]
+                ):
+                    continue
+                if result is None:
+                    self.discard_snippets(result, url)
+                    if not self.needs_browser(outcomes[url]):
+                        await self.handle_skipped_page(link_info, outcomes[url])
+                        continue
+                    await self.error_repo.insert_error(
+                        Error(
+                            user_id=self.user_id,
+                            error_message=f"[FAILED] No batch result for {url} \n error while crawling (from crawler_service in crawl_pages())",
+                        )
+                    )
+                    continue
+                await self.process_result(
+                    result, url, depth, file_name, home_url, sitemap_mode
+                )
+
+    async def process_result(
+        self,
+        result,
+        url: str,
+        depth: int,
+        file_name,
+        home_url,
+        sitemap_mode: bool = False,
+    ):
         if not result.success:
             await self.error_repo.insert_error(
                 Error(
                     user_id=self.user_id,
-                    error_message=f"[FAILED] Crawling unsuccessful for {url} \n error while crawling (from crawler_service in crawl_page())",
+                    error_message=f"[FAILED] Crawling unsuccessful for {url} \n error while crawling (from crawler_service in process_result())",
                 )
             )
+            self.discard_snippets(result, url)
+            return
+
+        canonical_url = self.state.canonicalizer.canonical_from_html(
+            result.html, url
+        )
+        if canonical_url and not self.state.is_visited(canonical_url):
+            self.state.mark_visited(canonical_url)
+        elif canonical_url and self.state.canonicalizer.canonicalize(
+            canonical_url
+        ) != self.state.canonicalizer.canonicalize(url):
+            print(f"[CRAWL] Skipping {url}, duplicate of {canonical_url}")
+            self.discard_snippets(result, url)
             return
 
-        if file_name not in self.state.results:
-            self.state.results[file_name] = []
-        self.state.results[file_name].append(
+        self.state.add_result(
+            file_name,
             {
                 "href": url,
-                "content": result.markdown.fit_markdown,
+                "content": self.merge_snippets(result, url, file_name),
                 "base_url": home_url,
-            }
+            },
         )
 
-        if sitemap_mode:
-            return
-
-        if not await self.should_process_url(file_name):
-            return
-
-        if (depth + 1) >= self.max_depth:
-            return
-
         internal_links = list(
             set(
                 [
@@ -99,23 +428,102 @@ class CrawlerService:
         internal_links = self.crawler_utils.filter_urls_by_domain(
             url, internal_links
         )
+        expand = (
+            not sitemap_mode
+            and (depth + 1) < self.max_depth
+            and await self.should_process_url(file_name)
+        )
+        self.count_in_links(internal_links, file_name, expand)
+        if not expand:
+            return
+
+        # Links already visited or queued need no decision, links of crawl
+        # traps are not expanded
+        new_internal_links = [
+            link
+            for link in internal_links
+            if not self.state.is_visited(link)
+            and self.state.trap_detector.allow(link)
+        ]
+        all_filtered_links, ambiguous_links = self.link_rules.split(
+            new_internal_links, home_url
+        )
 
         batch_size = 180
-        all_filtered_links = []
-        for i in range(0, len(internal_links), batch_size):
-            batch = internal_links[i : i + batch_size]
+        for i in range(0, len(ambiguous_links), batch_size):
+            batch = ambiguous_links[i : i + batch_size]
             filtered_batch = await self.crawler_utils.filter_links_gpt(
                 batch, file_name, self.user_id
             )
             all_filtered_links.extend(filtered_batch)
 
         filtered_links = list(set(all_filtered_links))
+        for link in set(new_internal_links).difference(filtered_links):
+            self.state.forget_in_degree(link)
 
         new_links = []
         for link in filtered_links:
-            if link not in self.state.processed_urls:
-                self.state.processed_urls.add(link)
+            if not self.state.is_visited(link):
+                self.state.mark_visited(link)
                 new_links.append((link, depth + 1, file_name, home_url, False))
 
         for link_info in new_links:
-            await self.state.queue.put(link_info)
+            await self.state.queue.put(
+                link_info,
+                self.url_scorer.score(
+                    link_info[0],
+                    link_info[1],
+                    in_degree=self.state.in_degree_of(link_info[0]),
+                ),
+            )
+
+    def discard_snippets(self, result, url: str):
+        """Drops the hidden snippets collected for a page that is not stored."""
+        self.hidden_code_snippets_service.pop_snippets(
+            getattr(result, "redirected_url", None),
+            getattr(result, "url", None),
+            url,
+        )
+
+    def merge_snippets(self, result, url: str, file_name: str) -> str:
+        """
+        Merges the hidden code snippets into the page markdown. Browser pages
+        had their snippets collected by the crawl's hook, static pages get
+        theirs from the fetched HTML.
+        """
+        markdown = result.markdown.fit_markdown
+        extraction = self.hidden_code_snippets_service.pop_snippets(
+            getattr(result, "redirected_url", None), result.url, url
+        )
+        if extraction is None:
+            extraction = self.hidden_code_snippets_service.extract_from_html(
+                result.html
+            )
+        # Blocks already in the markdown are not repeated
+        snippets = {
+            lang: [code for code in codes if code not in markdown]
+            for lang, codes in extraction["snippets"].items()
+        }
+        self.state.record_snippet_stats(
+            file_name,
+            extraction["screened"],
+            any(snippets.values()),
+        )
+        return self.crawler_utils.merge_content(markdown, snippets)
+
+    def count_in_links(self, links, file_name, candidates: bool = True):
+        """
+        Counts how many crawled pages link to each URL and raises the priority
+        of URLs that are already waiting in the frontier. Unvisited URLs are
+        only counted when they are candidates for the frontier, and URLs
+        already crawled are not counted at all, so the counts stay bounded by
+        the frontier size.
+        """
+        for link in links:
+            if self.state.queue.is_queued(file_name, link):
+                in_degree = self.state.count_in_link(link)
+                self.state.queue.boost(
+                    file_name, link, self.url_scorer.in_degree_boost(in_degree)
+                )
+            elif candidates and not self.state.is_visited(link):
+                self.state.count_in_link(link)
@@ -0,0 +1,88 @@
+from fastapi import Depends
+
+from src.app.config.settings import settings
+from src.app.models.domain.error import Error
+from src.app.repositories.error_repository import ErrorRepo
+from src.app.services.doc_adapters.docusaurus import DocusaurusAdapter
+from src.app.services.doc_adapters.markdown_source import (
+    GitBookAdapter,
+    MintlifyAdapter,
+)
+from src.app.services.doc_adapters.mkdocs import MkDocsAdapter
+from src.app.services.doc_adapters.sphinx import SphinxAdapter
+from src.app.services.llms_txt_service import LlmsTxtService
+from src.app.services.sitemap_service import SitemapService
+
+ADAPTERS = [
+    MkDocsAdapter,
+    SphinxAdapter,
+    DocusaurusAdapter,
+    GitBookAdapter,
+    MintlifyAdapter,
+]
+
+
+class DocAdapterService:
+    """
+    Fingerprints the documentation framework of a start page and lets the
+    matching adapter enumerate its pages. Pages outside the start URL's
+    scope are dropped, as for sitemap seeding.
+    """
+
+    def __init__(
+        self,
+        error_repo=Depends(ErrorRepo),
+        llms_txt_service=Depends(LlmsTxtService),
+        sitemap_service=Depends(SitemapService),
+    ) -> None:
+        self.error_repo = error_repo
+        self.enabled = settings.DOC_ADAPTERS_ENABLED
+        self.adapters = [
+            adapter(llms_txt_service.get_text, sitemap_service)
+            for adapter in ADAPTERS
+        ]
+
+    def detect(self, html: str):
+        for adapter in self.adapters:
+            if adapter.matches(html):
+                return adapter
+        return None
+
+    async def enumerate(self, url: str, html: str, user_id: str):
+        """
+        :return: (pages, links) from the matching adapter, or None when no
+        adapter matches or its endpoints are missing.
+        """
+        if not self.enabled or not html:
+            return None
+        adapter = self.detect(html)
+        if adapter is None:
+            return None
+        try:
+            found = await adapter.enumerate(url, html, user_id)
+            if not found:
+                return None
+            scope = SitemapService.scope_of(url)
+            pages = [
+                page
+                for page in found[0]
+                if SitemapService.in_scope(page["href"], scope)
+            ]
+            entries = [
+                entry
+                for entry in found[1]
+                if SitemapService.in_scope(entry["loc"], scope)
+            ]
+            if pages or entries:
+                print(
+                    f"[CRAWL] {adapter.name} adapter for {url}: {len(pages)} pages, {len(entries)} links"
+                )
+                return pages, entries
+        except Exception as e:
+            await self.error_repo.insert_error(
+                Error(
+                    user_id=user_id,
+                    error_message=f"[ERROR] {adapter.name} adapter failed for {url}: {e} \n error from doc_adapter_service in enumerate()",
+                )
+            )
+        return None
@@ -0,0 +1,69 @@
+import re
+from abc import ABC, abstractmethod
+from urllib.parse import urljoin, urlparse
+
+GENERATOR_META = re.compile(
+    r"<meta[^>]+name=[\"']generator[\"'][^>]+content=[\"']([^\"']+)",
+    re.IGNORECASE,
+)
+
+
+class DocAdapter(ABC):
+    """
+    Reads the page list (and, where possible, the content) of one
+    documentation framework from its machine-readable endpoints.
+
+    `enumerate` returns (pages, links): pages are {"href", "content"} dicts
+    ready to be stored, links are {"loc", "lastmod", "priority"} entries of
+    the pages that still have to be fetched, like sitemap entries.
+    It returns None when the endpoints are missing, so the crawler falls
+    back to its usual sitemap / link discovery.
+    """
+
+    name = ""
+
+    def __init__(self, fetch_text, sitemap_service) -> None:
+        self.fetch_text = fetch_text
+        self.sitemap_service = sitemap_service
+
+    @staticmethod
+    def generator(html: str) -> str:
+        match = GENERATOR_META.search(html)
+        return match.group(1).lower() if match else ""
+
+    @staticmethod
+    def entry(loc: str, lastmod=None, priority=None) -> dict:
+        return {"loc": loc, "lastmod": lastmod, "priority": priority}
+
+    @abstractmethod
+    def matches(self, html: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def enumerate(self, url: str, html: str, user_id: str):
+        pass
+
+    @staticmethod
+    def ancestors(url: str):
+        """The directory of `url` and each parent directory up to the root."""
+        parsed = urlparse(url)
+        path = parsed.path or "/"
+        if not path.endswith("/"):
+            path = path.rsplit("/", 1)[0] + "/"
+        roots = []
+        while True:
+            roots.append(f"{parsed.scheme}://{parsed.netloc}{path}")
+            if path == "/":
+                return roots
+            path = path.rstrip("/").rsplit("/", 1)[0] + "/"
+
+    async def find_endpoint(self, url: str, relative_path: str):
+        """
+        Looks for `relative_path` below the start URL's directory and its
+        parents. :return: (site_root, text) or (None, None).
+        """
+        for root in self.ancestors(url):
+            text = await self.fetch_text(urljoin(root, relative_path))
+            if text:
+                return root, text
+        return None, None
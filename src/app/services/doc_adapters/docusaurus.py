@@ -0,0 +1,27 @@
+import json
+from urllib.parse import urljoin
+
+from src.app.services.doc_adapters.base import DocAdapter
+
+
+class DocusaurusAdapter(DocAdapter):
+    """
+    Lists the pages of a Docusaurus site from the `search-index.json` of the
+    local search plugin. Sites without it are covered by their sitemap.
+    """
+
+    name = "docusaurus"
+
+    def matches(self, html: str) -> bool:
+        return "docusaurus" in self.generator(html)
+
+    async def enumerate(self, url: str, html: str, user_id: str):
+        root, text = await self.find_endpoint(url, "search-index.json")
+        if not text:
+            return None
+        links = []
+        for index in json.loads(text):
+            for document in index.get("documents", []):
+                if document.get("u"):
+                    links.append(urljoin(root, document["u"]))
+        return [], [self.entry(link) for link in dict.fromkeys(links)]
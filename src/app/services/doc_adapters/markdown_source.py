@@ -0,0 +1,74 @@
+import asyncio
+import re
+
+from src.app.config.settings import settings
+from src.app.services.doc_adapters.base import DocAdapter
+
+
+def asset_pattern(*hosts: str):
+    """Matches a src/href attribute pointing at one of `hosts`."""
+    return re.compile(
+        r"""\b(?:src|href)\s*=\s*["'][^"']*(?:""" + "|".join(hosts) + ")",
+        re.IGNORECASE,
+    )
+
+
+class MarkdownSourceAdapter(DocAdapter):
+    """
+    For hosted platforms that serve the markdown source of every page at
+    `<page URL>.md`: pages are listed from the sitemap and their markdown is
+    downloaded instead of rendering the page.
+
+    The platform is recognised by its generator meta tag or by assets loaded
+    from its CDN, not by its name appearing anywhere in the page.
+    """
+
+    generator_name = ""
+    asset_pattern = None
+
+    def matches(self, html: str) -> bool:
+        if self.generator_name in self.generator(html):
+            return True
+        return bool(self.asset_pattern.search(html))
+
+    async def enumerate(self, url: str, html: str, user_id: str):
+        entries = {
+            entry["loc"]: entry
+            async for entry in self.sitemap_service.iter_entries(url, user_id)
+        }
+        entries = list(entries.values())
+        if not entries:
+            return None
+        semaphore = asyncio.Semaphore(settings.HOST_MAX_CONCURRENCY)
+
+        async def fetch(entry):
+            async with semaphore:
+                try:
+                    return entry, await self.fetch_text(
+                        entry["loc"].rstrip("/") + ".md"
+                    )
+                except Exception:
+                    return entry, None
+
+        pages = []
+        html_links = []
+        for entry, content in await asyncio.gather(
+            *[fetch(entry) for entry in entries]
+        ):
+            if content and content.strip():
+                pages.append({"href": entry["loc"], "content": content.strip()})
+            else:
+                html_links.append(entry)
+        return pages, html_links
+
+
+class GitBookAdapter(MarkdownSourceAdapter):
+    name = "gitbook"
+    generator_name = "gitbook"
+    asset_pattern = asset_pattern(r"static[\w-]*\.gitbook\.com", r"/~gitbook/")
+
+
+class MintlifyAdapter(MarkdownSourceAdapter):
+    name = "mintlify"
+    generator_name = "mintlify"
+    asset_pattern = asset_pattern(r"mintcdn\.com", r"mintlify\.s3")
@@ -0,0 +1,24 @@
+import json
+from urllib.parse import urljoin
+
+from src.app.services.doc_adapters.base import DocAdapter
+
+
+class MkDocsAdapter(DocAdapter):
+    """Lists the pages of an MkDocs site from `search/search_index.json`."""
+
+    name = "mkdocs"
+
+    def matches(self, html: str) -> bool:
+        return "mkdocs" in self.generator(html)
+
+    async def enumerate(self, url: str, html: str, user_id: str):
+        root, text = await self.find_endpoint(url, "search/search_index.json")
+        if not text:
+            return None
+        locations = [
+            doc.get("location", "").split("#", 1)[0]
+            for doc in json.loads(text).get("docs", [])
+        ]
+        links = [urljoin(root, location) for location in locations]
+        return [], [self.entry(link) for link in dict.fromkeys(links)]
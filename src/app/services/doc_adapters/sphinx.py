@@ -0,0 +1,79 @@
+import json
+import re
+from urllib.parse import urljoin
+
+from src.app.services.doc_adapters.base import DocAdapter
+
+DOCNAMES = re.compile(r"[\"']?docnames[\"']?\s*:\s*(\[[^\]]*\])")
+OPTIONS_SCRIPT = re.compile(
+    r"src=[\"']([^\"']*)_static/documentation_options\.js", re.IGNORECASE
+)
+BUILDER = re.compile(r"BUILDER\s*:\s*[\"']([^\"']*)[\"']")
+LINK_SUFFIX = re.compile(r"LINK_SUFFIX\s*:\s*[\"']([^\"']*)[\"']")
+# Relative links of the page itself, external and anchor links excluded
+PAGE_LINK = re.compile(
+    r"href=[\"'](?![a-z][a-z0-9+.-]*:|#|/)([^\"'#?]+)", re.IGNORECASE
+)
+
+
+class SphinxAdapter(DocAdapter):
+    """Lists the pages of a Sphinx site from its `searchindex.js`."""
+
+    name = "sphinx"
+
+    def matches(self, html: str) -> bool:
+        return "sphinx" in self.generator(html) or bool(
+            OPTIONS_SCRIPT.search(html)
+        )
+
+    async def enumerate(self, url: str, html: str, user_id: str):
+        match = OPTIONS_SCRIPT.search(html)
+        if match:
+            root = urljoin(url, match.group(1) or "./")
+            text = await self.fetch_text(urljoin(root, "searchindex.js"))
+        else:
+            root, text = await self.find_endpoint(url, "searchindex.js")
+        if not text:
+            return None
+        docnames = DOCNAMES.search(text)
+        if not docnames:
+            return None
+        suffix = await self.link_suffix(root, html)
+        links = [
+            urljoin(root, self.link_of(docname, suffix))
+            for docname in json.loads(docnames.group(1))
+        ]
+        return [], [self.entry(link) for link in dict.fromkeys(links)]
+
+    @staticmethod
+    def link_of(docname: str, suffix: str) -> str:
+        # dirhtml serves index documents as their directory
+        if suffix == "/" and (docname == "index" or docname.endswith("/index")):
+            return docname[: -len("index")]
+        return docname + suffix
+
+    async def link_suffix(self, root: str, html: str) -> str:
+        """
+        The suffix Sphinx appends to docnames in links, read from
+        documentation_options.js or, for builds that do not name their
+        builder, guessed from the page's own links.
+        """
+        options = (
+            await self.fetch_text(
+                urljoin(root, "_static/documentation_options.js")
+            )
+            or ""
+        )
+        builder = BUILDER.search(options)
+        if builder:
+            # The dirhtml builder links pages as directories
+            if builder.group(1) == "dirhtml":
+                return "/"
+            suffix = LINK_SUFFIX.search(options)
+            return suffix.group(1) if suffix else ".html"
+        links = PAGE_LINK.findall(html)
+        if not any(link.endswith(".html") for link in links) and any(
+            link.endswith("/") for link in links
+        ):
+            return "/"
+        return ".html"
@@ -1,5 +1,7 @@
-import asyncio
+import re
+from urllib.parse import urlparse
 
+from bs4 import BeautifulSoup
 from fastapi import Depends
 
 from src.app.config.crawler_config import (
@@ -9,6 +11,115 @@ from src.app.config.crawler_config import (
 from src.app.config.settings import settings
 from src.app.models.domain.error import Error
 from src.app.repositories.error_repository import ErrorRepo
+from src.app.state.tab_profile_cache import tab_profile_cache
+
+LANGUAGE_CLASS = re.compile(r"\b(?:language|lang)-([\w+#-]+)")
+CODE_BLOCK_SELECTOR = (
+    "pre code, pre, code, div[class*='bg-'] pre code, div[class*='bg-'] pre"
+)
+
+# Clicks every visible language tab (or select option) matched by the given
+# [selector, mode] strategies and collects the code blocks that appear after
+# each click, keyed by the language of the tab. Mode is "click", "select" or
+# "any". Also returns the strategies that yielded new code. With
+# `prescreen`, pages without code blocks or without a language-labelled tab
+# candidate are left untouched and reported as not screened in. Languages
+# found in `language-*` classes are returned with no snippets, as before.
+EXTRACT_SNIPPETS_JS = """
+async ({strategies, languages, codeSelector, settleMs, timeoutMs, prescreen}) => {
+    const deadline = Date.now() + timeoutMs;
+    const known = new Set(languages);
+    const seen = new Set();
+    const handled = new Set();
+    const snippets = {};
+    const productive = new Set();
+    const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+    const isVisible = (el) => {
+        const rect = el.getBoundingClientRect();
+        if (!rect.width || !rect.height) return false;
+        const style = getComputedStyle(el);
+        return style.visibility !== "hidden" && style.display !== "none";
+    };
+    const labelOf = (el) => {
+        // Cheap length check first, innerText forces a layout
+        const raw = el.textContent || "";
+        if (!raw || raw.length > 40) return null;
+        const label = (el.innerText || raw).trim().toLowerCase();
+        return known.has(label) ? label : null;
+    };
+    if (prescreen) {
+        const hasCode = document.querySelector(codeSelector) !== null;
+        const hasTabs = hasCode && strategies.some(([selector]) => {
+            try {
+                for (const el of document.querySelectorAll(selector)) {
+                    if (el.tagName === "SELECT") {
+                        for (const option of el.options) {
+                            if (known.has((option.text || "").trim().toLowerCase())) return true;
+                        }
+                    } else if (labelOf(el)) {
+                        return true;
+                    }
+                }
+            } catch (e) {}
+            return false;
+        });
+        if (!hasTabs) return {snippets: {}, strategies: [], screened: false};
+    }
+    const harvest = (language, strategy) => {
+        for (const block of document.querySelectorAll(codeSelector)) {
+            const text = (block.innerText || "").trim();
+            if (text && !seen.has(text)) {
+                seen.add(text);
+                (snippets[language] = snippets[language] || []).push(text);
+                productive.add(strategy);
+            }
+        }
+    };
+
+    for (const [selector, mode] of strategies) {
+        let elements;
+        try {
+            elements = document.querySelectorAll(selector);
+        } catch (e) {
+            continue;
+        }
+        for (const el of elements) {
+            if (Date.now() > deadline) break;
+            if (handled.has(el)) continue;
+            handled.add(el);
+            if (el.tagName === "SELECT") {
+                if (mode === "click" || !isVisible(el)) continue;
+                for (const option of el.options) {
+                    const language = (option.text || "").trim().toLowerCase();
+                    if (!known.has(language)) continue;
+                    el.value = option.value;
+                    el.dispatchEvent(new Event("input", {bubbles: true}));
+                    el.dispatchEvent(new Event("change", {bubbles: true}));
+                    await sleep(settleMs);
+                    harvest(language, `${selector}|select`);
+                }
+                continue;
+            }
+            if (mode === "select") continue;
+            const language = labelOf(el);
+            if (!language || !isVisible(el)) continue;
+            try {
+                el.click();
+            } catch (e) {
+                continue;
+            }
+            await sleep(settleMs);
+            harvest(language, `${selector}|click`);
+        }
+    }
+
+    for (const el of document.querySelectorAll('[class*="language-"]')) {
+        const match = String(el.className).match(/language-(\\w+)/);
+        if (match && !snippets[match[1]]) snippets[match[1]] = [];
+    }
+    return {snippets, strategies: [...productive], screened: true};
+}
+"""
 
 
 class HiddenCodeSnippetsService:
@@ -17,169 +128,104 @@ class HiddenCodeSnippetsService:
         self.PROGRAMMING_LANGUAGES = PROGRAMMING_LANGUAGES
         self.SELECTOR_HIERARCHY = SELECTOR_HIERARCHY
         self.used_id = None
-        self.MAX_CONCURRENT_CLICKS = settings.MAX_CONCURRENT_CLICKS
-
-    async def handle_element_and_extract(
-        self, page, element, text, seen_code_blocks, should_click=True
-    ):
+        self.click_settle_ms = settings.SNIPPET_CLICK_SETTLE_MS
+        self.extraction_timeout_ms = settings.SNIPPET_EXTRACTION_TIMEOUT_MS
+        self.user_id = None
+        self.snippets_by_url = {}
+        self.tab_profile_cache = tab_profile_cache
+        self.prescreen = settings.SNIPPET_PRESCREEN_ENABLED
+
+    async def before_retrieve_html(self, page):
         """
-        Handle an element (click if needed) and extract code snippets from the page.
-
-        :param page: The page object.
-        :param element: The element to interact with.
-        :param text: The text associated with the element (e.g., programming language name).
-        :param seen_code_blocks: A set to track already processed code snippets.
-        :param should_click: Whether to click the element before extracting code.
-        :return: A tuple of (snippets, text).
+        crawl4ai hook run on the crawl's own page once it is loaded, so the
+        hidden snippets are collected in the same page load as the markdown.
+        The snippets are kept by page URL until the result is processed.
         """
-        snippets = []
+        if not page.url.startswith("http"):
+            return
         try:
-            # Click the element if required
-            if should_click:
-                print(f"Clicking: {text} in element")
-                await element.click()
-                await asyncio.sleep(0.25)
-
-            # Extract code blocks after the action
-            code_blocks = await page.locator(
-                "pre code, pre, code, div[class*='bg-'] pre code, div[class*='bg-'] pre"
-            ).all()
-            for code_block in code_blocks:
-                try:
-                    code_text = await code_block.inner_text(timeout=3000)
-                    code_text = code_text.strip()
-                    if code_text and code_text not in seen_code_blocks:
-                        seen_code_blocks.add(code_text)
-                        snippets.append(code_text)
-                except Exception as e:
-                    continue
-            return snippets, text
+            self.snippets_by_url[page.url] = await self.extract_from_page(page)
         except Exception as e:
             await self.error_repo.insert_error(
                 Error(
                     user_id=self.user_id,
-                    error_message=f"Skipping interactive element due to error: {e} \n error while clicking (from hidden_code_snippits_service in handle_element_and_extract())",
+                    error_message=f"Failed to extract hidden snippets of {page.url}: {e} \n error while extracting hidden code snippits (from hidden_code_snippits_service in before_retrieve_html())",
                 )
             )
-            # print(f"Skipping interactive element due to error: {e}")
-            return [], text
 
-    async def extract_hidden_snippets(self, url, browser, user_id):
-        """Extracts hidden code snippets by clicking on tabs and handling non-interactive content."""
-        code_snippets = {}  # Store extracted snippets by language
-        seen_code_blocks = set()
-        self.user_id = user_id
-
-        context = await browser.new_context(accept_downloads=False)
-        page = await context.new_page()
-        await page.goto(url=url, timeout=45000)
-
-        # Step 1: Use improved selector hierarchy to find relevant elements
-        for selector in self.SELECTOR_HIERARCHY:
-            try:
-                elements = await page.locator(selector).all()
-                if not elements:
-                    continue
-
-                # Process elements concurrently
-                click_tasks = []
-                for element in elements:
-                    # Skip if the element is not visible
-                    if not await element.is_visible():
-                        continue
-
-                    # Handle select elements differently
-                    if selector == "select":
-                        # Locate the option elements within the select
-                        options = await element.locator("option").all()
-                        for option in options:
-                            option_text = await option.inner_text(timeout=3000)
-                            option_text = option_text.strip().lower()
-                            if option_text in self.PROGRAMMING_LANGUAGES:
-                                # Use select_option instead of clicking
-                                value = await option.get_attribute("value")
-                                await element.select_option(value=value)
-                                # Extract code after selecting the option
-                                click_tasks.append(
-                                    self.handle_element_and_extract(
-                                        page,
-                                        element,
-                                        option_text,
-                                        seen_code_blocks,
-                                        should_click=False,
-                                    )
-                                )
-                    else:
-                        # For non-select elements, check if the element text is in PROGRAMMING_LANGUAGES
-                        element_text = await element.inner_text(timeout=3000)
-                        element_text = element_text.strip().lower()
-                        if element_text in self.PROGRAMMING_LANGUAGES:
-                            # Proceed with the click logic
-                            click_tasks.append(
-                                self.handle_element_and_extract(
-                                    page,
-                                    element,
-                                    element_text,
-                                    seen_code_blocks,
-                                    should_click=True,
-                                )
-                            )
-
-                # Execute click operations concurrently with a limit
-                results = []
-                for i in range(0, len(click_tasks), self.MAX_CONCURRENT_CLICKS):
-                    batch = click_tasks[i : i + self.MAX_CONCURRENT_CLICKS]
-                    batch_results = await asyncio.gather(*batch)
-                    results.extend(batch_results)
-
-                # Process results
-                for snippets, lang in results:
-                    if snippets and lang in self.PROGRAMMING_LANGUAGES:
-                        code_snippets.setdefault(lang, []).extend(snippets)
-
-            except Exception as e:
-                await self.error_repo.insert_error(
-                    Error(
-                        user_id=self.user_id,
-                        error_message=f"Error with selector {selector}: {e} \n error while extracting hidden code snippits (from hidden_code_snippits_service in extract_hidden_snippets())",
-                    )
-                )
-                # print(f"Error with selector {selector}: {e}")
+    def pop_snippets(self, *urls):
+        """
+        Removes the extractions kept for all of `urls`.
 
-        # Step 2: Extract non-interactive hidden content
-        hidden_elements = await page.query_selector_all(
-            "[style*='display: none'], [style*='visibility: hidden']"
-        )
-        for element in hidden_elements:
-            try:
-                await page.evaluate(
-                    "el => el.style.display = 'block'", element
-                )  # Force show hidden elements
-                text = await element.inner_text()
-            except Exception as e:
-                await self.error_repo.insert_error(
-                    Error(
-                        user_id=self.user_id,
-                        error_message=f"Skipping hidden element: {e} \n error while extracting hidden code snippits (from hidden_code_snippits_service in extract_hidden_snippets())",
-                    )
-                )
-                # print(f"Skipping hidden element: {e}")
-
-        # Step 3: Dynamically detect programming languages from code blocks
-        languages = await page.evaluate(
-            """() => {
-            return Array.from(document.querySelectorAll('[class*="language-"]')).map(el => {
-                const match = el.className.match(/language-(\w+)/);
-                return match ? match[1] : null;
-            }).filter(Boolean);
-        }"""
-        )
+        :return: The extraction ({"snippets", "screened"}) collected for the
+        first matching URL, or None.
+        """
+        extractions = [
+            self.snippets_by_url.pop(url, None) for url in urls if url
+        ]
+        return next((x for x in extractions if x is not None), None)
+
+    def extract_from_html(self, html):
+        """
+        Collects the code blocks of a page fetched without a browser. Tab
+        panels are all present in the static HTML, so nothing is clicked.
+
+        :return: {"snippets", "screened"}, pages without any `<pre>` are not
+        parsed.
+        """
+        code_snippets = {}
+        if not html or (self.prescreen and "<pre" not in html):
+            return {"snippets": code_snippets, "screened": False}
+        soup = BeautifulSoup(html, "html.parser")
+        seen_code_blocks = set()
+        for pre in soup.find_all("pre"):
+            code = pre.find("code") or pre
+            classes = " ".join(
+                " ".join(element.get("class") or [])
+                for element in (code, pre, pre.parent)
+                if element is not None and hasattr(element, "get")
+            )
+            match = LANGUAGE_CLASS.search(classes)
+            lang = match.group(1).lower() if match else None
+            code_text = code.get_text().strip()
+            if (
+                lang in self.PROGRAMMING_LANGUAGES
+                and code_text
+                and code_text not in seen_code_blocks
+            ):
+                seen_code_blocks.add(code_text)
+                code_snippets.setdefault(lang, []).append(code_text)
+        return {"snippets": code_snippets, "screened": True}
+
+    async def extract_from_page(self, page):
+        """
+        Extracts hidden code snippets by clicking on language tabs and
+        selects. Discovery, clicking and harvesting run in one injected
+        script, so a page costs a single round-trip to the browser.
 
-        if languages:
-            for lang in languages:
-                if lang not in code_snippets:
-                    code_snippets[lang] = []
+        Only the tab widget learned for the domain is tried once its profile
+        is known, and pages of domains without one are skipped.
 
-        await page.close()
-        await context.close()
-        return code_snippets
+        :return: {"snippets", "screened"}, the snippets keyed by language.
+        """
+        domain = urlparse(page.url).netloc
+        strategies = self.tab_profile_cache.strategies_for(domain)
+        if not strategies:
+            return {"snippets": {}, "screened": False}
+        extracted = await page.evaluate(
+            EXTRACT_SNIPPETS_JS,
+            {
+                "strategies": strategies,
+                "languages": sorted(self.PROGRAMMING_LANGUAGES),
+                "codeSelector": CODE_BLOCK_SELECTOR,
+                "settleMs": self.click_settle_ms,
+                "timeoutMs": self.extraction_timeout_ms,
+                "prescreen": self.prescreen,
+            },
+        )
+        if extracted["screened"]:
+            self.tab_profile_cache.record(domain, extracted["strategies"])
+        return {
+            "snippets": extracted["snippets"],
+            "screened": extracted["screened"],
+        }
@@ -0,0 +1,173 @@
+import asyncio
+import re
+from urllib.parse import urljoin, urlparse
+
+from fastapi import Depends
+
+from src.app.config.http_client import http_client
+from src.app.config.settings import settings
+from src.app.models.domain.error import Error
+from src.app.repositories.error_repository import ErrorRepo
+from src.app.services.sitemap_service import SitemapService
+from src.app.state.host_scheduler import host_scheduler
+
+MARKDOWN_LINK = re.compile(r"\[[^\]]*\]\(([^)\s]+)\)")
+SOURCE_LINE = re.compile(r"^\s*Source:\s*(https?://\S+)", re.IGNORECASE)
+MARKDOWN_SUFFIXES = (".md", ".mdx", ".txt")
+
+
+class LlmsTxtService:
+    """
+    Reads the `/llms-full.txt` and `/llms.txt` files that many doc sites
+    publish, so their clean markdown can be ingested without a browser.
+
+    llms-full.txt is split into one page per top-level section. For llms.txt
+    the linked markdown files are downloaded, while linked HTML pages are
+    returned so the crawler can fetch them without expanding their links.
+    """
+
+    def __init__(self, error_repo=Depends(ErrorRepo)) -> None:
+        self.error_repo = error_repo
+        self.http_client = http_client
+        self.host_scheduler = host_scheduler
+        self.enabled = settings.LLMS_TXT_ENABLED
+
+    async def get_text(self, url: str):
+        """:return: The body of `url` if it is a text document, else None."""
+        async with self.host_scheduler.slot(url) as outcome:
+            response = await self.http_client.get_client().get(url)
+            outcome.status_code = response.status_code
+        if response.status_code != 200:
+            return None
+        content_type = response.headers.get("content-type", "")
+        text = response.text
+        # SPAs answer every path with their index page
+        if "html" in content_type or text.lstrip().startswith("<"):
+            return None
+        return text
+
+    async def find(self, url: str, name: str):
+        """Looks for `name` next to the start URL, then at the site root."""
+        parsed = urlparse(url)
+        root = f"{parsed.scheme}://{parsed.netloc}"
+        for base in dict.fromkeys([url.rstrip("/"), root]):
+            llms_url = f"{base}/{name}"
+            text = await self.get_text(llms_url)
+            if text and text.strip():
+                return llms_url, text
+        return None, None
+
+    @staticmethod
+    def slugify(title: str) -> str:
+        return re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")
+
+    def split_sections(self, llms_url: str, text: str, start_url: str):
+        """
+        Splits llms-full.txt on top-level headings (outside code fences).
+        Each section is keyed by its `Source:` URL when it has one; sections
+        outside the start URL's scope are dropped, as are unsourced ones of a
+        root file that covers more than the start URL.
+        """
+        scope = SitemapService.scope_of(start_url)
+        sections = []
+        current = []
+        in_fence = False
+        for line in text.splitlines():
+            if line.lstrip().startswith(("```", "~~~")):
+                in_fence = not in_fence
+            if not in_fence and line.startswith("# ") and current:
+                sections.append(current)
+                current = []
+            current.append(line)
+        if current:
+            sections.append(current)
+
+        pages = []
+        used = set()
+        for lines in sections:
+            content = "\n".join(lines).strip()
+            if not content:
+                continue
+            href = None
+            for line in lines[:6]:
+                match = SOURCE_LINE.match(line)
+                if match:
+                    href = match.group(1)
+                    break
+            if href is not None and not SitemapService.in_scope(href, scope):
+                continue
+            if href is None:
+                if not SitemapService.in_scope(llms_url, scope):
+                    continue
+                title = lines[0][2:] if lines[0].startswith("# ") else ""
+                href = f"{llms_url}#{self.slugify(title) or len(pages)}"
+            if href in used:
+                href = f"{href}-{len(pages)}"
+            used.add(href)
+            pages.append({"href": href, "content": content})
+        return pages
+
+    async def fetch_linked(self, llms_url: str, text: str, start_url: str):
+        """
+        Downloads the markdown files linked from llms.txt.
+
+        :return: (pages, html_links)
+        """
+        scope = SitemapService.scope_of(start_url)
+        links = []
+        for match in MARKDOWN_LINK.finditer(text):
+            link = urljoin(llms_url, match.group(1)).split("#", 1)[0]
+            if SitemapService.in_scope(link, scope):
+                links.append(link)
+        links = list(dict.fromkeys(links))
+        semaphore = asyncio.Semaphore(settings.HOST_MAX_CONCURRENCY)
+
+        async def fetch(link):
+            async with semaphore:
+                try:
+                    return link, await self.get_text(link)
+                except Exception:
+                    return link, None
+
+        pages = []
+        html_links = []
+        for link, content in await asyncio.gather(
+            *[fetch(link) for link in links]
+        ):
+            if content and content.strip():
+                pages.append({"href": link, "content": content.strip()})
+            elif not urlparse(link).path.endswith(MARKDOWN_SUFFIXES):
+                html_links.append(link)
+        return pages, html_links
+
+    async def fetch_pages(self, url: str, user_id: str):
+        """
+        :return: (pages, html_links) from the site's llms-full.txt or
+        llms.txt, or None when the site publishes neither.
+        """
+        if not self.enabled:
+            return None
+        try:
+            llms_url, text = await self.find(url, "llms-full.txt")
+            if text:
+                pages = self.split_sections(llms_url, text, url)
+                if pages:
+                    print(f"[CRAWL] Using {llms_url} ({len(pages)} sections)")
+                    return pages, []
+
+            llms_url, text = await self.find(url, "llms.txt")
+            if text:
+                pages, html_links = await self.fetch_linked(llms_url, text, url)
+                if pages or html_links:
+                    print(
+                        f"[CRAWL] Using {llms_url} ({len(pages)} markdown pages, {len(html_links)} HTML pages)"
+                    )
+                    return pages, html_links
+        except Exception as e:
+            await self.error_repo.insert_error(
+                Error(
+                    user_id=user_id,
+                    error_message=f"[ERROR] Failed to read llms.txt for {url}: {e} \n error from llms_txt_service in fetch_pages()",
+                )
+            )
+        return None
@@ -0,0 +1,169 @@
+import json
+import os
+from urllib.parse import urlparse
+
+from fastapi import Depends
+
+from src.app.config.crawler_config import RESOURCE_EXTENSIONS
+from src.app.config.http_client import http_client
+from src.app.config.settings import settings
+from src.app.models.domain.error import Error
+from src.app.repositories.error_repository import ErrorRepo
+from src.app.state.host_scheduler import THROTTLE_STATUS_CODES, host_scheduler
+
+HTTP_METHODS = ("get", "put", "post", "delete", "patch", "head", "options")
+
+
+class ResourceService:
+    """
+    Keeps non-HTML resources away from the browser.
+
+    URLs are classified by extension first and by a HEAD request when the
+    extension says nothing. Markdown and text files are stored as they are,
+    OpenAPI specs are turned into markdown, YAML files into a code block and
+    binary downloads (PDFs, archives, images, media) are skipped. Every
+    download is capped at RESOURCE_MAX_BYTES.
+    """
+
+    def __init__(self, error_repo=Depends(ErrorRepo)) -> None:
+        self.error_repo = error_repo
+        self.http_client = http_client
+        self.host_scheduler = host_scheduler
+        self.extensions = RESOURCE_EXTENSIONS
+        self.max_bytes = settings.RESOURCE_MAX_BYTES
+
+    def kind_of(self, url: str) -> str:
+        """:return: html, text, json, yaml, skip or unknown."""
+        path = urlparse(url).path.lower()
+        extension = os.path.splitext(path.rsplit("/", 1)[-1])[1]
+        # Version numbers such as /v1.2 are not file extensions
+        if not extension or extension[1:].isdigit():
+            return "html"
+        for kind, extensions in self.extensions.items():
+            if extension in extensions:
+                return kind
+        return "unknown"
+
+    @staticmethod
+    def kind_of_content_type(content_type: str) -> str:
+        content_type = (content_type or "").split(";")[0].strip().lower()
+        if not content_type or "html" in content_type:
+            return "html"
+        if "json" in content_type:
+            return "json"
+        if "yaml" in content_type:
+            return "yaml"
+        if content_type.startswith("text/"):
+            return "text"
+        return "skip"
+
+    def too_large(self, headers) -> bool:
+        try:
+            return int(headers.get("content-length", 0)) > self.max_bytes
+        except ValueError:
+            return False
+
+    async def preflight(self, url: str) -> str:
+        """Learns the kind of a URL from its headers, without the body."""
+        async with self.host_scheduler.slot(url) as outcome:
+            response = await self.http_client.get_client().head(url)
+            if response.status_code in (405, 501):
+                # Servers without HEAD get a one-byte ranged GET
+                async with self.http_client.get_client().stream(
+                    "GET", url, headers={"Range": "bytes=0-0"}
+                ) as response:
+                    pass
+            outcome.status_code = response.status_code
+        if response.status_code in THROTTLE_STATUS_CODES | {403}:
+            # Throttled or bot-gated HEADs are left to the page fetch, which
+            # queues throttled pages again and falls back to the browser
+            return "html"
+        if response.status_code >= 400:
+            return "skip"
+        kind = self.kind_of_content_type(response.headers.get("content-type"))
+        if kind != "html" and self.too_large(response.headers):
+            return "skip"
+        return kind
+
+    async def download(self, url: str):
+        """:return: The decoded body, or None if it is missing or too large."""
+        async with self.host_scheduler.slot(url) as outcome:
+            async with self.http_client.get_client().stream(
+                "GET", url
+            ) as response:
+                outcome.status_code = response.status_code
+                if response.status_code != 200 or self.too_large(
+                    response.headers
+                ):
+                    return None
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body.extend(chunk)
+                    if len(body) > self.max_bytes:
+                        return None
+                return body.decode(response.encoding or "utf-8", "replace")
+
+    @staticmethod
+    def openapi_to_markdown(spec: dict):
+        """:return: One markdown section per operation of an OpenAPI spec."""
+        if not isinstance(spec, dict) or not (
+            spec.get("openapi") or spec.get("swagger")
+        ):
+            return None
+        info = spec.get("info") or {}
+        lines = [f"# {info.get('title', 'API reference')}"]
+        if info.get("description"):
+            lines.append(info["description"])
+        for path, operations in (spec.get("paths") or {}).items():
+            if not isinstance(operations, dict):
+                continue
+            for method, operation in operations.items():
+                if method not in HTTP_METHODS or not isinstance(
+                    operation, dict
+                ):
+                    continue
+                lines.append(f"## {method.upper()} {path}")
+                for key in ("summary", "description"):
+                    if operation.get(key):
+                        lines.append(operation[key])
+                parameters = [
+                    parameter
+                    for parameter in operation.get("parameters") or []
+                    if isinstance(parameter, dict) and "name" in parameter
+                ]
+                if parameters:
+                    lines.append("Parameters:")
+                    lines.extend(
+                        f"- `{parameter['name']}` ({parameter.get('in', '')}): {parameter.get('description', '')}".rstrip(
+                            ": "
+                        )
+                        for parameter in parameters
+                    )
+                request_body = operation.get("requestBody")
+                if isinstance(request_body, dict):
+                    lines.append("Request body:")
+                    lines.append(
+                        f"```json\n{json.dumps(request_body.get('content', request_body), indent=2)[:4000]}\n```"
+                    )
+        return "\n\n".join(lines)
+
+    async def fetch_document(self, url: str, kind: str, user_id: str):
+        """:return: The markdown of a text, JSON or YAML resource, or None."""
+        try:
+            text = await self.download(url)
+            if not text or not text.strip():
+                return None
+            if kind == "text":
+                return text.strip()
+            if kind == "yaml":
+                return f"```yaml\n{text.strip()}\n```"
+            if kind == "json":
+                return self.openapi_to_markdown(json.loads(text))
+        except Exception as e:
+            await self.error_repo.insert_error(
+                Error(
+                    user_id=user_id,
+                    error_message=f"[ERROR] Failed to fetch resource {url}: {e} \n error from resource_service in fetch_document()",
+                )
+            )
+        return None
@@ -0,0 +1,212 @@
+import asyncio
+import xml.etree.ElementTree as ET
+import zlib
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+from fastapi import Depends
+
+from src.app.config.http_client import http_client
+from src.app.config.settings import settings
+from src.app.models.domain.error import Error
+from src.app.repositories.error_repository import ErrorRepo
+from src.app.state.crawler_state import CrawlerState
+
+GZIP_MAGIC = b"\x1f\x8b"
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+class SitemapService:
+    """
+    Discovers and streams the sitemaps of a documentation site.
+
+    Sitemaps are found through robots.txt `Sitemap:` lines and the usual
+    `/sitemap.xml` locations. Sitemap indexes are followed recursively and
+    concurrently, gzipped sitemaps are decompressed on the fly and every
+    document is parsed incrementally, so page entries flow to the caller as
+    they are read instead of being materialised in memory.
+    """
+
+    def __init__(
+        self, error_repo=Depends(ErrorRepo), state=Depends(CrawlerState)
+    ) -> None:
+        self.error_repo = error_repo
+        self.state = state
+        self.http_client = http_client
+        self.max_depth = settings.SITEMAP_MAX_DEPTH
+        self.max_sitemaps = settings.SITEMAP_MAX_COUNT
+        self.max_bytes = settings.SITEMAP_MAX_BYTES
+        self.concurrency = settings.SITEMAP_CONCURRENCY
+
+    async def discover(self, url: str):
+        """
+        :return: Candidate sitemap URLs for the start URL, the ones listed in
+        robots.txt first.
+        """
+        parsed = urlparse(url)
+        root = f"{parsed.scheme}://{parsed.netloc}"
+        candidates = []
+        try:
+            response = await self.http_client.get_client().get(
+                f"{root}/robots.txt"
+            )
+            if response.status_code == 200:
+                parser = RobotFileParser()
+                parser.parse(response.text.splitlines())
+                candidates.extend(parser.site_maps() or [])
+        except Exception:
+            pass
+
+        for base in dict.fromkeys([url.rstrip("/"), root]):
+            candidates.append(f"{base}/sitemap.xml")
+            candidates.append(f"{base}/sitemap_index.xml")
+        return list(dict.fromkeys(candidates))
+
+    @staticmethod
+    def scope_of(url: str):
+        """
+        Pages are kept when they live on the start URL's host, below the
+        directory of the start URL.
+        """
+        parsed = urlparse(url)
+        path = parsed.path or "/"
+        if not path.endswith("/"):
+            path = path.rsplit("/", 1)[0] + "/"
+        return parsed.netloc.removeprefix("www."), path
+
+    @staticmethod
+    def in_scope(url: str, scope) -> bool:
+        host, path = scope
+        parsed = urlparse(url)
+        return parsed.netloc.removeprefix("www.") == host and (
+            parsed.path or "/"
+        ).startswith(path)
+
+    async def parse(self, sitemap_url: str):
+        """
+        Streams one sitemap document.
+
+        :yield: ("url", entry) for pages and ("sitemap", entry) for child
+        sitemaps, entry being {"loc", "lastmod", "priority"}.
+        """
+        parser = ET.XMLPullParser(events=("start", "end"))
+        decompressor = None
+        received = 0
+        root = None
+        entry = None
+
+        async with self.http_client.get_client().stream(
+            "GET", sitemap_url
+        ) as response:
+            if response.status_code != 200:
+                return
+            async for chunk in response.aiter_bytes():
+                if decompressor is None:
+                    decompressor = (
+                        zlib.decompressobj(16 + zlib.MAX_WBITS)
+                        if chunk.startswith(GZIP_MAGIC)
+                        else False
+                    )
+                if decompressor:
+                    chunk = decompressor.decompress(chunk)
+                received += len(chunk)
+                if received > self.max_bytes:
+                    raise ValueError(
+                        f"sitemap larger than {self.max_bytes} bytes"
+                    )
+                parser.feed(chunk)
+
+                for event, elem in parser.read_events():
+                    # Image/video extension tags (image:loc) are not ours
+                    if elem.tag.startswith(SITEMAP_NS):
+                        tag = elem.tag[len(SITEMAP_NS) :]
+                    elif elem.tag.startswith("{"):
+                        tag = None
+                    else:
+                        tag = elem.tag
+                    if event == "start":
+                        if root is None:
+                            root = elem
+                        elif tag in ("url", "sitemap"):
+                            entry = {
+                                "loc": None,
+                                "lastmod": None,
+                                "priority": None,
+                            }
+                        continue
+                    if entry is not None and tag in entry:
+                        entry[tag] = (elem.text or "").strip() or None
+                    elif tag in ("url", "sitemap") and entry is not None:
+                        if entry["loc"]:
+                            yield tag, entry
+                        entry = None
+                        # Drop parsed elements to keep memory bounded
+                        root.clear()
+
+    async def iter_entries(self, url: str, user_id: str):
+        """
+        Streams the page entries of every sitemap of the start URL that are
+        in its scope, following sitemap indexes concurrently. URLs the crawl
+        has already visited or queued are skipped through its VisitedSet;
+        callers mark the entries they take as visited, which also drops the
+        duplicates listed by several sitemaps.
+        """
+        scope = self.scope_of(url)
+        entries = asyncio.Queue(maxsize=1000)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        seen_sitemaps = set()
+        tasks = set()
+        active = 0
+
+        async def read_sitemap(sitemap_url: str, depth: int):
+            nonlocal active
+            try:
+                async with semaphore:
+                    async for kind, entry in self.parse(sitemap_url):
+                        if kind == "sitemap":
+                            schedule(
+                                urljoin(sitemap_url, entry["loc"]), depth + 1
+                            )
+                        elif self.in_scope(
+                            entry["loc"], scope
+                        ) and not self.state.is_visited(entry["loc"]):
+                            await entries.put(entry)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await self.error_repo.insert_error(
+                    Error(
+                        user_id=user_id,
+                        error_message=f"[ERROR] Failed to fetch sitemap {sitemap_url}: {e} \n error from sitemap_service in iter_entries()",
+                    )
+                )
+            active -= 1
+            if active == 0:
+                await entries.put(None)
+
+        def schedule(sitemap_url: str, depth: int):
+            nonlocal active
+            if (
+                sitemap_url in seen_sitemaps
+                or depth > self.max_depth
+                or len(seen_sitemaps) >= self.max_sitemaps
+            ):
+                return
+            seen_sitemaps.add(sitemap_url)
+            active += 1
+            tasks.add(asyncio.create_task(read_sitemap(sitemap_url, depth)))
+
+        for sitemap_url in await self.discover(url):
+            schedule(sitemap_url, 0)
+        if not active:
+            return
+
+        try:
+            while True:
+                entry = await entries.get()
+                if entry is None:
+                    break
+                yield entry
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -1,7 +1,6 @@
 import asyncio
 import os
 import shutil
-import time
 
 from fastapi import Depends
 
@@ -27,6 +26,17 @@ class UpsertService:
         self.pinecone_service = pinecone_service
         self.upsert_batch_size = 100
 
+    async def get_index_host(self, dimension: int) -> str:
+        # Ensure index exists
+        available_indexes = await self.pinecone_service.list_pinecone_indexes()
+        if self.index_name not in available_indexes.keys():
+            return await self.pinecone_service.create_index(
+                index_name=settings.INDEX_NAME,
+                dimension=dimension,
+                metric="dotproduct",
+            )
+        return available_indexes[self.index_name]
+
     async def upload_vectors(self, user_id: str, file_path):
 
         # Load JSON file for Pinecone
@@ -48,16 +58,7 @@ class UpsertService:
 
         DIMENSION = len(vector_data[0]["values"])
 
-        # Ensure index exists
-        available_indexes = await self.pinecone_service.list_pinecone_indexes()
-        if self.index_name not in available_indexes.keys():
-            index_host = await self.pinecone_service.create_index(
-                index_name=settings.INDEX_NAME,
-                dimension=DIMENSION,
-                metric="dotproduct",
-            )
-        else:
-            index_host = available_indexes[self.index_name]
+        index_host = await self.get_index_host(DIMENSION)
 
         try:
             batches = [
@@ -77,7 +78,7 @@ class UpsertService:
             total_upserted = sum(
                 result.get("upsertedCount", 0) for result in batch_results
             )
-            time.sleep(15)
+            await asyncio.sleep(15)
 
         except Exception as e:
             await self.error_repo.insert_error(
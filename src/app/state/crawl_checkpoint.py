@@ -0,0 +1,185 @@
+import asyncio
+import os
+import sqlite3
+
+from src.app.config.settings import settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    file_name TEXT PRIMARY KEY,
+    start_url TEXT NOT NULL,
+    sealed INTEGER NOT NULL DEFAULT 0,
+    finished INTEGER NOT NULL DEFAULT 0,
+    weight INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS frontier (
+    file_name TEXT NOT NULL,
+    url TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    home_url TEXT NOT NULL,
+    sitemap_mode INTEGER NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (file_name, url)
+);
+CREATE TABLE IF NOT EXISTS visited (url TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS indexed (
+    file_name TEXT NOT NULL,
+    href TEXT NOT NULL,
+    PRIMARY KEY (file_name, href)
+);
+CREATE TABLE IF NOT EXISTS llm_counts (
+    file_name TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+"""
+
+
+class CrawlCheckpoint:
+    """
+    Incrementally persists a crawl job (frontier, visited URLs, pages already
+    indexed by the pipeline and LLM counters) to
+    USER_DATA/<user_id>/checkpoint.db so an interrupted job can be resumed.
+    Page contents live in the page store's own files.
+
+    Writes are buffered in memory and flushed in a worker thread every
+    CHECKPOINT_INTERVAL seconds, so the crawl never blocks on disk.
+    """
+
+    def __init__(self, user_id: str) -> None:
+        self.path = os.path.join(settings.USER_DATA, user_id, "checkpoint.db")
+        self.connection = None
+        self.pending_writes = []
+        self.llm_request_counts = {}
+        self.flush_lock = asyncio.Lock()
+        self.flush_task = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    async def open(self, llm_request_counts: dict):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.llm_request_counts = llm_request_counts
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+        columns = [
+            row[1]
+            for row in self.connection.execute("PRAGMA table_info(sources)")
+        ]
+        # Checkpoints written before source weights existed
+        if "weight" not in columns:
+            self.connection.execute(
+                "ALTER TABLE sources ADD COLUMN weight INTEGER NOT NULL DEFAULT 1"
+            )
+        self.flush_task = asyncio.create_task(self.flush_periodically())
+
+    async def close(self):
+        if self.flush_task:
+            self.flush_task.cancel()
+            await asyncio.gather(self.flush_task, return_exceptions=True)
+        await self.flush()
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+    async def flush_periodically(self):
+        while True:
+            await asyncio.sleep(settings.CHECKPOINT_INTERVAL)
+            await self.flush()
+
+    def _write(self, writes):
+        with self.connection:
+            for sql, params in writes:
+                self.connection.execute(sql, params)
+
+    async def flush(self):
+        async with self.flush_lock:
+            if not self.connection:
+                return
+            writes, self.pending_writes = self.pending_writes, []
+            writes.extend(
+                (
+                    "INSERT OR REPLACE INTO llm_counts VALUES (?, ?)",
+                    (file_name, count),
+                )
+                for file_name, count in list(self.llm_request_counts.items())
+            )
+            await asyncio.to_thread(self._write, writes)
+
+    def _queue_write(self, sql: str, params: tuple):
+        self.pending_writes.append((sql, params))
+
+    def save_source(self, file_name: str, start_url: str, weight: int = 1):
+        self._queue_write(
+            "INSERT OR IGNORE INTO sources (file_name, start_url, weight) VALUES (?, ?, ?)",
+            (file_name, start_url, weight),
+        )
+
+    def seal_source(self, file_name: str):
+        self._queue_write(
+            "UPDATE sources SET sealed = 1 WHERE file_name = ?", (file_name,)
+        )
+
+    def finish_source(self, file_name: str):
+        self._queue_write(
+            "UPDATE sources SET finished = 1 WHERE file_name = ?",
+            (file_name,),
+        )
+
+    def add_pending(self, link_info, score: float):
+        url, depth, file_name, home_url, sitemap_mode = link_info
+        self._queue_write(
+            "INSERT OR REPLACE INTO frontier VALUES (?, ?, ?, ?, ?, ?)",
+            (file_name, url, depth, home_url, int(sitemap_mode), score),
+        )
+
+    def remove_pending(self, link_info):
+        self._queue_write(
+            "DELETE FROM frontier WHERE file_name = ? AND url = ?",
+            (link_info[2], link_info[0]),
+        )
+
+    def save_visited(self, url: str):
+        self._queue_write("INSERT OR IGNORE INTO visited VALUES (?)", (url,))
+
+    def save_indexed(self, file_name: str, href: str):
+        self._queue_write(
+            "INSERT OR IGNORE INTO indexed VALUES (?, ?)", (file_name, href)
+        )
+
+    def _select(self, sql: str, params: tuple):
+        return self.connection.execute(sql, params).fetchall()
+
+    async def _read(self, sql: str, params: tuple = ()):
+        async with self.flush_lock:
+            return await asyncio.to_thread(self._select, sql, params)
+
+    async def load_sources(self):
+        """:return: Rows of (file_name, start_url, sealed, finished, weight)."""
+        return await self._read(
+            "SELECT file_name, start_url, sealed, finished, weight FROM sources"
+        )
+
+    async def load_pending(self, file_name: str):
+        """:return: Rows of ((url, depth, file_name, home_url, sitemap_mode), score)."""
+        rows = await self._read(
+            "SELECT url, depth, file_name, home_url, sitemap_mode, score FROM frontier WHERE file_name = ?",
+            (file_name,),
+        )
+        return [
+            ((url, depth, name, home_url, bool(sitemap_mode)), score)
+            for url, depth, name, home_url, sitemap_mode, score in rows
+        ]
+
+    async def load_visited(self):
+        rows = await self._read("SELECT url FROM visited")
+        return [row[0] for row in rows]
+
+    async def load_indexed(self, file_name: str):
+        rows = await self._read(
+            "SELECT href FROM indexed WHERE file_name = ?", (file_name,)
+        )
+        return {row[0] for row in rows}
+
+    async def load_llm_counts(self):
+        rows = await self._read("SELECT file_name, count FROM llm_counts")
+        return dict(rows)
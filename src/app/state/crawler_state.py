@@ -1,21 +1,135 @@
 import asyncio
 
 from src.app.config.settings import settings
+from src.app.models.domain.page_record import PageRecord
+from src.app.state.frontier import Frontier
+from src.app.state.host_scheduler import (
+    THROTTLE_STATUS_CODES,
+    SlotOutcome,
+    host_scheduler,
+)
+from src.app.state.page_store import PageStore
+from src.app.state.trap_detector import TrapDetector
+from src.app.state.visited_set import VisitedSet
+from src.app.utils.url_canonicalizer import UrlCanonicalizer
 
 
 class CrawlerState:
+    """
+    State of one crawl job. A new instance is created per request through
+    FastAPI's dependency injection and shared by the crawler usecase, service
+    and helpers of that request, so concurrent jobs never see each other's
+    queue, results or counters.
+    """
+
     def __init__(self):
         # Common shared variables
         self.total_input_tokens = 0
         self.total_output_tokens = 0
         self.llm_request_counts = {}
         self.count_locks = {}
-        self.results = {}
-        self.processed_urls = set()
-        self.queue = asyncio.Queue()
-        self.mini_queue = asyncio.Queue()
+        # Canonical forms of the visited or queued URLs
+        self.processed_urls = VisitedSet()
+        self.canonicalizer = UrlCanonicalizer()
+        self.results = PageStore(self.canonicalizer)
+        self.trap_detector = TrapDetector()
+        # URL fingerprint -> in-degree, for queued and candidate URLs only
+        self.link_in_degree = {}
+        self.queue = Frontier()
+        self.queue.on_dequeue = self.forget_in_degree
         self.max_llm_request_count = settings.MAX_LLM_REQUEST_COUNT
         self.file_names = []
+        self.host_scheduler = host_scheduler
+        self.retried_urls = set()
+        self.checkpoint = None
+        self.progress = {"pages_crawled": 0}
+        self.crawled_pages = asyncio.Queue()
+        self.pages_pending = {}
+        self.pages_done = {}
+        self.snippet_stats = {}
+
+    def set_checkpoint(self, checkpoint):
+        self.checkpoint = checkpoint
+        self.queue.checkpoint = checkpoint
+
+    def is_visited(self, url: str) -> bool:
+        return self.canonicalizer.canonicalize(url) in self.processed_urls
+
+    def mark_visited(self, url: str):
+        self.processed_urls.add(self.canonicalizer.canonicalize(url))
+        if self.checkpoint:
+            self.checkpoint.save_visited(url)
+
+    def in_degree_key(self, url: str) -> int:
+        return VisitedSet.fingerprint(self.canonicalizer.canonicalize(url))
+
+    def in_degree_of(self, url: str) -> int:
+        return self.link_in_degree.get(self.in_degree_key(url), 0)
+
+    def count_in_link(self, url: str) -> int:
+        """:return: The in-degree of `url` including this link."""
+        key = self.in_degree_key(url)
+        in_degree = self.link_in_degree.get(key, 0) + 1
+        self.link_in_degree[key] = in_degree
+        return in_degree
+
+    def forget_in_degree(self, url: str):
+        """Drops the count of a URL that left the frontier or was rejected."""
+        self.link_in_degree.pop(self.in_degree_key(url), None)
+
+    def restore_visited(self, urls):
+        self.processed_urls.update(
+            self.canonicalizer.canonicalize(url) for url in urls
+        )
+
+    def add_result(self, file_name: str, page: dict):
+        page = PageRecord.from_dict(page)
+        if not self.results.add(file_name, page):
+            print(f"[CRAWL] Skipping {page.href}, same content as another page")
+            return
+        self.progress["pages_crawled"] = (
+            self.progress.get("pages_crawled", 0) + 1
+        )
+        self.queue_page(file_name, page.href)
+
+    def record_snippet_stats(self, file_name: str, screened: bool, hit: bool):
+        """Counts how many pages passed the snippet pre-screen and paid off."""
+        stats = self.snippet_stats.setdefault(
+            file_name, {"pages": 0, "screened_in": 0, "hits": 0}
+        )
+        stats["pages"] += 1
+        stats["screened_in"] += int(screened)
+        stats["hits"] += int(hit)
+
+    def _pages_done(self, file_name: str) -> asyncio.Event:
+        if file_name not in self.pages_done:
+            self.pages_done[file_name] = asyncio.Event()
+            self.pages_done[file_name].set()
+        return self.pages_done[file_name]
+
+    def queue_page(self, file_name: str, href: str):
+        """Hands a finished page to the page worker, by URL only."""
+        self.pages_pending[file_name] = self.pages_pending.get(file_name, 0) + 1
+        self._pages_done(file_name).clear()
+        self.crawled_pages.put_nowait((file_name, href))
+
+    def page_processed(self, file_name: str):
+        self.pages_pending[file_name] -= 1
+        if self.pages_pending[file_name] <= 0:
+            self._pages_done(file_name).set()
+
+    async def wait_pages(self, file_name: str):
+        """Waits until every queued page of a source has been post-processed."""
+        await self._pages_done(file_name).wait()
+
+    def should_retry(self, url: str, outcome: SlotOutcome) -> bool:
+        """Throttled pages are queued again once instead of being dropped."""
+        if outcome.status_code not in THROTTLE_STATUS_CODES:
+            return False
+        if url in self.retried_urls:
+            return False
+        self.retried_urls.add(url)
+        return True
 
     async def get_lock(self, file_name: str) -> asyncio.Lock:
         if file_name not in self.count_locks:
@@ -27,6 +141,3 @@ class CrawlerState:
         async with lock:
             current = self.llm_request_counts.get(file_name, 0)
             self.llm_request_counts[file_name] = current + 1
-
-
-crawler_state = CrawlerState()
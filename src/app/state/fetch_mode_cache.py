@@ -0,0 +1,40 @@
+from src.app.state.json_cache import JsonCache
+
+
+class FetchModeCache(JsonCache):
+    """
+    Remembers per domain whether pages could be fetched as static HTML or
+    needed the browser, so later jobs skip the path that does not work.
+    """
+
+    def __init__(self, min_samples: int = 3, probe_interval: int = 50):
+        super().__init__("fetch_modes.json")
+        self.min_samples = min_samples
+        self.probe_interval = probe_interval
+        self.skipped = {}
+
+    def prefers_browser(self, domain: str) -> bool:
+        counts = self.data.get(domain, {})
+        static_count = counts.get("static", 0)
+        browser_count = counts.get("browser", 0)
+        return (
+            static_count + browser_count >= self.min_samples
+            and browser_count > static_count
+        )
+
+    def should_try_static(self, domain: str) -> bool:
+        """
+        Static fetches are skipped for browser-only domains, except for one
+        probe every `probe_interval` pages in case the site changed.
+        """
+        if not self.prefers_browser(domain):
+            return True
+        self.skipped[domain] = self.skipped.get(domain, 0) + 1
+        return self.skipped[domain] % self.probe_interval == 0
+
+    def record(self, domain: str, mode: str):
+        counts = self.data.setdefault(domain, {"static": 0, "browser": 0})
+        counts[mode] = counts.get(mode, 0) + 1
+
+
+fetch_mode_cache = FetchModeCache()
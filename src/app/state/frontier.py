@@ -0,0 +1,206 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+from src.app.config.settings import settings
+
+
+class SourceQueue:
+    def __init__(self, weight: int):
+        self.weight = weight
+        self.current_weight = 0
+        self.heap = []
+        self.entries = {}
+        self.size = 0
+        self.unfinished = 0
+        self.dequeued = 0
+        self.started_at = time.monotonic()
+        self.exhausted = False
+        self.done = asyncio.Event()
+
+
+class Frontier:
+    """
+    Crawl frontier with one sub-queue per source (file name).
+
+    Sources are served with smooth weighted round-robin so a huge sitemap
+    cannot starve smaller sources; the weights come from the scrape request,
+    1 each by default. Each source can be capped by a page and time budget.
+    Within a source, pages are served by descending score.
+    It keeps the asyncio.Queue interface used by the workers, except that
+    `put` takes an optional score and `task_done` takes the finished item.
+    """
+
+    def __init__(self):
+        self.sources = {}
+        self.unfinished = 0
+        self.counter = itertools.count()
+        self.checkpoint = None
+        # Called with the URL of every entry leaving the frontier
+        self.on_dequeue = None
+        self.not_empty = asyncio.Event()
+        self.all_done = asyncio.Event()
+        self.all_done.set()
+        self.max_pages = settings.SOURCE_MAX_PAGES
+        self.max_seconds = settings.SOURCE_MAX_SECONDS
+
+    def add_source(self, file_name: str, weight: int = 1):
+        """
+        Registers a source before it is seeded. The source holds an open
+        seeding token until `seal` is called, so it cannot be reported as
+        done while its start URLs are still being queued.
+        """
+        source = self.sources.setdefault(file_name, SourceQueue(weight))
+        self._add_unfinished(source)
+
+    def seal(self, file_name: str):
+        self._finish(self.sources[file_name])
+        if self.checkpoint:
+            self.checkpoint.seal_source(file_name)
+
+    def _add_unfinished(self, source: SourceQueue):
+        source.unfinished += 1
+        source.done.clear()
+        self.unfinished += 1
+        self.all_done.clear()
+
+    def _finish(self, source: SourceQueue):
+        source.unfinished -= 1
+        self.unfinished -= 1
+        if source.unfinished <= 0:
+            source.done.set()
+        if self.unfinished <= 0:
+            self.all_done.set()
+
+    def _over_budget(self, source: SourceQueue) -> bool:
+        if self.max_pages and source.dequeued >= self.max_pages:
+            return True
+        if (
+            self.max_seconds
+            and time.monotonic() - source.started_at >= self.max_seconds
+        ):
+            return True
+        return False
+
+    def _exhaust(self, file_name: str, source: SourceQueue):
+        print(f"[FRONTIER] Budget reached for {file_name}")
+        source.exhausted = True
+        for entry in source.entries.values():
+            self._finish(source)
+            if self.checkpoint:
+                self.checkpoint.remove_pending(entry[2])
+            if self.on_dequeue:
+                self.on_dequeue(entry[2][0])
+        source.heap = []
+        source.entries = {}
+        source.size = 0
+
+    def _pop_best(self, source: SourceQueue):
+        while source.heap:
+            _, _, item, valid = heapq.heappop(source.heap)
+            if valid:
+                del source.entries[item[0]]
+                source.size -= 1
+                if self.on_dequeue:
+                    self.on_dequeue(item[0])
+                return item
+        return None
+
+    def _pop(self):
+        """Picks the next item with smooth weighted round-robin."""
+        while True:
+            candidates = [
+                (file_name, source)
+                for file_name, source in self.sources.items()
+                if source.size
+            ]
+            if not candidates:
+                return None
+
+            total_weight = 0
+            for _, source in candidates:
+                source.current_weight += source.weight
+                total_weight += source.weight
+            file_name, source = max(
+                candidates, key=lambda x: x[1].current_weight
+            )
+            source.current_weight -= total_weight
+
+            if self._over_budget(source):
+                self._exhaust(file_name, source)
+                continue
+            source.dequeued += 1
+            return self._pop_best(source)
+
+    def _push(self, source: SourceQueue, item, score: float):
+        entry = [-score, next(self.counter), item, True]
+        source.entries[item[0]] = entry
+        heapq.heappush(source.heap, entry)
+
+    async def put(self, item, score: float = 0.0):
+        file_name = item[2]
+        if file_name not in self.sources:
+            self.sources[file_name] = SourceQueue(1)
+        source = self.sources[file_name]
+        if source.exhausted:
+            return
+        queued = source.entries.get(item[0])
+        if queued is not None:
+            # Already waiting, only keep the better score
+            if score > -queued[0]:
+                self.boost(file_name, item[0], score + queued[0])
+            return
+        self._push(source, item, score)
+        source.size += 1
+        if self.checkpoint:
+            self.checkpoint.add_pending(item, score)
+        self._add_unfinished(source)
+        self.not_empty.set()
+
+    def is_queued(self, file_name: str, url: str) -> bool:
+        source = self.sources.get(file_name)
+        return bool(source) and url in source.entries
+
+    def boost(self, file_name: str, url: str, amount: float):
+        """Raises the score of a queued URL (lazy re-push, stale entry skipped)."""
+        source = self.sources.get(file_name)
+        entry = source.entries.get(url) if source else None
+        if entry is None or not amount:
+            return
+        entry[3] = False
+        self._push(source, entry[2], -entry[0] + amount)
+
+    def get_nowait(self):
+        item = self._pop()
+        if item is None:
+            raise asyncio.QueueEmpty
+        return item
+
+    async def get(self):
+        while True:
+            item = self._pop()
+            if item is not None:
+                return item
+            self.not_empty.clear()
+            await self.not_empty.wait()
+
+    def task_done(self, item):
+        source = self.sources[item[2]]
+        self._finish(source)
+        # A throttled page may have been queued again while it was processed
+        if self.checkpoint and item[0] not in source.entries:
+            self.checkpoint.remove_pending(item)
+
+    def empty(self) -> bool:
+        return not any(source.size for source in self.sources.values())
+
+    def qsize(self) -> int:
+        return sum(source.size for source in self.sources.values())
+
+    async def join(self):
+        await self.all_done.wait()
+
+    async def wait_source(self, file_name: str):
+        """Waits until every queued page of a source has been processed."""
+        await self.sources[file_name].done.wait()
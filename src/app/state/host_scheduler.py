@@ -0,0 +1,165 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import List
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+from src.app.config.http_client import http_client
+from src.app.config.settings import settings
+
+THROTTLE_STATUS_CODES = {429, 503}
+
+
+class SlotOutcome:
+    def __init__(self):
+        self.status_code = None
+        self.failed = False
+        self.retry_after = None
+        # Set when the static fetch found a non-HTML or oversized page
+        self.content_type = None
+        self.too_large = False
+
+
+class HostState:
+    def __init__(self, limit: float, crawl_delay: float):
+        self.limit = limit
+        self.crawl_delay = crawl_delay
+        self.active = 0
+        self.next_request_at = 0.0
+        self.latency = None
+        self.condition = asyncio.Condition()
+
+    def capacity(self) -> int:
+        # Hosts that ask for a crawl delay are fetched one page at a time
+        limit = 1 if self.crawl_delay else max(1, int(self.limit))
+        return limit - self.active
+
+
+class HostScheduler:
+    """
+    Per-host politeness for the crawl workers.
+
+    Every host gets its own concurrency limit that grows additively while
+    pages come back fast and is halved on throttling, errors and timeouts
+    (AIMD). robots.txt `Crawl-delay` is respected between requests.
+    One scheduler is shared by all crawl jobs, so concurrent jobs hitting the
+    same host stay within the same limits.
+    """
+
+    def __init__(self):
+        self.hosts = {}
+        self.initial_limit = settings.HOST_INITIAL_CONCURRENCY
+        self.max_limit = settings.HOST_MAX_CONCURRENCY
+        self.target_latency = settings.HOST_TARGET_LATENCY
+        self.max_crawl_delay = settings.HOST_MAX_CRAWL_DELAY
+
+    async def fetch_crawl_delay(self, host: str, scheme: str) -> float:
+        try:
+            response = await http_client.get_client().get(
+                f"{scheme}://{host}/robots.txt"
+            )
+            if response.status_code != 200:
+                return 0.0
+            parser = RobotFileParser()
+            parser.parse(response.text.splitlines())
+            delay = parser.crawl_delay("DocCrawler")
+            if delay is None:
+                rate = parser.request_rate("DocCrawler")
+                delay = rate.seconds / rate.requests if rate else 0.0
+            return min(float(delay), self.max_crawl_delay)
+        except Exception:
+            return 0.0
+
+    async def create_host(self, host: str, scheme: str) -> HostState:
+        crawl_delay = await self.fetch_crawl_delay(host, scheme)
+        return HostState(self.initial_limit, crawl_delay)
+
+    async def get_host(self, url: str) -> HostState:
+        parsed = urlparse(url)
+        if parsed.netloc not in self.hosts:
+            self.hosts[parsed.netloc] = asyncio.create_task(
+                self.create_host(parsed.netloc, parsed.scheme or "https")
+            )
+        return await asyncio.shield(self.hosts[parsed.netloc])
+
+    async def wait_for_turn(self, state: HostState):
+        wait = state.next_request_at - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        if state.crawl_delay:
+            state.next_request_at = time.monotonic() + state.crawl_delay
+
+    async def acquire(self, url: str) -> HostState:
+        state = await self.get_host(url)
+        async with state.condition:
+            await state.condition.wait_for(lambda: state.capacity() > 0)
+            state.active += 1
+        await self.wait_for_turn(state)
+        return state
+
+    async def acquire_wave(self, urls: List[str]) -> List[str]:
+        """
+        Acquire slots for as many of `urls` as their hosts currently allow.
+        Blocks only until the first URL gets a slot, so a caller never waits
+        while holding other slots.
+        """
+        await self.acquire(urls[0])
+        acquired = [urls[0]]
+        for url in urls[1:]:
+            state = await self.get_host(url)
+            if state.crawl_delay:
+                continue
+            async with state.condition:
+                if state.capacity() > 0:
+                    state.active += 1
+                    acquired.append(url)
+        return acquired
+
+    async def release(self, url: str, latency: float, outcome: SlotOutcome):
+        state = await self.get_host(url)
+        async with state.condition:
+            state.active -= 1
+            self.adjust_limit(state, latency, outcome)
+            state.condition.notify_all()
+
+    def adjust_limit(self, state: HostState, latency, outcome: SlotOutcome):
+        throttled = outcome.status_code in THROTTLE_STATUS_CODES
+        if throttled or outcome.failed:
+            state.limit = max(1.0, state.limit / 2)
+            if outcome.retry_after:
+                state.next_request_at = max(
+                    state.next_request_at,
+                    time.monotonic()
+                    + min(outcome.retry_after, self.max_crawl_delay),
+                )
+            return
+
+        state.latency = (
+            latency
+            if state.latency is None
+            else 0.8 * state.latency + 0.2 * latency
+        )
+        if state.latency > self.target_latency:
+            state.limit = max(1.0, state.limit * 0.9)
+        else:
+            state.limit = min(
+                float(self.max_limit), state.limit + 1 / state.limit
+            )
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Hold one of the host's slots while the page is being fetched."""
+        await self.acquire(url)
+        outcome = SlotOutcome()
+        start_time = time.monotonic()
+        try:
+            yield outcome
+        except Exception:
+            outcome.failed = True
+            raise
+        finally:
+            await self.release(url, time.monotonic() - start_time, outcome)
+
+
+host_scheduler = HostScheduler()
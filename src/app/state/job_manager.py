@@ -0,0 +1,87 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+from src.app.config.settings import settings
+from src.app.models.domain.job import Job
+
+
+class JobManager:
+    """
+    Runs scrape jobs in the background so the API answers immediately.
+
+    Jobs are queued and executed by a fixed number of workers, which bounds
+    how many pipelines run at once. Job records are kept in memory, the
+    oldest finished ones are dropped once JOB_HISTORY_SIZE is exceeded.
+    """
+
+    def __init__(self, max_concurrent_jobs: int, history_size: int):
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.history_size = history_size
+        self.jobs = OrderedDict()
+        self.queue = None
+        self.workers = []
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self.workers = [
+            asyncio.create_task(self.worker())
+            for _ in range(self.max_concurrent_jobs)
+        ]
+
+    async def close(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    def submit(self, job: Job, run) -> Job:
+        """
+        Queues a job. `run` is a coroutine function that executes the job and
+        returns its result.
+        """
+        self.jobs[job.job_id] = job
+        self.queue.put_nowait((job, run))
+        self._trim_history()
+        return job
+
+    def get(self, job_id: str) -> Job:
+        return self.jobs.get(job_id)
+
+    def list(self):
+        return list(self.jobs.values())
+
+    def _trim_history(self):
+        finished = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.status in ("completed", "failed")
+        ]
+        for job_id in finished[: max(0, len(self.jobs) - self.history_size)]:
+            del self.jobs[job_id]
+
+    async def worker(self):
+        while True:
+            job, run = await self.queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                job.result = await run()
+                job.status = "completed"
+            except asyncio.CancelledError:
+                job.status = "failed"
+                job.error = "Job cancelled during shutdown"
+                raise
+            except Exception as e:
+                job.status = "failed"
+                job.error = getattr(e, "detail", None) or str(e)
+                print(f"[JOB] {job.job_id} failed: {job.error}")
+            finally:
+                job.finished_at = time.time()
+                self.queue.task_done()
+
+
+job_manager = JobManager(
+    max_concurrent_jobs=settings.MAX_CONCURRENT_JOBS,
+    history_size=settings.JOB_HISTORY_SIZE,
+)
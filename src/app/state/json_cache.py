@@ -0,0 +1,36 @@
+import asyncio
+import json
+import os
+
+import aiofiles
+
+from src.app.config.settings import settings
+
+
+class JsonCache:
+    """
+    A dictionary persisted as a JSON file in the cache directory so that
+    what one crawl job learns is available to the next one.
+    """
+
+    def __init__(self, file_name: str) -> None:
+        self.path = os.path.join(settings.CACHE_DIR, file_name)
+        self.data = {}
+        self.lock = asyncio.Lock()
+
+    async def load(self):
+        try:
+            if os.path.exists(self.path):
+                async with aiofiles.open(self.path, "r", encoding="utf-8") as f:
+                    self.data = json.loads(await f.read())
+        except Exception as e:
+            print(f"[CACHE] Ignoring unreadable cache {self.path}: {e}")
+            self.data = {}
+
+    async def save(self):
+        async with self.lock:
+            os.makedirs(settings.CACHE_DIR, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            async with aiofiles.open(tmp_path, "w", encoding="utf-8") as f:
+                await f.write(json.dumps(self.data, ensure_ascii=False))
+            os.replace(tmp_path, self.path)
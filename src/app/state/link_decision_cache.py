@@ -0,0 +1,74 @@
+import time
+from urllib.parse import urlparse
+
+from src.app.config.settings import settings
+from src.app.state.json_cache import JsonCache
+
+
+class LinkDecisionCache(JsonCache):
+    """
+    Remembers per domain which URLs the GPT link filter kept or rejected,
+    so a link is classified once instead of on every page that links to it
+    and on every re-crawl of the site.
+
+    Decisions expire after `ttl` seconds and each domain keeps at most
+    `max_per_domain` of them, the oldest being evicted first.
+    """
+
+    def __init__(
+        self,
+        ttl: float = settings.LINK_DECISION_TTL,
+        max_per_domain: int = settings.LINK_DECISION_MAX_PER_DOMAIN,
+    ):
+        super().__init__("link_decisions.json")
+        self.ttl = ttl
+        self.max_per_domain = max_per_domain
+
+    @staticmethod
+    def domain_of(url: str) -> str:
+        return urlparse(url).netloc.lower().removeprefix("www.")
+
+    def lookup(self, urls):
+        """
+        :return: (kept, rejected, unknown) URLs, unknown ones having no
+        fresh decision in the cache.
+        """
+        now = time.time()
+        kept = []
+        rejected = []
+        unknown = []
+        for url in urls:
+            decision = self.data.get(self.domain_of(url), {}).get(url)
+            if decision is None or now - decision[1] > self.ttl:
+                unknown.append(url)
+            elif decision[0]:
+                kept.append(url)
+            else:
+                rejected.append(url)
+        return kept, rejected, unknown
+
+    def record(self, urls, kept_urls):
+        now = time.time()
+        kept_urls = set(kept_urls)
+        touched = set()
+        for url in urls:
+            domain = self.domain_of(url)
+            decisions = self.data.setdefault(domain, {})
+            # Re-insert so dict order stays oldest first
+            decisions.pop(url, None)
+            decisions[url] = [int(url in kept_urls), now]
+            touched.add(domain)
+        for domain in touched:
+            self.evict(domain, now)
+
+    def evict(self, domain: str, now: float):
+        decisions = self.data[domain]
+        for url in list(decisions):
+            if len(decisions) <= self.max_per_domain and (
+                now - decisions[url][1] <= self.ttl
+            ):
+                break
+            del decisions[url]
+
+
+link_decision_cache = LinkDecisionCache()
@@ -0,0 +1,227 @@
+import os
+
+from src.app.config.settings import settings
+from src.app.models.domain.page_record import PageRecord
+from src.app.utils.page_file import (
+    decode_page,
+    encode_page,
+    iter_records,
+    page_file_path,
+    use_zstd,
+)
+
+
+class PageSource:
+    def __init__(self, path: str, compressed: bool) -> None:
+        self.path = path
+        self.compressed = compressed
+        self.writer = None
+        self.size = 0
+        self.versions = 0
+        # canonical URL -> (offset, length) of the page's latest version
+        self.index = {}
+        self.content_hashes = set()
+
+
+class PageStore:
+    """
+    The crawled pages of a job, written to an append-only page file per
+    source (USER_DATA/<user_id>/results/<file_name>.jsonl, or zstd
+    compressed frames) as soon as they are crawled.
+
+    Only an index of canonical URL to file offset stays in memory, so memory
+    does not grow with the size of the markdown. Pages are looked up and
+    replaced in constant time (adding a page again appends a new version)
+    and whole sources are read back as a stream. With PAGE_DEDUPE_CONTENT, a
+    page whose content is identical to a page already stored for the same
+    source is not stored again and is counted in `skipped`.
+    """
+
+    def __init__(self, canonicalizer) -> None:
+        self.canonicalizer = canonicalizer
+        self.directory = None
+        self.compressed = False
+        self.dedupe_content = settings.PAGE_DEDUPE_CONTENT
+        self.sources = {}
+        self.skipped = {}
+
+    def open(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.compressed = use_zstd()
+
+    def close(self):
+        for source in self.sources.values():
+            self.close_source(source)
+
+    @staticmethod
+    def close_source(source: PageSource):
+        if source.writer:
+            source.writer.close()
+            source.writer = None
+
+    def key_of(self, url: str) -> str:
+        """
+        Canonical URL of a page. Fragments are kept, since llms-full.txt
+        sections are stored as separate pages of the same document.
+        """
+        _, hash_sign, fragment = url.partition("#")
+        key = self.canonicalizer.canonicalize(url)
+        return f"{key}#{fragment}" if hash_sign and fragment else key
+
+    def _source(self, file_name: str) -> PageSource:
+        if file_name not in self.sources:
+            self.sources[file_name] = PageSource(
+                page_file_path(self.directory, file_name, self.compressed),
+                self.compressed,
+            )
+        return self.sources[file_name]
+
+    def set_source(self, file_name: str, resume: bool = False) -> int:
+        """
+        Registers a source. A resumed source rebuilds its index from the
+        pages already on disk.
+
+        :return: The number of pages already stored.
+        """
+        for compressed in (False, True):
+            path = page_file_path(self.directory, file_name, compressed)
+            if resume and os.path.exists(path):
+                source = PageSource(path, compressed)
+                self.sources[file_name] = source
+                self._rebuild_index(source)
+                return len(source.index)
+            if os.path.exists(path):
+                os.remove(path)
+        self.sources[file_name] = PageSource(
+            page_file_path(self.directory, file_name, self.compressed),
+            self.compressed,
+        )
+        return 0
+
+    def _rebuild_index(self, source: PageSource):
+        for offset, data in self._scan(source):
+            try:
+                page = decode_page(data, source.compressed)
+            except Exception:
+                # A torn last write from an interrupted job
+                break
+            source.index[self.key_of(page["href"])] = (offset, len(data))
+            if self.dedupe_content:
+                source.content_hashes.add(
+                    PageRecord.hash_content(page["content"])
+                )
+            source.size = offset + len(data)
+            source.versions += 1
+        with open(source.path, "ab") as f:
+            f.truncate(source.size)
+
+    def _scan(self, source: PageSource):
+        """:yield: (offset, raw bytes) of every stored page version."""
+        with open(source.path, "rb") as f:
+            yield from iter_records(f, source.compressed)
+
+    def _append(self, source: PageSource, page: dict):
+        data = encode_page(page, source.compressed)
+        if source.writer is None:
+            source.writer = open(source.path, "ab")
+        offset = source.size
+        source.writer.write(data)
+        source.writer.flush()
+        source.size += len(data)
+        source.versions += 1
+        return offset, len(data)
+
+    def _read(self, source: PageSource, location) -> dict:
+        offset, length = location
+        with open(source.path, "rb") as f:
+            f.seek(offset)
+            return decode_page(f.read(length), source.compressed)
+
+    def add(self, file_name: str, record: PageRecord) -> bool:
+        """:return: False when the page duplicates the content of another one."""
+        source = self._source(file_name)
+        key = self.key_of(record.href)
+        if (
+            self.dedupe_content
+            and key not in source.index
+            and record.content_hash in source.content_hashes
+        ):
+            self.skipped[file_name] = self.skipped.get(file_name, 0) + 1
+            return False
+        source.index[key] = self._append(source, record.to_dict())
+        if self.dedupe_content:
+            source.content_hashes.add(record.content_hash)
+        return True
+
+    def get(self, file_name: str, url: str):
+        source = self.sources.get(file_name)
+        location = source.index.get(self.key_of(url)) if source else None
+        if location is None:
+            return None
+        return PageRecord.from_dict(self._read(source, location))
+
+    def iter_pages(self, file_name: str):
+        """Streams the latest version of every page of a source, as dicts."""
+        source = self.sources.get(file_name)
+        if source is None:
+            return
+        yield from self.iter_pages_of(source)
+
+    def iter_pages_of(self, source: PageSource):
+        if not os.path.exists(source.path):
+            return
+        if source.writer:
+            source.writer.flush()
+        current = set(source.index.values())
+        for offset, data in self._scan(source):
+            if (offset, len(data)) in current:
+                yield decode_page(data, source.compressed)
+
+    def reader(self, file_name: str):
+        """:return: A re-iterable stream over the pages of a source."""
+        return PageReader(self, file_name)
+
+    def finish(self, file_name: str):
+        """
+        Closes the page file of a source once it is fully crawled, and
+        rewrites it without the superseded versions of replaced pages so
+        plain readers of the file see every page once.
+        """
+        source = self.sources.get(file_name)
+        if not source:
+            return
+        self.close_source(source)
+        if source.versions > len(source.index):
+            self._compact(source)
+
+    def _compact(self, source: PageSource):
+        path = source.path + ".tmp"
+        index = {}
+        size = 0
+        with open(path, "wb") as f:
+            for page in self.iter_pages_of(source):
+                data = encode_page(page, source.compressed)
+                f.write(data)
+                index[self.key_of(page["href"])] = (size, len(data))
+                size += len(data)
+        os.replace(path, source.path)
+        source.index = index
+        source.size = size
+        source.versions = len(index)
+
+    def count(self, file_name: str) -> int:
+        source = self.sources.get(file_name)
+        return len(source.index) if source else 0
+
+
+class PageReader:
+    def __init__(self, store: PageStore, file_name: str) -> None:
+        self.store = store
+        self.file_name = file_name
+
+    def __iter__(self):
+        return self.store.iter_pages(self.file_name)
+
+    def __len__(self):
+        return self.store.count(self.file_name)
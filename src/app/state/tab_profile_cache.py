@@ -0,0 +1,55 @@
+from src.app.config.crawler_config import SELECTOR_HIERARCHY
+from src.app.config.settings import settings
+from src.app.state.json_cache import JsonCache
+
+
+class TabProfileCache(JsonCache):
+    """
+    Learns per domain which language-tab widget (selector and interaction)
+    yields hidden code snippets. The first `learn_pages` pages of a domain
+    try the whole SELECTOR_HIERARCHY, later pages only the strategies that
+    produced code, and domains where none did are skipped. One page every
+    `probe_interval` tries the whole hierarchy again in case the site changed;
+    skipped pages count towards it too, so skipped domains are re-probed.
+    """
+
+    def __init__(
+        self,
+        learn_pages: int = settings.TAB_PROFILE_LEARN_PAGES,
+        probe_interval: int = settings.TAB_PROFILE_PROBE_INTERVAL,
+    ):
+        super().__init__("tab_profiles.json")
+        self.learn_pages = learn_pages
+        self.probe_interval = probe_interval
+        self.selector_order = {
+            selector: index for index, selector in enumerate(SELECTOR_HIERARCHY)
+        }
+
+    def full_hierarchy(self):
+        return [[selector, "any"] for selector in SELECTOR_HIERARCHY]
+
+    def strategies_for(self, domain: str):
+        """
+        :return: The [selector, mode] strategies to try on the next page of
+        the domain, or an empty list when the page should be skipped.
+        """
+        profile = self.data.get(domain)
+        if profile is None or profile["pages"] < self.learn_pages:
+            return self.full_hierarchy()
+        profile["seen"] = profile.get("seen", 0) + 1
+        if profile["seen"] % self.probe_interval == 0:
+            return self.full_hierarchy()
+        strategies = [key.rsplit("|", 1) for key in profile["strategies"]]
+        return sorted(
+            strategies,
+            key=lambda strategy: self.selector_order.get(strategy[0], 0),
+        )
+
+    def record(self, domain: str, productive):
+        profile = self.data.setdefault(domain, {"pages": 0, "strategies": {}})
+        profile["pages"] += 1
+        for key in productive:
+            profile["strategies"][key] = profile["strategies"].get(key, 0) + 1
+
+
+tab_profile_cache = TabProfileCache()
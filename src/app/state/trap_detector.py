@@ -0,0 +1,107 @@
+import re
+from urllib.parse import parse_qsl, urlparse
+
+from src.app.config.settings import settings
+from src.app.state.visited_set import VisitedSet
+
+DIGITS = re.compile(r"\d+")
+HEX_ID = re.compile(r"^(?=[^/]*\d)[0-9a-f-]{16,}$", re.IGNORECASE)
+
+
+class TrapDetector:
+    """
+    Detects crawl traps (calendars, endless pagination, search pages, session
+    parameters) that generate unbounded unique URLs within one depth level.
+
+    URLs are grouped into patterns where numbers and ids are wildcards and
+    only query keys are kept. A pattern stops being expanded once it produced
+    too many URLs or one of its query parameters took too many values, and
+    URLs with repeating path segments or very deep paths are never expanded.
+    """
+
+    def __init__(self) -> None:
+        self.max_pattern_urls = settings.TRAP_MAX_PATTERN_URLS
+        self.max_param_values = settings.TRAP_MAX_PARAM_VALUES
+        self.max_segment_repeats = settings.TRAP_MAX_SEGMENT_REPEATS
+        self.max_path_depth = settings.TRAP_MAX_PATH_DEPTH
+        self.seen = VisitedSet()
+        self.pattern_counts = {}
+        self.param_values = {}
+        self.blocked_patterns = set()
+
+    @staticmethod
+    def generalize(segment: str) -> str:
+        if HEX_ID.match(segment):
+            return "{id}"
+        return DIGITS.sub("{n}", segment)
+
+    def pattern_of(self, url: str):
+        """:return: (path pattern, query keys) of the URL."""
+        parsed = urlparse(url)
+        segments = [s for s in parsed.path.split("/") if s]
+        path_pattern = "/".join(
+            [parsed.netloc.lower()] + [self.generalize(s) for s in segments]
+        )
+        keys = sorted(
+            {key for key, _ in parse_qsl(parsed.query, keep_blank_values=True)}
+        )
+        return path_pattern, keys
+
+    def has_repeating_segments(self, segments) -> bool:
+        counts = {}
+        for segment in segments:
+            counts[segment] = counts.get(segment, 0) + 1
+            if counts[segment] > self.max_segment_repeats:
+                return True
+        # Repeated runs such as /a/b/a/b/
+        for size in range(2, len(segments) // 2 + 1):
+            for start in range(len(segments) - 2 * size + 1):
+                if (
+                    segments[start : start + size]
+                    == segments[start + size : start + 2 * size]
+                ):
+                    return True
+        return False
+
+    def block(self, pattern: str, reason: str):
+        if pattern not in self.blocked_patterns:
+            print(f"[TRAP] Not expanding {pattern}: {reason}")
+            self.blocked_patterns.add(pattern)
+
+    def allow(self, url: str) -> bool:
+        """
+        Records a newly discovered URL.
+        :return: False when the URL looks like part of a crawl trap.
+        """
+        parsed = urlparse(url)
+        segments = [s for s in parsed.path.split("/") if s]
+        if len(segments) > self.max_path_depth:
+            return False
+        if self.has_repeating_segments(segments):
+            return False
+
+        path_pattern, keys = self.pattern_of(url)
+        pattern = f"{path_pattern}?{'&'.join(keys)}" if keys else path_pattern
+        if pattern in self.blocked_patterns:
+            return False
+        if url in self.seen:
+            return True
+        self.seen.add(url)
+
+        self.pattern_counts[pattern] = self.pattern_counts.get(pattern, 0) + 1
+        if self.pattern_counts[pattern] > self.max_pattern_urls:
+            self.block(pattern, f"more than {self.max_pattern_urls} URLs")
+            return False
+
+        for key, value in parse_qsl(parsed.query, keep_blank_values=True):
+            values = self.param_values.setdefault((path_pattern, key), set())
+            if value in values:
+                continue
+            values.add(value)
+            if len(values) > self.max_param_values:
+                self.block(
+                    pattern,
+                    f"parameter {key} took more than {self.max_param_values} values",
+                )
+                return False
+        return True
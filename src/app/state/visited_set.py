@@ -0,0 +1,64 @@
+import hashlib
+import heapq
+from array import array
+
+
+class VisitedSet:
+    """
+    Memory-compact set of visited URLs.
+
+    URLs are stored as 64-bit fingerprints in a sorted array (8 bytes per URL)
+    plus a small buffer of recent additions that is merged into the array
+    once it grows past `buffer_size`. Lookups are a set probe followed by a
+    binary search, so millions of URLs fit in a few dozen megabytes. With
+    64-bit fingerprints the chance of a false "already visited" stays
+    negligible even for tens of millions of URLs.
+    """
+
+    def __init__(self, buffer_size: int = 50000) -> None:
+        self.fingerprints = array("Q")
+        self.recent = set()
+        self.buffer_size = buffer_size
+
+    @staticmethod
+    def fingerprint(url: str) -> int:
+        digest = hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def _in_array(self, fingerprint: int) -> bool:
+        low, high = 0, len(self.fingerprints)
+        while low < high:
+            middle = (low + high) // 2
+            if self.fingerprints[middle] < fingerprint:
+                low = middle + 1
+            else:
+                high = middle
+        return (
+            low < len(self.fingerprints)
+            and self.fingerprints[low] == fingerprint
+        )
+
+    def __contains__(self, url: str) -> bool:
+        fingerprint = self.fingerprint(url)
+        return fingerprint in self.recent or self._in_array(fingerprint)
+
+    def __len__(self) -> int:
+        return len(self.fingerprints) + len(self.recent)
+
+    def add(self, url: str):
+        fingerprint = self.fingerprint(url)
+        if fingerprint in self.recent or self._in_array(fingerprint):
+            return
+        self.recent.add(fingerprint)
+        if len(self.recent) >= self.buffer_size:
+            self._merge()
+
+    def update(self, urls):
+        for url in urls:
+            self.add(url)
+
+    def _merge(self):
+        self.fingerprints = array(
+            "Q", heapq.merge(self.fingerprints, sorted(self.recent))
+        )
+        self.recent = set()
@@ -3,7 +3,6 @@ import json
 import re
 import time
 
-import aiofiles
 import openai
 from fastapi import Depends
 
@@ -18,6 +17,7 @@ from src.app.repositories.error_repository import ErrorRepo
 from src.app.repositories.llm_usage_repository import LLMUsageRepository
 from src.app.services.openai_service import OpenAIService
 from src.app.utils.batch_api_utils import BatchAPIUtils
+from src.app.utils.page_file import PageFile, iter_page_file
 from src.app.utils.prompts import (
     chunk_prompt,
     summary_links_prompt,
@@ -74,7 +74,6 @@ class ChunkingUtils:
         # user_id = "0998f5f8-637e-4a72-84aa-8797e1fcb63b"
         # 4. Check status of batch + retrieve file content
         content = await self._check_batch_status(batch_request_ids, user_id)
-        
 
         return content
 
@@ -162,7 +161,7 @@ class ChunkingUtils:
 
             if not pending_batches:
                 break
-            
+
             await asyncio.sleep(800)  # Sleep for 1 hour
 
         return responses
@@ -177,15 +176,9 @@ class ChunkingUtils:
         :return: list: List of chunks
         """
 
-        async with aiofiles.open(file_path, "r") as file:
-            data = json.loads(await file.read())
         tasks = [
-            self._chunk_with_gpt(
-                user_id,
-                f"{self.chunk_prompt}\n**INPUT:**\n{item}\n**OUTPUT:**",
-                semaphore,
-            )
-            for item in data
+            self.chunk_page(user_id, item, semaphore)
+            for item in iter_page_file(file_path)
         ]
 
         responses = await asyncio.gather(*tasks, return_exceptions=True)
@@ -202,6 +195,20 @@ class ChunkingUtils:
                 final_chunks.extend(response)
         return final_chunks
 
+    async def chunk_page(self, user_id, page, semaphore):
+        """
+        This method is responsible for chunking a single crawled page.
+        :param user_id: The user ID.
+        :param page: The crawled page.
+        :param semaphore: Semaphore
+        :return: list: List of chunks
+        """
+        return await self._chunk_with_gpt(
+            user_id,
+            f"{self.chunk_prompt}\n**INPUT:**\n{page}\n**OUTPUT:**",
+            semaphore,
+        )
+
     async def _chunk_with_gpt(self, user_id, text, chunk_semaphore):
         """
         This method is responsible for chunking the data using GPT-4o-mini.
@@ -286,8 +293,15 @@ class ChunkingUtils:
         :param file_path: The file path.
         :return: The summary chunks.
         """
-        async with aiofiles.open(file_path, "r") as file:
-            data = json.loads(await file.read())
+        return await self.process_summary(user_id, PageFile(file_path))
+
+    async def process_summary(self, user_id, data):
+        """
+        This method is responsible for summarizing the crawled pages of a source.
+        :param user_id: The user ID.
+        :param data: The crawled pages of the source.
+        :return: The summary chunks.
+        """
         links = await self._extract_hrefs(user_id, data)
         if len(links) > 180:
             links = links[:180]
@@ -9,6 +9,7 @@ from src.app.config.settings import settings
 from src.app.models.domain.error import Error
 from src.app.repositories.error_repository import ErrorRepo
 from src.app.usecases.chunking_usecase.chunking_helper import ChunkingUtils
+from src.app.utils.page_file import is_page_file
 
 
 class ChunkingUseCase:
@@ -19,6 +20,7 @@ class ChunkingUseCase:
     ):
         self.chunking_utils = chunking_utils
         self.error_repo = error_repo
+        self.chunk_count = 0
 
     async def execute_chunking(self, user_id: str):
         """
@@ -32,7 +34,7 @@ class ChunkingUseCase:
             json_files = [
                 os.path.join(dir_path, file)
                 for file in os.listdir(dir_path)
-                if file.endswith(".json")
+                if is_page_file(file)
             ]
 
             all_chunks = []
@@ -84,6 +86,7 @@ class ChunkingUseCase:
                             error_message=f"[ERROR] occured while saving chunks to file : {e} \n error from chunking_usecase in executing_chunking()",
                         )
                     )
+            self.chunk_count = len(all_chunks)
         except Exception as e:
             await self.error_repo.insert_error(
                 Error(
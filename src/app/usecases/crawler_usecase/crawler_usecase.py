@@ -1,17 +1,26 @@
 import asyncio
+import os
 from typing import List
 
 from fastapi import Depends
-from playwright.async_api import async_playwright
 
+from src.app.config.settings import settings
 from src.app.models.domain.error import Error
 from src.app.repositories.error_repository import ErrorRepo
 from src.app.services.crawler_service import CrawlerService
+from src.app.services.doc_adapter_service import DocAdapterService
 from src.app.services.hidden_code_snippets_service import (
     HiddenCodeSnippetsService,
 )
-from src.app.state.crawler_state import crawler_state
+from src.app.services.llms_txt_service import LlmsTxtService
+from src.app.services.sitemap_service import SitemapService
+from src.app.state.crawl_checkpoint import CrawlCheckpoint
+from src.app.state.crawler_state import CrawlerState
+from src.app.state.fetch_mode_cache import fetch_mode_cache
+from src.app.state.link_decision_cache import link_decision_cache
+from src.app.state.tab_profile_cache import tab_profile_cache
 from src.app.usecases.crawler_usecase.helper import CrawlerUtils
+from src.app.usecases.crawler_usecase.url_scorer import UrlScorer
 
 
 class CrawlerUsecase:
@@ -21,74 +30,118 @@ class CrawlerUsecase:
         crawler_utils=Depends(CrawlerUtils),
         error_repo=Depends(ErrorRepo),
         hidden_code_snippets_service=Depends(HiddenCodeSnippetsService),
+        url_scorer=Depends(UrlScorer),
+        sitemap_service=Depends(SitemapService),
+        llms_txt_service=Depends(LlmsTxtService),
+        doc_adapter_service=Depends(DocAdapterService),
+        state=Depends(CrawlerState),
     ) -> None:
         self.crawler_service = crawler_service
         self.user_id = None
         self.crawler_utils = crawler_utils
-        self.state = crawler_state
-        self.num_workers = 55
+        self.url_scorer = url_scorer
+        self.sitemap_service = sitemap_service
+        self.llms_txt_service = llms_txt_service
+        self.doc_adapter_service = doc_adapter_service
+        self.state = state
+        self.num_workers = settings.CRAWL_NUM_WORKERS
+        self.batch_size = settings.CRAWL_BATCH_SIZE
         self.error_repo = error_repo
         self.hidden_code_snippets_service = hidden_code_snippets_service
+        self.pipeline = None
+        self.completed = False
+        self.error = None
 
-    async def worker_for_code_snippets(self, browser):
-        while not self.state.mini_queue.empty():
+    async def worker_for_pages(self):
+        """
+        Hands each page to the streaming pipeline, if any, as soon as it is
+        crawled. Hidden code snippets are already merged during the crawl.
+        """
+        while True:
             try:
-                file_name, url, md_content = await self.state.mini_queue.get()
-                hidden_snippets = await self.hidden_code_snippets_service.extract_hidden_snippets(
-                    url=url, browser=browser, user_id=self.user_id
-                )
-                final_md_content = self.crawler_utils.merge_content(
-                    md_content, hidden_snippets
-                )
-                [x for x in self.state.results[file_name] if x["href"] == url][
-                    0
-                ]["content"] = final_md_content
-            except asyncio.QueueEmpty:
+                file_name, href = await self.state.crawled_pages.get()
+            except asyncio.CancelledError:
                 break
+            try:
+                if self.pipeline:
+                    page = self.state.results.get(file_name, href)
+                    if page:
+                        await self.pipeline.submit_page(
+                            page.to_dict(), file_name
+                        )
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 await self.error_repo.insert_error(
                     Error(
                         user_id=self.user_id,
-                        error_message=f"[WORKER ERROR] In Code snippets Worker : {e} \n error from crawler_usecase in worker_for_code_snippets()",
+                        error_message=f"[WORKER ERROR] In page worker : {e} \n error from crawler_usecase in worker_for_pages()",
                     )
                 )
             finally:
-                self.state.mini_queue.task_done()
+                self.state.page_processed(file_name)
 
-    async def code_snippets_crawler(self, num_workers, browser):
-        for file_name, items in self.state.results.items():
-            for item in items:
-                url = item["href"]
-                md_content = item["content"]
-                await self.state.mini_queue.put((file_name, url, md_content))
-
-        tasks = [
-            asyncio.create_task(self.worker_for_code_snippets(browser))
-            for _ in range(num_workers)
-        ]
-
-        await self.state.mini_queue.join()
-
-        for task in tasks:
-            task.cancel()
+    async def finish_source(self, file_name):
+        """
+        Closes the page file of a source as soon as its own pages are crawled
+        and post-processed, without waiting for other sources.
+        """
+        try:
+            await self.state.queue.wait_source(file_name)
+            await self.state.wait_pages(file_name)
+            print(f"[CRAWL] Finished crawling {file_name}")
+            self.state.results.finish(file_name)
+            # With the pipeline, the source is finished once it is indexed
+            if self.state.checkpoint and not self.pipeline:
+                self.state.checkpoint.finish_source(file_name)
+            if self.pipeline:
+                self.pipeline.submit_source(
+                    file_name, self.state.results.reader(file_name)
+                )
+        except Exception as e:
+            await self.error_repo.insert_error(
+                Error(
+                    user_id=self.user_id,
+                    error_message=f"[ERROR] finishing source {file_name} : {e} \n error from crawler_usecase in finish_source()",
+                )
+            )
 
-        return True
+    def _next_sitemap_batch(self, first_item):
+        """
+        Drain queued sitemap pages (which are never expanded) into one batch
+        for the browser pool's multi-URL dispatcher.
+        """
+        batch = [first_item]
+        leftover = None
+        while len(batch) < self.batch_size:
+            try:
+                item = self.state.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if item[4]:
+                batch.append(item)
+            else:
+                leftover = item
+                break
+        return batch, leftover
 
     async def worker_for_full_page(self, worker_id: int):
         while True:
             try:
-                (
-                    url,
-                    depth,
-                    file_name,
-                    home_url,
-                    sitemap_mode,
-                ) = await self.state.queue.get()
-                await self.crawler_service.crawl_page(
-                    url, depth, file_name, home_url, sitemap_mode
-                )
+                link_info = await self.state.queue.get()
+            except asyncio.CancelledError:
+                break
+
+            link_infos = [link_info]
+            try:
+                if link_info[4]:
+                    batch, leftover = self._next_sitemap_batch(link_info)
+                    link_infos = batch + ([leftover] if leftover else [])
+                    await self.crawler_service.crawl_pages(batch)
+                    if leftover:
+                        await self.crawler_service.crawl_page(*leftover)
+                else:
+                    await self.crawler_service.crawl_page(*link_info)
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -99,79 +152,343 @@ class CrawlerUsecase:
                     )
                 )
             finally:
-                self.state.queue.task_done()
+                for item in link_infos:
+                    self.state.queue.task_done(item)
 
-    async def main(self, user_id: str, start_urls: List[str]):
+    async def seed_found_pages(self, url, file_name, pages, entries):
+        """
+        Stores pages whose content is already known and queues the other
+        listed pages without expanding their links. `entries` are
+        {"loc", "lastmod", "priority"} dicts, scored like sitemap entries.
+        """
+        for page in pages:
+            self.state.mark_visited(page["href"])
+            self.state.add_result(
+                file_name,
+                {
+                    "href": page["href"],
+                    "content": page["content"],
+                    "base_url": url,
+                },
+            )
+        for entry in entries:
+            link = entry["loc"]
+            if self.state.is_visited(link):
+                continue
+            self.state.mark_visited(link)
+            await self.state.queue.put(
+                (link, 1, file_name, url, True),
+                self.url_scorer.score(
+                    link,
+                    1,
+                    lastmod=entry.get("lastmod"),
+                    priority=entry.get("priority"),
+                ),
+            )
+
+    async def seed_from_llms_txt(self, url, file_name) -> bool:
+        """
+        Ingests the markdown of llms-full.txt / llms.txt straight into the
+        results, skipping the browser and the GPT link filter.
+        :return: True when the source was seeded from llms.txt.
+        """
+        found = await self.llms_txt_service.fetch_pages(url, self.user_id)
+        if not found:
+            return False
+        pages, html_links = found
+        await self.seed_found_pages(
+            url, file_name, pages, [{"loc": link} for link in html_links]
+        )
+        return True
+
+    async def seed_from_adapter(self, url, file_name, start_result) -> bool:
+        """
+        Lets a doc-framework adapter list the pages of the source from its
+        search index or markdown sources instead of discovering them through
+        links and the GPT filter.
+        :return: True when the source was seeded by an adapter.
+        """
+        if start_result is not None:
+            html = start_result.html
+        else:
+            html = await self.crawler_utils.fetch_html(url)
+        found = await self.doc_adapter_service.enumerate(
+            url, html, self.user_id
+        )
+        if not found:
+            return False
+        await self.seed_found_pages(url, file_name, *found)
+        if start_result is not None:
+            await self.crawler_service.process_result(
+                start_result, url, 1, file_name, url, True
+            )
+        else:
+            await self.state.queue.put((url, 1, file_name, url, True))
+        return True
+
+    async def seed_source(self, url, file_name, start_result):
+        """
+        Seeds the queue for one start URL. The page fetched by the first crawl
+        of the start URL is stored and expanded directly instead of being
+        crawled again by a worker.
+        """
+        try:
+            self.state.mark_visited(url)
+            if await self.seed_from_llms_txt(url, file_name):
+                return
+            if await self.seed_from_adapter(url, file_name, start_result):
+                return
+
+            sitemap_count = 0
+            async for entry in self.sitemap_service.iter_entries(
+                url, self.user_id
+            ):
+                sitemap_url = entry["loc"]
+                if self.state.is_visited(sitemap_url):
+                    continue
+                self.state.mark_visited(sitemap_url)
+                await self.state.queue.put(
+                    (sitemap_url, 1, file_name, url, True),
+                    self.url_scorer.score(
+                        sitemap_url,
+                        1,
+                        lastmod=entry["lastmod"],
+                        priority=entry["priority"],
+                    ),
+                )
+                sitemap_count += 1
+            if sitemap_count:
+                print(
+                    f"Using sitemap for base URL: {url} -> {file_name} ({sitemap_count} pages)"
+                )
+            else:
+                print(f"Starting with base URL: {url} -> {file_name}")
+
+            if start_result is None:
+                await self.state.queue.put(
+                    (url, 1, file_name, url, bool(sitemap_count))
+                )
+            else:
+                await self.crawler_service.process_result(
+                    start_result, url, 1, file_name, url, bool(sitemap_count)
+                )
+        except Exception as e:
+            await self.error_repo.insert_error(
+                Error(
+                    user_id=self.user_id,
+                    error_message=f"[ERROR] proccessing url {url} : {e} \n error from crawler_usecase in seed_source()",
+                )
+            )
+        finally:
+            self.state.queue.seal(file_name)
+
+    def register_source(
+        self, file_name: str, resume: bool = False, weight: int = 1
+    ) -> int:
+        self.state.count_locks[file_name] = asyncio.Lock()
+        count = self.state.results.set_source(file_name, resume)
+        self.state.llm_request_counts.setdefault(file_name, 0)
+        self.state.queue.add_source(file_name, weight)
+        return count
+
+    def open_results(self):
+        self.state.results.open(
+            os.path.join(settings.USER_DATA, self.user_id, "results")
+        )
+
+    async def open_checkpoint(self) -> CrawlCheckpoint:
+        checkpoint = CrawlCheckpoint(self.user_id)
+        await checkpoint.open(self.state.llm_request_counts)
+        self.state.set_checkpoint(checkpoint)
+        if self.pipeline:
+            self.pipeline.checkpoint = checkpoint
+        return checkpoint
+
+    async def close_checkpoint(self):
+        """
+        Called by the crawl itself, or by the controller once the streaming
+        pipeline has drained so its last indexed pages are recorded too.
+        """
+        checkpoint = self.state.checkpoint
+        if checkpoint:
+            self.state.set_checkpoint(None)
+            if self.pipeline:
+                self.pipeline.checkpoint = None
+            await checkpoint.close()
+
+    async def run_crawl(self, file_names: List[str], seeds):
+        """
+        Crawls the registered sources until the frontier is drained.
+        `seeds` holds (url, file_name, start_result) for the sources that
+        still have to be seeded.
+        """
+        tasks = [
+            asyncio.create_task(self.worker_for_full_page(i))
+            for i in range(self.num_workers)
+        ]
+        page_task = asyncio.create_task(self.worker_for_pages())
+        finish_tasks = [
+            asyncio.create_task(self.finish_source(file_name))
+            for file_name in dict.fromkeys(file_names)
+        ]
+        await asyncio.gather(
+            *[
+                self.seed_source(url, file_name, start_result)
+                for url, file_name, start_result in seeds
+            ]
+        )
+        await self.state.queue.join()
+        for task in tasks:
+            task.cancel()
+        await fetch_mode_cache.save()
+        await link_decision_cache.save()
+        await tab_profile_cache.save()
+
+        await asyncio.gather(*finish_tasks)
+        page_task.cancel()
+        await asyncio.gather(*tasks, page_task, return_exceptions=True)
+
+        print("\n--- CRAWL SUMMARY ---")
+        for file_name in dict.fromkeys(file_names):
+            print(
+                f"{file_name}: {self.state.llm_request_counts.get(file_name, 0)}/{self.state.max_llm_request_count} LLM calls, {self.state.results.count(file_name)} pages crawled"
+            )
+            skipped = self.state.results.skipped.get(file_name)
+            if skipped:
+                print(
+                    f"{file_name}: {skipped} pages skipped, same content as another page"
+                )
+            stats = self.state.snippet_stats.get(file_name)
+            if stats:
+                hit_rate = stats["hits"] / max(1, stats["screened_in"])
+                print(
+                    f"{file_name}: {stats['screened_in']}/{stats['pages']} pages passed the snippet pre-screen, {stats['hits']} had hidden snippets ({hit_rate:.0%} hit rate)"
+                )
+
+    async def main(
+        self, user_id: str, start_urls: List[str], weights: List[int] = None
+    ):
+        """
+        Crawls the start URLs, one source each. `weights` sets the share of
+        the crawl each source gets from the frontier, 1 each by default.
+        """
         self.user_id = user_id
+        self.crawler_service.user_id = user_id
+        self.hidden_code_snippets_service.user_id = user_id
         try:
+            start_results = [
+                result
+                for result, _ in await asyncio.gather(
+                    *[
+                        self.crawler_service.fetch_page(url)
+                        for url in start_urls
+                    ]
+                )
+            ]
             file_name_tasks = [
-                self.crawler_utils.get_file_name(url, self.user_id)
-                for url in start_urls
+                self.crawler_utils.get_file_name(url, result, self.user_id)
+                for url, result in zip(start_urls, start_results)
             ]
             self.state.file_names = await asyncio.gather(*file_name_tasks)
 
-            for i, url in enumerate(start_urls):
-                file_name = self.state.file_names[i]
-                self.state.count_locks[file_name] = asyncio.Lock()
-                self.state.results[file_name] = []
-                self.state.llm_request_counts[file_name] = 0
+            self.open_results()
+            checkpoint = await self.open_checkpoint()
+            weights = weights or [1] * len(start_urls)
+            for url, file_name, weight in zip(
+                start_urls, self.state.file_names, weights
+            ):
+                self.register_source(file_name, weight=weight)
+                checkpoint.save_source(file_name, url, weight)
 
-                try:
-                    sitemap_urls = await self.crawler_utils.fetch_sitemap(
-                        url, self.user_id
-                    )
-                    if sitemap_urls:
-                        for sitemap_url in sitemap_urls:
-                            await self.state.queue.put(
-                                (sitemap_url, 1, file_name, url, True)
-                            )
-                        print(
-                            f"Using sitemap for base URL: {url} -> {file_name}"
-                        )
-                    else:
-                        self.state.processed_urls.add(url)
-                        await self.state.queue.put(
-                            (url, 1, file_name, url, False)
-                        )
-                        print(f"Starting with base URL: {url} -> {file_name}")
-                except Exception as e:
-                    await self.error_repo.insert_error(
-                        Error(
-                            user_id=self.user_id,
-                            error_message=f"[ERROR] proccessing url {url} : {e} \n error from crawler_usecase in main()",
-                        )
-                    )
+            await self.run_crawl(
+                self.state.file_names,
+                list(zip(start_urls, self.state.file_names, start_results)),
+            )
+            self.completed = True
 
-            tasks = [
-                asyncio.create_task(self.worker_for_full_page(i))
-                for i in range(self.num_workers)
-            ]
-            await self.state.queue.join()
-            for task in tasks:
-                task.cancel()
+        except Exception as e:
+            self.error = e
+            await self.error_repo.insert_error(
+                Error(
+                    user_id=self.user_id,
+                    error_message=f"[ERROR] occured in main function : {e} \n error from crawler_usecase in main()",
+                )
+            )
+        finally:
+            if not self.pipeline:
+                await self.close_checkpoint()
+            self.state.results.close()
+        return self.user_id
+
+    async def resume(self, user_id: str):
+        """
+        Continues an interrupted crawl from its checkpoint. Finished sources
+        are skipped, the others get back their crawled pages and pending
+        frontier; sources that were not fully seeded are seeded again.
+        """
+        self.user_id = user_id
+        self.crawler_service.user_id = user_id
+        self.hidden_code_snippets_service.user_id = user_id
+        try:
+            if not CrawlCheckpoint(user_id).exists():
+                raise FileNotFoundError(f"No checkpoint found for {user_id}")
 
-            async with async_playwright() as playwright:
-                browser = await playwright.chromium.launch(headless=True)
-                await self.code_snippets_crawler(
-                    num_workers=15, browser=browser
+            self.open_results()
+            checkpoint = await self.open_checkpoint()
+            self.state.llm_request_counts.update(
+                await checkpoint.load_llm_counts()
+            )
+            self.state.restore_visited(await checkpoint.load_visited())
+
+            file_names = []
+            seeds = []
+            for (
+                file_name,
+                start_url,
+                sealed,
+                finished,
+                weight,
+            ) in await checkpoint.load_sources():
+                if finished:
+                    continue
+                file_names.append(file_name)
+                count = self.register_source(
+                    file_name, resume=True, weight=weight
                 )
-                await self.crawler_utils.save_results(
-                    self.state.results, self.user_id
+                self.state.progress["pages_crawled"] = (
+                    self.state.progress.get("pages_crawled", 0) + count
                 )
-                await asyncio.gather(*tasks, return_exceptions=True)
-                await browser.close()
+                # Pages the pipeline already indexed are not embedded again
+                indexed = await checkpoint.load_indexed(file_name)
+                for page in self.state.results.iter_pages(file_name):
+                    if page["href"] not in indexed:
+                        self.state.queue_page(file_name, page["href"])
+                for link_info, score in await checkpoint.load_pending(
+                    file_name
+                ):
+                    await self.state.queue.put(link_info, score)
+                if sealed:
+                    self.state.queue.seal(file_name)
+                else:
+                    seeds.append((start_url, file_name, None))
+            self.state.file_names = file_names
 
-            print("\n--- CRAWL SUMMARY ---")
-            for file_name, count in self.state.llm_request_counts.items():
-                print(
-                    f"{file_name}: {count}/{self.state.max_llm_request_count} LLM calls, {len(self.state.results.get(file_name, []))} pages crawled"
-                )
+            print(
+                f"[CRAWL] Resuming {len(file_names)} sources with {self.state.queue.qsize()} pending pages"
+            )
+            await self.run_crawl(file_names, seeds)
+            self.completed = True
 
         except Exception as e:
+            self.error = e
             await self.error_repo.insert_error(
                 Error(
                     user_id=self.user_id,
-                    error_message=f"[ERROR] occured in main function : {e} \n error from crawler_usecase in main()",
+                    error_message=f"[ERROR] occured while resuming crawl : {e} \n error from crawler_usecase in resume()",
                 )
             )
+        finally:
+            if not self.pipeline:
+                await self.close_checkpoint()
+            self.state.results.close()
         return self.user_id
@@ -1,17 +1,14 @@
 import asyncio
-import json
-import os
+import html
 import re
 import time
-import xml.etree.ElementTree as ET
 from typing import List
 from urllib.parse import urlparse
 
-import aiofiles
-import httpx
-from crawl4ai import AsyncWebCrawler, BrowserConfig
 from fastapi import Depends
 
+from src.app.config.crawler_config import JS_RENDERED_MARKERS
+from src.app.config.http_client import http_client
 from src.app.config.settings import settings
 from src.app.models.domain.error import Error
 from src.app.models.domain.log_data import LogData
@@ -19,7 +16,8 @@ from src.app.models.schemas.llm_response import FilterPromptResponse
 from src.app.repositories.error_repository import ErrorRepo
 from src.app.repositories.llm_usage_repository import LLMUsageRepository
 from src.app.services.openai_service import OpenAIService
-from src.app.state.crawler_state import crawler_state
+from src.app.state.crawler_state import CrawlerState
+from src.app.state.link_decision_cache import link_decision_cache
 from src.app.utils.prompts import filter_prompt
 
 
@@ -29,30 +27,39 @@ class CrawlerUtils:
         error_repo=Depends(ErrorRepo),
         llm_usage_repo=Depends(LLMUsageRepository),
         openai_service=Depends(OpenAIService),
+        state=Depends(CrawlerState),
     ) -> None:
         self.error_repo = error_repo
         self.total_input_tokens = 0
         self.total_output_tokens = 0
         self.log_lock = asyncio.Lock()
         self.llm_usage_repo = llm_usage_repo
-        self.state = crawler_state
+        self.state = state
         self.openai_service = openai_service
+        self.link_decision_cache = link_decision_cache
+        self.http_client = http_client
 
-    async def get_file_name(self, base_url, user_id):
+    async def get_file_name(self, base_url, result, user_id):
+        """
+        Derives the file name of a source from the title of its start page.
+        Uses the title from the first crawl of the start URL when available and
+        falls back to a plain HTTP <title> fetch, then to the domain name.
+        """
         try:
-            browser_conf = BrowserConfig(
-                text_mode=True, light_mode=True, verbose=False
-            )
-            async with AsyncWebCrawler(config=browser_conf) as crawler:
-                result = await crawler.arun(url=base_url)
-                title = result.metadata["title"]
-                clean_title = re.sub(
-                    r"[^\w\s]", "", title
-                )  # Remove special characters
-                clean_title = re.sub(
-                    r"\s+", "_", clean_title
-                )  # Replace spaces with underscores
-                return clean_title
+            title = None
+            if result is not None and result.success and result.metadata:
+                title = result.metadata.get("title")
+            if not title:
+                title = await self.fetch_title(base_url)
+            clean_title = re.sub(
+                r"[^\w\s]", "", title
+            )  # Remove special characters
+            clean_title = re.sub(
+                r"\s+", "_", clean_title.strip()
+            )  # Replace spaces with underscores
+            if not clean_title:
+                raise ValueError("empty title")
+            return clean_title
         except Exception as e:
             await self.error_repo.insert_error(
                 Error(
@@ -62,6 +69,54 @@ class CrawlerUtils:
             )
             return urlparse(base_url).netloc.replace(".", "_")
 
+    async def fetch_title(self, url):
+        """Fetches the <title> of a page with a plain HTTP request."""
+        response = await self.http_client.get_client().get(url)
+        response.raise_for_status()
+        match = re.search(
+            r"<title[^>]*>(.*?)</title>",
+            response.text,
+            re.IGNORECASE | re.DOTALL,
+        )
+        if not match:
+            raise ValueError(f"no <title> found on {url}")
+        return html.unescape(match.group(1))
+
+    async def fetch_html(self, url):
+        """Fetches the HTML of a page with a plain HTTP request, '' on failure."""
+        try:
+            response = await self.http_client.get_client().get(url)
+            return response.text if response.status_code == 200 else ""
+        except Exception:
+            return ""
+
+    def looks_js_rendered(self, html_content):
+        """Checks whether static HTML is an empty shell that needs a browser."""
+        for marker in JS_RENDERED_MARKERS:
+            if re.search(marker, html_content, re.IGNORECASE | re.DOTALL):
+                return True
+        body = re.search(
+            r"<body[^>]*>(.*)</body>", html_content, re.IGNORECASE | re.DOTALL
+        )
+        text = re.sub(
+            r"<(script|style|noscript)[^>]*>.*?</\1>",
+            "",
+            body.group(1) if body else html_content,
+            flags=re.IGNORECASE | re.DOTALL,
+        )
+        text = re.sub(r"<[^>]+>", " ", text)
+        return len(text.split()) < settings.STATIC_MIN_MARKDOWN_CHARS // 10
+
+    def parse_retry_after(self, headers):
+        """Returns the Retry-After delay in seconds, if the host sent one."""
+        retry_after = {k.lower(): v for k, v in headers.items()}.get(
+            "retry-after"
+        )
+        try:
+            return float(retry_after) if retry_after else None
+        except ValueError:
+            return None
+
     def remove_fragment(self, url):
         """Removes fragment identifiers (#) from URLs."""
         match = re.match(r"(https?://[^\s#]+)", url)
@@ -73,7 +128,11 @@ class CrawlerUtils:
         return [url for url in url_list if urlparse(url).netloc == base_domain]
 
     async def clean_gpt_output(self, response_text, user_id):
-        """Cleans GPT output by removing code block markers and ensuring a valid list format."""
+        """
+        Cleans GPT output by removing code block markers and ensuring a valid list format.
+
+        :return: The URLs, or None when the output could not be parsed.
+        """
         response_text = (
             re.sub(r"```[a-zA-Z]*", "", response_text).strip("`").strip()
         )
@@ -88,7 +147,7 @@ class CrawlerUtils:
                     error_message=f"[ERROR] Failed to clean GPT output for {response_text} and the user id is : {user_id} \n error from crawler_usecase/helper.py in clean_gpt_output()",
                 )
             )
-            return []
+            return None
 
     def merge_content(self, markdown_content, hidden_snippets):
         """Merges extracted markdown content with hidden code snippets."""
@@ -130,35 +189,6 @@ class CrawlerUtils:
 
         return merged_content
 
-    async def save_results(self, results: dict, user_id: str):
-        """
-        Saves the given results in separate JSON files inside the specified directory.
-        Each key in the results dictionary becomes a JSON filename.
-        """
-        os.makedirs(
-            os.path.join(settings.USER_DATA, user_id, "results"), exist_ok=True
-        )
-
-        # Create tasks for all file saves to run in parallel
-        save_tasks = []
-        for filename, data in results.items():
-            file_path = os.path.join(
-                os.path.join(settings.USER_DATA, user_id, "results"),
-                f"{filename}.json",
-            )
-
-            async def save_file(path, content):
-                async with aiofiles.open(path, "w", encoding="utf-8") as f:
-                    await f.write(
-                        json.dumps(content, ensure_ascii=False, indent=2)
-                    )
-                print(f"Saved: {path}")
-
-            save_tasks.append(save_file(file_path, data))
-
-        # Run all save tasks concurrently
-        await asyncio.gather(*save_tasks)
-
     async def log_usage(
         self,
         start_time,
@@ -189,60 +219,21 @@ class CrawlerUtils:
 
             await self.llm_usage_repo.save_usage(log_data)
 
-    async def fetch_sitemap(self, url, user_id):
-        """Fetch and parse the sitemap for the given URL using httpx.
-        Tries both '/sitemap.xml' and '/sitemap_index.xml'. Returns a list of URLs if found,
-        otherwise returns an empty list.
-        """
-
-        async def _parse_sitemap(content):
-            try:
-                tree = ET.ElementTree(ET.fromstring(content))
-                return [
-                    elem.text
-                    for elem in tree.iter()
-                    if elem.tag.endswith("loc")
-                ]
-            except Exception:
-                await self.error_repo.insert_error(
-                    Error(
-                        user_id=user_id,
-                        error_message=f"[ERROR] Failed to fetch sitemap for {url}: {e} \n error from crawler_usecase/helper.py in fetch_sitemap()",
-                    )
-                )
-                return []
-
-        sitemap_paths = ["/sitemap.xml", "/sitemap_index.xml"]
-        urls_found = []
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                for path in sitemap_paths:
-                    sitemap_url = url.rstrip("/") + path
-                    response = await client.get(sitemap_url)
-                    if response.status_code == 200:
-                        urls_found = await _parse_sitemap(response.content)
-                        if urls_found:
-                            break
-            return urls_found
-        except Exception as e:
-            await self.error_repo.insert_error(
-                Error(
-                    user_id=user_id,
-                    error_message=f"[ERROR] Failed to fetch sitemap for {url}: {e} \n error from crawler_usecase/helper.py in fetch_sitemap()",
-                )
-            )
-            return []
-
     async def filter_links_gpt(self, links, file_name, user_id):
+        """
+        Keeps the documentation links. Cached decisions are reused, only the
+        unknown links are sent to the LLM and its decisions are cached.
+        """
+        kept, _, links = self.link_decision_cache.lookup(links)
         if not links:
-            return []
+            return kept
         lock = await self.state.get_lock(file_name)
         async with lock:
             if (
                 self.state.llm_request_counts.get(file_name, 0)
                 >= self.state.max_llm_request_count
             ):
-                return []
+                return kept
             self.state.llm_request_counts[file_name] = (
                 self.state.llm_request_counts.get(file_name, 0) + 1
             )
@@ -274,7 +265,13 @@ class CrawlerUtils:
             filtered_links = response["choices"][0]["message"][
                 "content"
             ].strip()
-            return await self.clean_gpt_output(filtered_links, user_id)
+            filtered_links = await self.clean_gpt_output(
+                filtered_links, user_id
+            )
+            if filtered_links is None:
+                return kept
+            self.link_decision_cache.record(links, filtered_links)
+            return kept + filtered_links
 
         except Exception as e:
             await self.error_repo.insert_error(
@@ -288,4 +285,4 @@ class CrawlerUtils:
                 self.state.llm_request_counts[file_name] = max(
                     0, self.state.llm_request_counts.get(file_name, 0) - 1
                 )
-            return []
+            return kept
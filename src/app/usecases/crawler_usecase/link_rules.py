@@ -0,0 +1,94 @@
+import re
+from urllib.parse import parse_qsl, urlparse
+
+from src.app.config.crawler_config import (
+    LINK_DOCS_HOST_PREFIXES,
+    LINK_KEEP_PATH_PATTERNS,
+    LINK_NON_ENGLISH_LOCALES,
+    LINK_REJECT_EXTENSIONS,
+    LINK_REJECT_HOST_PREFIXES,
+    LINK_REJECT_PATH_PATTERNS,
+    LINK_REJECT_QUERY_KEYS,
+)
+
+KEEP = "keep"
+REJECT = "reject"
+
+
+class LinkRules:
+    """
+    Decides the obvious links locally so only ambiguous ones are sent to the
+    GPT link filter.
+    """
+
+    def __init__(self) -> None:
+        self.reject_paths = [
+            re.compile(pattern, re.IGNORECASE)
+            for pattern in LINK_REJECT_PATH_PATTERNS
+        ]
+        self.keep_paths = [
+            re.compile(pattern, re.IGNORECASE)
+            for pattern in LINK_KEEP_PATH_PATTERNS
+        ]
+        self.reject_query_keys = LINK_REJECT_QUERY_KEYS
+        self.reject_extensions = LINK_REJECT_EXTENSIONS
+        self.reject_hosts = LINK_REJECT_HOST_PREFIXES
+        self.docs_hosts = LINK_DOCS_HOST_PREFIXES
+        self.non_english_locales = LINK_NON_ENGLISH_LOCALES
+
+    @staticmethod
+    def scope_path(home_url: str) -> str:
+        path = urlparse(home_url).path or "/"
+        if not path.endswith("/"):
+            path = path.rsplit("/", 1)[0] + "/"
+        return path
+
+    def classify(self, url: str, home_url: str):
+        """
+        :return: KEEP or REJECT when a rule decides the link, None when the
+        link is ambiguous and should go to the LLM.
+        """
+        parsed = urlparse(url)
+        host = parsed.netloc.lower().removeprefix("www.")
+        path = parsed.path or "/"
+        lowered_path = path.lower()
+        home_host = urlparse(home_url).netloc.lower().removeprefix("www.")
+
+        # The docs may themselves live on a host like support.x.com
+        if host != home_host and host.startswith(self.reject_hosts):
+            return REJECT
+        if lowered_path.endswith(self.reject_extensions):
+            return REJECT
+        first_segment = lowered_path.strip("/").split("/", 1)[0]
+        if first_segment in self.non_english_locales:
+            return REJECT
+
+        if host.startswith(self.docs_hosts):
+            return KEEP
+        scope = self.scope_path(home_url)
+        if host == home_host and scope != "/" and path.startswith(scope):
+            return KEEP
+
+        if any(pattern.match(path) for pattern in self.reject_paths):
+            return REJECT
+        if any(
+            key.lower() in self.reject_query_keys
+            or key.lower().startswith("utm_")
+            for key, _ in parse_qsl(parsed.query, keep_blank_values=True)
+        ):
+            return REJECT
+        if any(pattern.search(path) for pattern in self.keep_paths):
+            return KEEP
+        return None
+
+    def split(self, urls, home_url: str):
+        """:return: (kept, ambiguous) URLs, rejected ones are dropped."""
+        kept = []
+        ambiguous = []
+        for url in urls:
+            decision = self.classify(url, home_url)
+            if decision == KEEP:
+                kept.append(url)
+            elif decision is None:
+                ambiguous.append(url)
+        return kept, ambiguous
@@ -0,0 +1,74 @@
+import math
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+from src.app.config.crawler_config import URL_PATH_WEIGHTS
+
+
+class UrlScorer:
+    """
+    Scores frontier URLs so the most valuable documentation pages are crawled
+    first when a crawl runs out of page, time or LLM budget.
+    """
+
+    def __init__(self) -> None:
+        self.path_weights = URL_PATH_WEIGHTS
+        self.depth_penalty = 1.0
+        self.in_degree_weight = 0.5
+
+    def path_score(self, url: str) -> float:
+        path = urlparse(url).path.lower()
+        if not path.endswith("/"):
+            path += "/"
+        return sum(
+            weight
+            for pattern, weight in self.path_weights.items()
+            if pattern in path
+        )
+
+    def recency_score(self, lastmod) -> float:
+        """Pages modified within the last year get up to one point."""
+        if not lastmod:
+            return 0.0
+        try:
+            modified = datetime.fromisoformat(lastmod.strip())
+        except ValueError:
+            return 0.0
+        if modified.tzinfo is None:
+            modified = modified.replace(tzinfo=timezone.utc)
+        age_days = (datetime.now(timezone.utc) - modified).days
+        return max(0.0, 1 - age_days / 365)
+
+    def score(
+        self,
+        url: str,
+        depth: int,
+        lastmod=None,
+        priority=None,
+        in_degree: int = 0,
+    ) -> float:
+        """
+        :param url: The URL to score.
+        :param depth: The crawl depth the URL would be crawled at.
+        :param lastmod: The sitemap <lastmod> value, if any.
+        :param priority: The sitemap <priority> value, if any.
+        :param in_degree: How many crawled pages link to the URL so far.
+        :return: The score, higher is crawled first.
+        """
+        try:
+            priority = float(priority) if priority is not None else 0.5
+        except ValueError:
+            priority = 0.5
+        return (
+            self.path_score(url)
+            - self.depth_penalty * depth
+            + 2 * priority
+            + self.recency_score(lastmod)
+            + self.in_degree_weight * math.log1p(in_degree)
+        )
+
+    def in_degree_boost(self, in_degree: int) -> float:
+        """The score gained by a URL when its in-degree grows to `in_degree`."""
+        return self.in_degree_weight * (
+            math.log1p(in_degree) - math.log1p(in_degree - 1)
+        )
@@ -0,0 +1,338 @@
+import asyncio
+import os
+import shutil
+import uuid
+
+from fastapi import Depends
+
+from src.app.config.settings import settings
+from src.app.models.domain.error import Error
+from src.app.repositories.error_repository import ErrorRepo
+from src.app.services.embed_service import EmbedService
+from src.app.services.upsert_service import UpsertService
+from src.app.usecases.chunking_usecase.chunking_helper import ChunkingUtils
+from src.app.usecases.upsert_usecase.helper import PineconeUtils
+
+
+class PipelineUsecase:
+    """
+    Streams crawled pages through chunking, embedding and upsert while the
+    crawl is still running.
+
+    The stages are connected by bounded queues, so a slow stage applies
+    backpressure to the one before it and the end-to-end time approaches the
+    slowest stage instead of the sum of all of them. Summary chunks of a
+    source are generated once all of its pages are crawled.
+
+    A page is recorded as indexed in the crawl checkpoint once every one of
+    its chunks has been upserted, so a resumed job does not embed it again.
+    A source is recorded as finished only once it is summarized and all of
+    its pages are indexed; a source that lost pages stays unfinished so a
+    resume indexes them again.
+    """
+
+    def __init__(
+        self,
+        chunking_utils: ChunkingUtils = Depends(),
+        embed_service: EmbedService = Depends(EmbedService),
+        pinecone_utils: PineconeUtils = Depends(PineconeUtils),
+        upsert_service: UpsertService = Depends(),
+        error_repo: ErrorRepo = Depends(ErrorRepo),
+    ) -> None:
+        self.chunking_utils = chunking_utils
+        self.embed_service = embed_service
+        self.pinecone_utils = pinecone_utils
+        self.upsert_service = upsert_service
+        self.error_repo = error_repo
+        self.user_id = None
+        self.progress = {}
+        self.queue_size = settings.PIPELINE_QUEUE_SIZE
+        self.num_chunk_workers = settings.CHUNK_SEMAPHORE
+        self.chunk_semaphore = None
+        self.num_embed_workers = settings.PIPELINE_EMBED_WORKERS
+        self.upsert_batch_size = self.upsert_service.upsert_batch_size
+        self.page_queue = None
+        self.chunk_queue = None
+        self.record_queue = None
+        self.workers = []
+        self.summary_tasks = []
+        self.batch = []
+        self.batch_pages = []
+        self.pending_pages = {}
+        self.lost_pages = set()
+        self.source_pages = {}
+        self.closed_sources = set()
+        self.failed_sources = set()
+        self.checkpoint = None
+        self.failed = False
+        self.index_host = None
+
+    def _count(self, key: str, amount: int = 1):
+        self.progress[key] = self.progress.get(key, 0) + amount
+
+    async def start(self, user_id: str, progress: dict):
+        self.user_id = user_id
+        self.progress = progress
+        self.page_queue = asyncio.Queue(maxsize=self.queue_size)
+        self.chunk_queue = asyncio.Queue(maxsize=self.queue_size)
+        self.record_queue = asyncio.Queue(maxsize=self.queue_size)
+        self.chunk_semaphore = asyncio.Semaphore(self.num_chunk_workers)
+        self.workers = (
+            [
+                asyncio.create_task(self.worker_for_chunking())
+                for _ in range(self.num_chunk_workers)
+            ]
+            + [
+                asyncio.create_task(self.worker_for_embedding())
+                for _ in range(self.num_embed_workers)
+            ]
+            + [asyncio.create_task(self.worker_for_upsert())]
+        )
+
+    async def submit_page(self, page: dict, file_name: str = None):
+        """Queues a finished page, waits while the chunking stage is full."""
+        if file_name:
+            self.source_pages[file_name] = (
+                self.source_pages.get(file_name, 0) + 1
+            )
+        await self.page_queue.put((page, file_name))
+
+    def track_page(self, page_key):
+        """
+        Starts counting the chunks of a page (or of a source summary, whose
+        href is None). The initial count is released once all of its chunks
+        are queued.
+        """
+        if page_key:
+            self.pending_pages[page_key] = 1
+
+    def add_chunk(self, page_key):
+        if page_key in self.pending_pages:
+            self.pending_pages[page_key] += 1
+
+    def page_indexed(self, page_key):
+        """Counts down the chunks of a page left to upsert."""
+        self._release(page_key)
+
+    def page_failed(self, page_key):
+        """A lost chunk leaves the page to be indexed again on resume."""
+        self.failed = True
+        if page_key in self.pending_pages:
+            self.lost_pages.add(page_key)
+        self._release(page_key)
+
+    def _release(self, page_key):
+        if page_key not in self.pending_pages:
+            return
+        self.pending_pages[page_key] -= 1
+        if self.pending_pages[page_key] > 0:
+            return
+        del self.pending_pages[page_key]
+        file_name, href = page_key
+        if page_key in self.lost_pages:
+            self.lost_pages.discard(page_key)
+            self.failed_sources.add(file_name)
+        elif href and self.checkpoint:
+            self.checkpoint.save_indexed(file_name, href)
+        self.source_pages[file_name] -= 1
+        self._finish_source(file_name)
+
+    def _finish_source(self, file_name: str):
+        if file_name not in self.closed_sources or self.source_pages.get(
+            file_name
+        ):
+            return
+        self.closed_sources.discard(file_name)
+        if file_name not in self.failed_sources and self.checkpoint:
+            self.checkpoint.finish_source(file_name)
+
+    def submit_source(self, file_name: str, pages: list):
+        """
+        Generates the summary chunks of a source that finished crawling, all
+        of its pages have been submitted by then.
+        """
+        self.closed_sources.add(file_name)
+        self.source_pages[file_name] = self.source_pages.get(file_name, 0) + 1
+        self.summary_tasks.append(
+            asyncio.create_task(self.summarize_source(file_name, pages))
+        )
+
+    async def summarize_source(self, file_name: str, pages: list):
+        page_key = (file_name, None)
+        self.track_page(page_key)
+        try:
+            summary_chunks = await self.chunking_utils.process_summary(
+                self.user_id, pages
+            )
+            for index, summary_chunk in enumerate(summary_chunks or []):
+                summary_chunk["is_summary"] = "true"
+                # Stable ids, a resumed job overwrites the earlier summary
+                chunk_id = str(
+                    uuid.uuid5(
+                        uuid.NAMESPACE_URL,
+                        f"{self.user_id}:{file_name}:summary:{index}",
+                    )
+                )
+                self.add_chunk(page_key)
+                await self.chunk_queue.put((summary_chunk, chunk_id, page_key))
+                self._count("chunks_produced")
+            self.page_indexed(page_key)
+        except Exception as e:
+            self.page_failed(page_key)
+            await self.error_repo.insert_error(
+                Error(
+                    user_id=self.user_id,
+                    error_message=f"[ERROR] occured while summarizing {file_name} : {e} \n error from pipeline_usecase in summarize_source()",
+                )
+            )
+
+    async def worker_for_chunking(self):
+        while True:
+            page, file_name = await self.page_queue.get()
+            page_key = (file_name, page["href"]) if file_name else None
+            self.track_page(page_key)
+            try:
+                chunks = await self.chunking_utils.chunk_page(
+                    self.user_id, page, self.chunk_semaphore
+                )
+                if chunks is None:
+                    self.page_failed(page_key)
+                    continue
+                for index, chunk in enumerate(chunks):
+                    # Stable ids, a resumed job overwrites its earlier vectors
+                    chunk_id = str(
+                        uuid.uuid5(
+                            uuid.NAMESPACE_URL,
+                            f"{self.user_id}:{page['href']}:{index}",
+                        )
+                    )
+                    self.add_chunk(page_key)
+                    await self.chunk_queue.put((chunk, chunk_id, page_key))
+                    self._count("chunks_produced")
+                self.page_indexed(page_key)
+            except Exception as e:
+                self.page_failed(page_key)
+                await self.error_repo.insert_error(
+                    Error(
+                        user_id=self.user_id,
+                        error_message=f"[ERROR] occured while chunking {page.get('href')} : {e} \n error from pipeline_usecase in worker_for_chunking()",
+                    )
+                )
+            finally:
+                self.page_queue.task_done()
+
+    async def worker_for_embedding(self):
+        while True:
+            chunk, chunk_id, page_key = await self.chunk_queue.get()
+            try:
+                chunk["embedding"] = (
+                    await self.embed_service.get_dense_embedding(
+                        chunk["chunked_data"], self.user_id
+                    )
+                )
+                chunk["sparse_values"] = (
+                    await self.embed_service.get_sparse_embedding(
+                        chunk["chunked_data"], self.user_id
+                    )
+                )
+                if not chunk["embedding"]:
+                    await self.error_repo.insert_error(
+                        Error(
+                            user_id=self.user_id,
+                            error_message="Skipping chunk due to missing or empty embedding. \n error from pipeline_usecase in worker_for_embedding()",
+                        )
+                    )
+                    self.page_failed(page_key)
+                    continue
+                self._count("chunks_embedded")
+                await self.record_queue.put(
+                    (
+                        self.pinecone_utils.format_record(chunk, chunk_id),
+                        page_key,
+                    )
+                )
+            except Exception as e:
+                self.page_failed(page_key)
+                await self.error_repo.insert_error(
+                    Error(
+                        user_id=self.user_id,
+                        error_message=f"[ERROR] occured while embedding chunk : {e} \n error from pipeline_usecase in worker_for_embedding()",
+                    )
+                )
+            finally:
+                self.chunk_queue.task_done()
+
+    async def worker_for_upsert(self):
+        while True:
+            record, page_key = await self.record_queue.get()
+            try:
+                self.batch.append(record)
+                self.batch_pages.append(page_key)
+                if len(self.batch) >= self.upsert_batch_size:
+                    await self.flush_batch()
+            finally:
+                self.record_queue.task_done()
+
+    async def flush_batch(self):
+        batch, self.batch = self.batch, []
+        page_keys, self.batch_pages = self.batch_pages, []
+        if not batch:
+            return
+        try:
+            if self.index_host is None:
+                self.index_host = await self.upsert_service.get_index_host(
+                    len(batch[0]["values"])
+                )
+            result = await self.upsert_service.pinecone_service.upsert_vectors(
+                self.index_host, batch
+            )
+            self._count("vectors_upserted", result.get("upsertedCount", 0))
+            for page_key in page_keys:
+                self.page_indexed(page_key)
+        except Exception as e:
+            for page_key in page_keys:
+                self.page_failed(page_key)
+            await self.error_repo.insert_error(
+                Error(
+                    user_id=self.user_id,
+                    error_message=f"Error in upserting: {str(e)} \n error while uploading vectors (from pipeline_usecase in flush_batch)",
+                )
+            )
+
+    async def finish(self):
+        """
+        Drains the stages in order once the crawl is done and upserts the last
+        partial batch.
+        """
+        await asyncio.gather(*self.summary_tasks)
+        await self.page_queue.join()
+        await self.chunk_queue.join()
+        await self.record_queue.join()
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        await self.flush_batch()
+        return {
+            "mesage": "Upsertion completed successfully!",
+            "upsertedCount": self.progress.get("vectors_upserted", 0),
+        }
+
+    async def cleanup(self):
+        """
+        Deletes the user's data folder, unless a stage lost pages: the
+        checkpoint and page files are then kept for /resume/{user_id}.
+        """
+        if self.failed:
+            print(
+                f"[PIPELINE] Keeping data of {self.user_id}, some pages were not indexed"
+            )
+            return
+        try:
+            shutil.rmtree(os.path.join(settings.USER_DATA, self.user_id))
+        except Exception as e:
+            await self.error_repo.insert_error(
+                Error(
+                    user_id=self.user_id,
+                    error_message=f"Failed to delete folder: {self.user_id}. Error: {str(e)} \n error from pipeline_usecase in cleanup()",
+                )
+            )
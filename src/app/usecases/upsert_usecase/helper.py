@@ -49,110 +49,7 @@ class PineconeUtils:
                     )
                     continue
 
-                # Generate a UUID for each chunk if not present
-                chunk_id = str(uuid.uuid4())
-
-                # Extract the text content
-                text = chunk.get("chunked_data")
-
-                # Extract metadata (without modifying it to include text)
-                metadata = chunk.get("metadata", {})
-                metadata["chunked_data"] = text
-                if "versions" in metadata and metadata["versions"]:
-                    value = metadata["versions"]
-                    if value in [None, [], "", "none", "null"]:
-                        try:
-                            del metadata["versions"]
-                        except Exception as e:
-                            pass
-                    else:
-                        metadata["versions"] = str(value).lower()
-                else:
-                    try:
-                        del metadata["versions"]
-                    except Exception as e:
-                        pass
-
-                if "version" in metadata and metadata["version"]:
-                    value = metadata["version"]
-                    if value in [None, [], "", "none", "null"]:
-                        try:
-                            del metadata["version"]
-                        except Exception as e:
-                            pass
-                    else:
-                        metadata["version"] = str(value).lower()
-                else:
-                    try:
-                        del metadata["version"]
-                    except Exception as e:
-                        pass
-
-                if "has_code_snippet" in metadata:
-                    if metadata["has_code_snippet"]:
-                        metadata["has_code_snippet"] = str(
-                            metadata["has_code_snippet"]
-                        ).lower()
-                    else:
-                        try:
-                            del metadata["has_code_snippet"]
-                        except Exception as e:
-                            pass
-
-                if (
-                    "supported_languages" in metadata
-                    and metadata["supported_languages"]
-                ):
-                    if metadata["supported_languages"] in [None, [], "null"]:
-                        try:
-                            del metadata["supported_languages"]
-                        except Exception as e:
-                            pass
-                    else:
-                        metadata["supported_languages"] = str(
-                            metadata["supported_languages"]
-                        ).lower()
-                else:
-                    try:
-                        del metadata["supported_languages"]
-                    except Exception as e:
-                        pass
-                try:
-                    if "domains" in metadata and metadata["domains"]:
-                        metadata["domains"] = str(metadata["domains"]).lower()
-                    else:
-                        del metadata["domains"]
-                except Exception as e:
-                    pass
-                try:
-                    if "subdomains" in metadata and metadata["subdomains"]:
-                        metadata["subdomains"] = str(
-                            metadata["subdomains"]
-                        ).lower()
-                    else:
-                        del metadata["subdomains"]
-                except Exception as e:
-                    pass
-
-                try:
-                    metadata["sdk_framework_name"] = str(
-                        metadata["sdk_framework_name"]
-                    ).lower()
-                    metadata["sdk_framework"] = str(
-                        metadata["sdk_framework"]
-                    ).lower()
-                except Exception as e:
-                    pass
-                # Create a record in the format Pinecone expects
-                # Keep chunked_data as a separate field
-                record = {
-                    "id": chunk_id,
-                    "values": embedding,
-                    "metadata": metadata,
-                    "sparse_values": chunk["sparse_values"],
-                }
-
-                pinecone_records.append(record)
+                pinecone_records.append(self.format_record(chunk))
 
         except Exception as e:
             await self.error_repo.insert_error(
@@ -167,3 +64,109 @@ class PineconeUtils:
             )
         # print(pinecone_records)
         return pinecone_records
+
+    def format_record(
+        self, chunk: Dict[str, Any], chunk_id: str = None
+    ) -> Dict[str, Any]:
+        """
+        Formats one embedded chunk as a Pinecone record, normalising its
+        metadata values to lower-case strings.
+        """
+        # Generate a UUID for each chunk if not present
+        chunk_id = chunk_id or str(uuid.uuid4())
+
+        # Extract the text content
+        text = chunk.get("chunked_data")
+
+        # Extract metadata (without modifying it to include text)
+        metadata = chunk.get("metadata", {})
+        metadata["chunked_data"] = text
+        if "versions" in metadata and metadata["versions"]:
+            value = metadata["versions"]
+            if value in [None, [], "", "none", "null"]:
+                try:
+                    del metadata["versions"]
+                except Exception as e:
+                    pass
+            else:
+                metadata["versions"] = str(value).lower()
+        else:
+            try:
+                del metadata["versions"]
+            except Exception as e:
+                pass
+
+        if "version" in metadata and metadata["version"]:
+            value = metadata["version"]
+            if value in [None, [], "", "none", "null"]:
+                try:
+                    del metadata["version"]
+                except Exception as e:
+                    pass
+            else:
+                metadata["version"] = str(value).lower()
+        else:
+            try:
+                del metadata["version"]
+            except Exception as e:
+                pass
+
+        if "has_code_snippet" in metadata:
+            if metadata["has_code_snippet"]:
+                metadata["has_code_snippet"] = str(
+                    metadata["has_code_snippet"]
+                ).lower()
+            else:
+                try:
+                    del metadata["has_code_snippet"]
+                except Exception as e:
+                    pass
+
+        if (
+            "supported_languages" in metadata
+            and metadata["supported_languages"]
+        ):
+            if metadata["supported_languages"] in [None, [], "null"]:
+                try:
+                    del metadata["supported_languages"]
+                except Exception as e:
+                    pass
+            else:
+                metadata["supported_languages"] = str(
+                    metadata["supported_languages"]
+                ).lower()
+        else:
+            try:
+                del metadata["supported_languages"]
+            except Exception as e:
+                pass
+        try:
+            if "domains" in metadata and metadata["domains"]:
+                metadata["domains"] = str(metadata["domains"]).lower()
+            else:
+                del metadata["domains"]
+        except Exception as e:
+            pass
+        try:
+            if "subdomains" in metadata and metadata["subdomains"]:
+                metadata["subdomains"] = str(metadata["subdomains"]).lower()
+            else:
+                del metadata["subdomains"]
+        except Exception as e:
+            pass
+
+        try:
+            metadata["sdk_framework_name"] = str(
+                metadata["sdk_framework_name"]
+            ).lower()
+            metadata["sdk_framework"] = str(metadata["sdk_framework"]).lower()
+        except Exception as e:
+            pass
+        # Create a record in the format Pinecone expects
+        # Keep chunked_data as a separate field
+        return {
+            "id": chunk_id,
+            "values": chunk.get("embedding"),
+            "metadata": metadata,
+            "sparse_values": chunk["sparse_values"],
+        }
@@ -5,6 +5,7 @@ import uuid
 import aiofiles
 
 from src.app.config.settings import settings
+from src.app.utils.page_file import iter_page_file
 
 
 class BatchAPIUtils:
@@ -44,11 +45,8 @@ class BatchAPIUtils:
             if file_size < 200 and line_count < 50000:
                 jsonl_file_path = latest_file
 
-        async with aiofiles.open(file_path, "r") as file:
-            data = json.loads(await file.read())
-
         async with aiofiles.open(jsonl_file_path, "a") as jsonl_file:
-            for index, item in enumerate(data):
+            for index, item in enumerate(iter_page_file(file_path)):
                 request_data = {
                     "custom_id": f"{user_id}_{uuid.uuid4().hex}",
                     "method": "POST",
@@ -0,0 +1,92 @@
+import json
+import os
+import struct
+
+from src.app.config.settings import settings
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+PLAIN_SUFFIX = ".jsonl"
+ZSTD_SUFFIX = ".pages.zst"
+FRAME_HEADER = struct.Struct(">I")
+
+
+def use_zstd() -> bool:
+    if settings.PAGE_STORE_COMPRESSION != "zstd":
+        return False
+    if zstandard is None:
+        print("[PAGES] zstandard is not installed, storing pages uncompressed")
+        return False
+    return True
+
+
+def page_file_path(directory: str, file_name: str, compressed: bool) -> str:
+    return os.path.join(
+        directory, file_name + (ZSTD_SUFFIX if compressed else PLAIN_SUFFIX)
+    )
+
+
+def is_page_file(path: str) -> bool:
+    return path.endswith((PLAIN_SUFFIX, ZSTD_SUFFIX))
+
+
+def encode_page(page: dict, compressed: bool) -> bytes:
+    """
+    One JSON line per page. Compressed files hold one length-prefixed zstd
+    frame per page, so a page can still be read on its own by offset.
+    """
+    data = (json.dumps(page, ensure_ascii=False) + "\n").encode("utf-8")
+    if compressed:
+        frame = zstandard.ZstdCompressor().compress(data)
+        return FRAME_HEADER.pack(len(frame)) + frame
+    return data
+
+
+def decode_page(data: bytes, compressed: bool) -> dict:
+    if compressed:
+        data = zstandard.ZstdDecompressor().decompress(
+            data[FRAME_HEADER.size :]
+        )
+    return json.loads(data)
+
+
+def iter_records(f, compressed: bool):
+    """:yield: (offset, raw bytes) of every page record of an open file."""
+    offset = 0
+    if not compressed:
+        for line in f:
+            yield offset, line
+            offset += len(line)
+        return
+    while True:
+        header = f.read(FRAME_HEADER.size)
+        if len(header) < FRAME_HEADER.size:
+            return
+        (length,) = FRAME_HEADER.unpack(header)
+        frame = f.read(length)
+        if len(frame) < length:
+            return
+        yield offset, header + frame
+        offset += FRAME_HEADER.size + length
+
+
+def iter_page_file(path: str):
+    """Streams the pages of a page file without loading it in memory."""
+    compressed = path.endswith(ZSTD_SUFFIX)
+    with open(path, "rb") as f:
+        for _, data in iter_records(f, compressed):
+            if data.strip():
+                yield decode_page(data, compressed)
+
+
+class PageFile:
+    """Re-iterable view of a page file, every pass streams it from disk."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def __iter__(self):
+        return iter_page_file(self.path)
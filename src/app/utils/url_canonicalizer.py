@@ -0,0 +1,109 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+from src.app.config.crawler_config import (
+    URL_CANONICAL_DEFAULTS,
+    URL_CANONICAL_HOST_RULES,
+    URL_INDEX_FILES,
+    URL_TRACKING_PARAM_PREFIXES,
+    URL_TRACKING_PARAMS,
+)
+
+LINK_TAG = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+REL_CANONICAL = re.compile(r"""\brel\s*=\s*["']?canonical\b""", re.IGNORECASE)
+HREF = re.compile(r"""\bhref\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class UrlCanonicalizer:
+    """
+    Maps the spellings of a page URL (trailing slash, index files, tracking
+    parameters, case of the host) to one canonical form, used as the
+    deduplication key of the crawl. The URL that is fetched is not changed.
+    """
+
+    def __init__(self) -> None:
+        self.defaults = URL_CANONICAL_DEFAULTS
+        self.host_rules = URL_CANONICAL_HOST_RULES
+        self.index_files = URL_INDEX_FILES
+        self.tracking_params = URL_TRACKING_PARAMS
+        self.tracking_prefixes = URL_TRACKING_PARAM_PREFIXES
+
+    def rules_for(self, host: str) -> dict:
+        overrides = self.host_rules.get(host) or self.host_rules.get(
+            host.removeprefix("www.")
+        )
+        if not overrides:
+            return self.defaults
+        return {**self.defaults, **overrides}
+
+    def is_tracking_param(self, key: str) -> bool:
+        key = key.lower()
+        return key in self.tracking_params or key.startswith(
+            self.tracking_prefixes
+        )
+
+    def canonicalize(self, url: str) -> str:
+        try:
+            parsed = urlparse(url.strip())
+            port = parsed.port
+        except ValueError:
+            return url
+        scheme = parsed.scheme.lower()
+        host = (parsed.hostname or "").removeprefix("www.")
+        if port and port != DEFAULT_PORTS.get(scheme):
+            host = f"{host}:{port}"
+        rules = self.rules_for(host)
+
+        path = re.sub(r"/{2,}", "/", parsed.path or "/")
+        if rules["lowercase_path"]:
+            path = path.lower()
+        if rules["strip_index_files"]:
+            head, _, last = path.rpartition("/")
+            if last.lower() in self.index_files:
+                path = head + "/"
+        if rules["strip_trailing_slash"] and path != "/":
+            path = path.rstrip("/")
+
+        query = ""
+        if not rules["drop_query"] and parsed.query:
+            params = parse_qsl(parsed.query, keep_blank_values=True)
+            if rules["drop_tracking_params"]:
+                params = [
+                    (key, value)
+                    for key, value in params
+                    if not self.is_tracking_param(key)
+                ]
+            if rules["sort_query"]:
+                params.sort()
+            query = urlencode(params)
+
+        return urlunparse((scheme, host, path, "", query, ""))
+
+    def canonical_from_html(self, html: str, url: str):
+        """
+        :return: The same-host URL declared by `<link rel="canonical">` in
+        the page head, or None.
+        """
+        if not html:
+            return None
+        head_end = html.find("</head>")
+        head = html[: head_end if head_end != -1 else 20000]
+        for tag in LINK_TAG.findall(head):
+            if not REL_CANONICAL.search(tag):
+                continue
+            match = HREF.search(tag)
+            if not match:
+                return None
+            canonical_url = urljoin(url, match.group(1).strip())
+            parsed = urlparse(canonical_url)
+            page = urlparse(url)
+            if parsed.netloc.removeprefix("www.") != page.netloc.removeprefix(
+                "www."
+            ):
+                return None
+            # Misconfigured sites point every page at their home page
+            if parsed.path in ("", "/") and page.path not in ("", "/"):
+                return None
+            return canonical_url
+        return None
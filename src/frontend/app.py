@@ -1,10 +1,8 @@
 import asyncio
-import time
 from typing import Any, Dict, List
 
 import aiohttp
 import streamlit as st
-from aiohttp import ClientTimeout
 
 
 class DocumentCrawlerApp:
@@ -192,10 +190,8 @@ class DocumentCrawlerApp:
         return valid_urls
 
     async def call_crawler_api(self, urls: List[str]) -> Dict[str, Any]:
-        """Call the crawler API to process the provided URLs."""
-        async with aiohttp.ClientSession(
-            timeout=ClientTimeout(total=86400)
-        ) as session:
+        """Submit the provided URLs as a background scrape job."""
+        async with aiohttp.ClientSession() as session:
             async with session.post(
                 "http://localhost:8000/", json=urls
             ) as response:
@@ -205,6 +201,16 @@ class DocumentCrawlerApp:
                     f"API call failed with status {response.status}: {await response.text()}"
                 )
 
+    async def call_job_api(self, path: str) -> Dict[str, Any]:
+        """Fetch the status or the result of a scrape job."""
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://localhost:8000{path}") as response:
+                if response.status == 200:
+                    return await response.json()
+                raise Exception(
+                    f"API call failed with status {response.status}: {await response.text()}"
+                )
+
     async def call_query_api(
         self, query_data: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -236,26 +242,49 @@ class DocumentCrawlerApp:
 
     async def process_urls(self, urls: List[str]):
         """Process the provided URLs by crawling and indexing them."""
+        stage_progress = {
+            None: 0.0,
+            "crawling": 0.1,
+            "chunking": 0.4,
+            "embedding": 0.6,
+            "upserting": 0.8,
+            "indexing": 0.8,
+            "done": 1.0,
+        }
         with self.status_container:
             st.info(f"Processing {len(urls)} URLs...")
             self.progress_bar = st.progress(0)
             self.status_text = st.empty()
 
             try:
-                with st.spinner("Crawling and processing documents..."):
-                    self.status_text.text("Crawling and indexing pages...")
+                job = await self.call_crawler_api(urls)
+                job_id = job["job_id"]
+
+                # Poll the job until the pipeline has finished
+                while job["status"] in ("queued", "running"):
+                    progress = job["progress"]
+                    self.progress_bar.progress(
+                        stage_progress.get(job["stage"], 0.0)
+                    )
+                    self.status_text.text(
+                        f"Job {job_id}: {job['status']} ({job['stage'] or 'waiting'}) - "
+                        f"{progress['pages_crawled']} pages crawled, "
+                        f"{progress['chunks_produced']} chunks, "
+                        f"{progress['vectors_upserted']} vectors upserted"
+                    )
+                    await asyncio.sleep(5)
+                    job = await self.call_job_api(f"/jobs/{job_id}")
 
-                    # Simulate progress while waiting for the API
-                    for i in range(100):
-                        time.sleep(0.05)
-                        self.progress_bar.progress((i + 1) / 100)
+                if job["status"] == "failed":
+                    st.error(f"Job {job_id} failed: {job['error']}")
+                    return
 
-                    # Call the actual API
-                    response = await self.call_crawler_api(urls)
+                self.progress_bar.progress(1.0)
+                response = await self.call_job_api(f"/jobs/{job_id}/result")
 
-                    # Display results
-                    st.success(f"Successfully processed {len(urls)} URLs")
-                    st.json(response)
+                # Display results
+                st.success(f"Successfully processed {len(urls)} URLs")
+                st.json(response)
             except Exception as e:
                 st.error(f"An error occurred: {str(e)}")
 
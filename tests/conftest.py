@@ -0,0 +1,34 @@
+import os
+import tempfile
+
+# The settings object is built at import time and requires these
+for name in (
+    "PINECONE_API_KEY",
+    "OPENAI_KEY",
+    "GEMINI_API_KEY",
+    "INDEX_NAME",
+    "INDEX_HOST",
+    "JINA_API_KEY",
+    "MONGODB_DB_NAME",
+    "ERROR_COLLECTION_NAME",
+    "LLM_USAGE_COLLECTION_NAME",
+    "OPENAI_BASE_URL",
+    "OPENAI_COMPLETION_ENDPOINT",
+    "OPENAI_FILE_ENDPOINT",
+    "OPENAI_MODEL",
+    "OPENAI_BATCH_ENDPOINT",
+    "PINECONE_LIST_INDEX_URL",
+    "PINECONE_API_VERSION",
+    "PINECONE_CREATE_INDEX_URL",
+    "PINECONE_UPSERT_URL",
+    "PINECONE_QUERY_URL",
+    "JINA_RERANKING_MODEL",
+    "JINA_RERANKING_URL",
+):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("MONGO_URI", "mongodb://localhost")
+os.environ.setdefault("MAX_DEPTH", "3")
+os.environ.setdefault("MAX_LLM_REQUEST_COUNT", "5")
+os.environ.setdefault("MAX_CONCURRENT_CLICKS", "3")
+os.environ.setdefault("CHUNK_SEMAPHORE", "3")
+os.environ.setdefault("USER_DATA", tempfile.mkdtemp())
@@ -0,0 +1,21 @@
+import asyncio
+
+from src.app.state.crawler_state import CrawlerState
+
+
+def test_in_degree_is_dropped_when_the_url_is_dequeued():
+    async def run():
+        state = CrawlerState()
+        state.queue.add_source("docs")
+        url = "https://x.com/docs/a"
+        state.count_in_link(url)
+        state.count_in_link("https://x.com/docs/a/")
+        assert state.in_degree_of(url) == 2
+
+        await state.queue.put((url, 1, "docs", "https://x.com/docs/", False))
+        assert state.queue.is_queued("docs", url)
+        await state.queue.get()
+        return state
+
+    state = asyncio.run(run())
+    assert state.link_in_degree == {}
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from src.app.services.doc_adapters.base import DocAdapter
+from src.app.services.doc_adapters.markdown_source import (
+    GitBookAdapter,
+    MintlifyAdapter,
+)
+from src.app.services.doc_adapters.sphinx import SphinxAdapter
+
+mintlify = MintlifyAdapter(None, None)
+gitbook = GitBookAdapter(None, None)
+
+
+def test_a_mention_is_not_a_match():
+    html = "<p>We moved from Mintlify and GitBook to our own docs.</p>"
+    assert not mintlify.matches(html)
+    assert not gitbook.matches(html)
+
+
+def test_generator_meta_and_assets_match():
+    assert mintlify.matches('<meta name="generator" content="Mintlify">')
+    assert mintlify.matches(
+        '<img src="https://mintcdn.com/acme/logo/light.svg">'
+    )
+    assert gitbook.matches(
+        '<script src="https://static-2v.gitbook.com/_next/app.js"></script>'
+    )
+
+
+def test_base_adapter_is_abstract():
+    with pytest.raises(TypeError):
+        DocAdapter(None, None)
+
+
+def sphinx_with(files):
+    async def fetch_text(url):
+        return files.get(url)
+
+    return SphinxAdapter(fetch_text, None)
+
+
+SEARCHINDEX = 'Search.setIndex({"docnames": ["index", "guide/setup"]})'
+SPHINX_HTML = (
+    '<script src="../_static/documentation_options.js"></script>'
+    '<a href="https://cdn.example.com/theme.html">Theme</a>'
+)
+
+
+def test_sphinx_dirhtml_links_use_directories():
+    sphinx = sphinx_with(
+        {
+            "https://x.com/docs/searchindex.js": SEARCHINDEX,
+            "https://x.com/docs/_static/documentation_options.js": (
+                "const DOCUMENTATION_OPTIONS = {BUILDER: 'dirhtml',"
+                " FILE_SUFFIX: '.html', LINK_SUFFIX: '.html'};"
+            ),
+        }
+    )
+    _, entries = asyncio.run(
+        sphinx.enumerate("https://x.com/docs/guide/", SPHINX_HTML, "user")
+    )
+    assert [entry["loc"] for entry in entries] == [
+        "https://x.com/docs/",
+        "https://x.com/docs/guide/setup/",
+    ]
+
+
+def test_sphinx_suffix_falls_back_to_the_page_links():
+    sphinx = sphinx_with({"https://x.com/docs/searchindex.js": SEARCHINDEX})
+    html = SPHINX_HTML + '<a href="../index.html">Home</a>'
+    _, entries = asyncio.run(
+        sphinx.enumerate("https://x.com/docs/guide/", html, "user")
+    )
+    assert entries[1]["loc"] == "https://x.com/docs/guide/setup.html"
+    html = SPHINX_HTML + '<a href="../install/">Install</a>'
+    _, entries = asyncio.run(
+        sphinx.enumerate("https://x.com/docs/guide/", html, "user")
+    )
+    assert entries[1]["loc"] == "https://x.com/docs/guide/setup/"
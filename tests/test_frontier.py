@@ -0,0 +1,18 @@
+import asyncio
+
+from src.app.state.frontier import Frontier
+
+
+def test_sources_are_served_by_weight():
+    async def run():
+        frontier = Frontier()
+        frontier.add_source("big", weight=3)
+        frontier.add_source("small")
+        for name in ("big", "small"):
+            for i in range(8):
+                await frontier.put((f"https://x.com/{name}/{i}", 1, name))
+        return [frontier.get_nowait()[2] for _ in range(8)]
+
+    served = asyncio.run(run())
+    assert served.count("big") == 6
+    assert served.count("small") == 2
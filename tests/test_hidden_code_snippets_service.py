@@ -0,0 +1,20 @@
+from src.app.services.hidden_code_snippets_service import (
+    HiddenCodeSnippetsService,
+)
+
+
+def test_pop_snippets_removes_every_matching_url():
+    service = HiddenCodeSnippetsService(error_repo=None)
+    extraction = {"snippets": {"python": ["print(1)"]}, "screened": True}
+    service.snippets_by_url = {
+        "https://x.com/docs/final": extraction,
+        "https://x.com/docs/start": {"snippets": {}, "screened": True},
+    }
+
+    popped = service.pop_snippets(
+        "https://x.com/docs/final", "https://x.com/docs/start"
+    )
+
+    assert popped is extraction
+    assert service.snippets_by_url == {}
+    assert service.pop_snippets("https://x.com/docs/final") is None
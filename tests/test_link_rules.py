@@ -0,0 +1,65 @@
+import pytest
+
+from src.app.usecases.crawler_usecase.link_rules import KEEP, REJECT, LinkRules
+
+rules = LinkRules()
+
+
+@pytest.mark.parametrize(
+    "url, home_url",
+    [
+        ("https://docs.stripe.com/api/accounts", "https://docs.stripe.com/"),
+        (
+            "https://docs.stripe.com/api/customers/search",
+            "https://docs.stripe.com/",
+        ),
+        (
+            "https://supabase.com/docs/guides/auth",
+            "https://supabase.com/docs/",
+        ),
+        (
+            "https://docs.djangoproject.com/en/5.0/ref/settings/",
+            "https://docs.djangoproject.com/en/5.0/",
+        ),
+        (
+            "https://platform.openai.com/docs/api-reference/fine-tuning/jobs",
+            "https://platform.openai.com/docs/overview",
+        ),
+        (
+            "https://docs.github.com/en/rest/search",
+            "https://docs.github.com/en",
+        ),
+        ("https://x.com/docs/intro?next=2", "https://x.com/docs/"),
+        ("https://x.com/guide/intro?q=auth", "https://x.com/"),
+    ],
+)
+def test_reference_pages_are_not_rejected(url, home_url):
+    assert rules.classify(url, home_url) != REJECT
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://x.com/login",
+        "https://status.x.com/",
+        "https://x.com/pricing",
+        "https://x.com/blog/post?share=twitter",
+        "https://x.com/docs/logo.png",
+        "https://x.com/cdn-cgi/l/email-protection",
+    ],
+)
+def test_site_chrome_is_rejected(url):
+    assert rules.classify(url, "https://x.com/docs/") == REJECT
+
+
+def test_in_scope_pages_are_kept():
+    assert (
+        rules.classify("https://x.com/docs/settings", "https://x.com/docs/")
+        == KEEP
+    )
+
+
+def test_reject_hosts_only_apply_to_other_hosts():
+    home_url = "https://support.x.com/docs/"
+    assert rules.classify("https://support.x.com/docs/setup", home_url) == KEEP
+    assert rules.classify("https://app.x.com/settings", home_url) == REJECT
@@ -0,0 +1,52 @@
+import asyncio
+
+from src.app.services.llms_txt_service import LlmsTxtService
+
+service = LlmsTxtService(error_repo=None)
+
+FULL_TEXT = """# Setup
+Source: https://x.com/docs/setup
+
+Install it.
+
+# Pricing
+Source: https://x.com/pricing
+
+Plans.
+"""
+
+
+def test_sections_outside_the_start_url_are_dropped():
+    pages = service.split_sections(
+        "https://x.com/llms-full.txt", FULL_TEXT, "https://x.com/docs/"
+    )
+    assert [page["href"] for page in pages] == ["https://x.com/docs/setup"]
+
+
+def test_unsourced_sections_of_a_wider_root_file_are_dropped():
+    text = "# Setup\n\nInstall it.\n"
+    assert not service.split_sections(
+        "https://x.com/llms-full.txt", text, "https://x.com/docs/"
+    )
+    assert service.split_sections(
+        "https://x.com/docs/llms-full.txt", text, "https://x.com/docs/"
+    )
+
+
+def test_linked_pages_outside_the_start_url_are_not_fetched():
+    service = LlmsTxtService(error_repo=None)
+    fetched = []
+
+    async def get_text(url):
+        fetched.append(url)
+        return "# Page"
+
+    service.get_text = get_text
+    text = "- [Setup](/docs/setup.md)\n- [Blog](/blog/post.md)\n"
+    pages, html_links = asyncio.run(
+        service.fetch_linked(
+            "https://x.com/llms.txt", text, "https://x.com/docs/"
+        )
+    )
+    assert fetched == ["https://x.com/docs/setup.md"]
+    assert [page["href"] for page in pages] == fetched
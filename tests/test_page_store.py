@@ -0,0 +1,59 @@
+from src.app.models.domain.page_record import PageRecord
+from src.app.state.page_store import PageStore
+from src.app.utils.url_canonicalizer import UrlCanonicalizer
+
+
+def make_store(tmp_path):
+    store = PageStore(UrlCanonicalizer())
+    store.open(str(tmp_path))
+    store.set_source("docs")
+    return store
+
+
+def page(href, content):
+    return PageRecord(href, content, "https://x.com")
+
+
+def test_llms_sections_are_stored_separately(tmp_path):
+    store = make_store(tmp_path)
+    for slug in ("intro", "install", "usage"):
+        assert store.add(
+            "docs", page(f"https://x.com/llms-full.txt#{slug}", slug)
+        )
+
+    assert store.count("docs") == 3
+    assert store.get("docs", "https://x.com/llms-full.txt#intro").content == (
+        "intro"
+    )
+    assert sorted(p["content"] for p in store.iter_pages("docs")) == [
+        "install",
+        "intro",
+        "usage",
+    ]
+
+
+def test_url_spellings_share_a_key(tmp_path):
+    store = make_store(tmp_path)
+    store.add("docs", page("https://x.com/a/", "one"))
+    store.add("docs", page("https://www.x.com/a", "two"))
+
+    assert store.count("docs") == 1
+    assert store.get("docs", "https://x.com/a").content == "two"
+
+
+def test_same_content_is_kept_by_default(tmp_path):
+    store = make_store(tmp_path)
+    assert store.add("docs", page("https://x.com/v1/a", "same"))
+    assert store.add("docs", page("https://x.com/latest/a", "same"))
+
+    assert store.count("docs") == 2
+
+
+def test_content_dedupe_is_opt_in_and_counted(tmp_path):
+    store = make_store(tmp_path)
+    store.dedupe_content = True
+    assert store.add("docs", page("https://x.com/v1/a", "same"))
+    assert not store.add("docs", page("https://x.com/latest/a", "same"))
+
+    assert store.count("docs") == 1
+    assert store.skipped == {"docs": 1}
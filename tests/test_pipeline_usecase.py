@@ -0,0 +1,127 @@
+import asyncio
+
+from src.app.usecases.pipeline_usecase.pipeline_usecase import PipelineUsecase
+
+
+class FakeChunking:
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def chunk_page(self, user_id, page, semaphore):
+        await self.release.wait()
+        return {
+            "a": [{"chunked_data": "a1"}, {"chunked_data": "a2"}],
+            "b": [{"chunked_data": "bad"}],
+            "c": None,
+            "d": [],
+        }[page["href"]]
+
+    async def process_summary(self, user_id, pages):
+        return [{"chunked_data": "summary"}]
+
+
+class FakeEmbed:
+    async def get_dense_embedding(self, text, user_id):
+        return [] if text == "bad" else [0.1]
+
+    async def get_sparse_embedding(self, text, user_id):
+        return {}
+
+
+class FakePinecone:
+    def format_record(self, chunk, chunk_id):
+        return {"id": chunk_id, "values": chunk["embedding"]}
+
+
+class FakePineconeService:
+    async def upsert_vectors(self, host, batch):
+        return {"upsertedCount": len(batch)}
+
+
+class FakeUpsert:
+    upsert_batch_size = 100
+    pinecone_service = FakePineconeService()
+
+    async def get_index_host(self, dimension):
+        return "host"
+
+
+class FakeErrors:
+    async def insert_error(self, error):
+        pass
+
+
+class FakeCheckpoint:
+    def __init__(self):
+        self.indexed = []
+        self.finished = []
+
+    def save_indexed(self, file_name, href):
+        self.indexed.append((file_name, href))
+
+    def finish_source(self, file_name):
+        self.finished.append(file_name)
+
+
+def make_pipeline():
+    pipeline = PipelineUsecase(
+        FakeChunking(),
+        FakeEmbed(),
+        FakePinecone(),
+        FakeUpsert(),
+        FakeErrors(),
+    )
+    pipeline.checkpoint = FakeCheckpoint()
+    return pipeline
+
+
+def test_only_fully_upserted_pages_are_recorded_as_indexed():
+    async def run():
+        pipeline = make_pipeline()
+        await pipeline.start("job", {})
+        for href in ("a", "b", "c"):
+            await pipeline.submit_page({"href": href}, "docs")
+        await pipeline.finish()
+        return pipeline.checkpoint.indexed, pipeline.failed
+
+    indexed, failed = asyncio.run(run())
+    assert indexed == [("docs", "a")]
+    # Lost pages keep the job's data folder for a resume
+    assert failed
+
+
+def test_source_is_finished_only_once_indexed_and_summarized():
+    async def run():
+        pipeline = make_pipeline()
+        pipeline.chunking_utils.release.clear()
+        await pipeline.start("job", {})
+        for href in ("a", "d"):
+            await pipeline.submit_page({"href": href}, "docs")
+        pipeline.submit_source("docs", [])
+        await asyncio.sleep(0.05)
+        # Handed to the pipeline but not indexed yet: a resume must redo it
+        finished_early = list(pipeline.checkpoint.finished)
+        pipeline.chunking_utils.release.set()
+        await pipeline.finish()
+        return finished_early, pipeline.checkpoint
+
+    finished_early, checkpoint = asyncio.run(run())
+    assert finished_early == []
+    assert checkpoint.finished == ["docs"]
+    assert sorted(checkpoint.indexed) == [("docs", "a"), ("docs", "d")]
+
+
+def test_source_with_lost_pages_stays_unfinished():
+    async def run():
+        pipeline = make_pipeline()
+        await pipeline.start("job", {})
+        for href in ("a", "c"):
+            await pipeline.submit_page({"href": href}, "docs")
+        pipeline.submit_source("docs", [])
+        await pipeline.finish()
+        return pipeline.checkpoint
+
+    checkpoint = asyncio.run(run())
+    assert checkpoint.indexed == [("docs", "a")]
+    assert checkpoint.finished == []
@@ -0,0 +1,54 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from src.app.services.resource_service import ResourceService
+from src.app.state.host_scheduler import SlotOutcome
+
+
+class FakeResponse:
+    def __init__(self, status_code, content_type):
+        self.status_code = status_code
+        self.headers = {"content-type": content_type}
+
+
+class FakeClient:
+    def __init__(self, response):
+        self.response = response
+
+    async def head(self, url):
+        return self.response
+
+
+class FakeHttpClient:
+    def __init__(self, response):
+        self.client = FakeClient(response)
+
+    def get_client(self):
+        return self.client
+
+
+class FakeScheduler:
+    @asynccontextmanager
+    async def slot(self, url):
+        yield SlotOutcome()
+
+
+def preflight(status_code, content_type="application/pdf"):
+    service = ResourceService(error_repo=None)
+    service.host_scheduler = FakeScheduler()
+    service.http_client = FakeHttpClient(
+        FakeResponse(status_code, content_type)
+    )
+    return asyncio.run(service.preflight("https://docs.example.com/file"))
+
+
+def test_throttled_and_gated_heads_are_left_to_the_page_fetch():
+    assert preflight(429) == "html"
+    assert preflight(503) == "html"
+    assert preflight(403) == "html"
+
+
+def test_missing_resources_are_skipped():
+    assert preflight(404) == "skip"
+    assert preflight(200) == "skip"
+    assert preflight(200, "text/markdown") == "text"
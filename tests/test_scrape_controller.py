@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from src.app.config.settings import settings
+from src.app.controllers.scrape_controller import ScrapeController
+from src.app.core.error_handler import JsonResponseError
+
+
+class FakeState:
+    def __init__(self):
+        self.progress = {}
+
+
+class FakeCrawler:
+    def __init__(self, completed):
+        self.state = FakeState()
+        self.completed = completed
+        self.error = None if completed else FileNotFoundError("no checkpoint")
+        self.pipeline = None
+        self.closed = False
+
+    async def resume(self, user_id):
+        return user_id
+
+    async def close_checkpoint(self):
+        self.closed = True
+
+
+class FakePipeline:
+    def __init__(self):
+        self.cleaned = False
+
+    async def start(self, user_id, progress):
+        pass
+
+    async def finish(self):
+        return {"upsertedCount": 3}
+
+    async def cleanup(self):
+        self.cleaned = True
+
+
+def make_controller(completed):
+    controller = ScrapeController(
+        chunking_usecase=None,
+        crawler_usecase=FakeCrawler(completed),
+        upsert_usecase=None,
+        embed_usecase=None,
+        pipeline_usecase=FakePipeline(),
+    )
+    controller.indexed = False
+
+    async def index(user_id):
+        controller.indexed = True
+        return {"upsertedCount": 1}
+
+    controller.index = index
+    return controller
+
+
+def test_failed_crawl_fails_the_job_and_keeps_its_data(monkeypatch):
+    monkeypatch.setattr(settings, "STREAMING_PIPELINE", True)
+    controller = make_controller(completed=False)
+
+    with pytest.raises(JsonResponseError) as error:
+        asyncio.run(controller.resume_scrape("user"))
+
+    assert "no checkpoint" in error.value.detail
+    assert "3 vectors" in error.value.detail
+    assert controller.crawler_usecase.closed
+    assert not controller.pipeline_usecase.cleaned
+
+
+def test_failed_crawl_is_not_indexed_without_the_pipeline(monkeypatch):
+    monkeypatch.setattr(settings, "STREAMING_PIPELINE", False)
+    controller = make_controller(completed=False)
+
+    with pytest.raises(JsonResponseError):
+        asyncio.run(controller.resume_scrape("user"))
+
+    # upload_vectors removes USER_DATA/<user_id>, checkpoint included
+    assert not controller.indexed
+
+
+def test_completed_crawl_is_cleaned_up(monkeypatch):
+    monkeypatch.setattr(settings, "STREAMING_PIPELINE", True)
+    controller = make_controller(completed=True)
+
+    response = asyncio.run(controller.resume_scrape("user"))
+
+    assert response == {"upsertedCount": 3}
+    assert controller.pipeline_usecase.cleaned
@@ -0,0 +1,20 @@
+from src.app.state.tab_profile_cache import TabProfileCache
+
+
+def test_skipped_domain_is_probed_again():
+    cache = TabProfileCache(learn_pages=3, probe_interval=50)
+    for _ in range(3):
+        cache.strategies_for("x.com")
+        cache.record("x.com", [])
+
+    results = [cache.strategies_for("x.com") for _ in range(200)]
+
+    assert sum(1 for strategies in results if strategies) == 4
+    assert results[49] == cache.full_hierarchy()
+
+
+def test_learned_strategies_are_reused():
+    cache = TabProfileCache(learn_pages=1, probe_interval=50)
+    cache.record("x.com", [".tabs|click"])
+
+    assert cache.strategies_for("x.com") == [[".tabs", "click"]]